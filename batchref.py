@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# ---------------------------------------------------------------------------
+#   CS 111 – Lab 3  •  Batched NumPy reference Round‑Robin engine
+# ---------------------------------------------------------------------------
+#
+#   Simulates B workloads × Q quanta at once.  Every (workload, quantum) pair
+#   is one *lane*; workloads are padded to N processes and all per‑process
+#   state lives in (lanes, N) arrays.  Each step dispatches one slice on
+#   every lane that still has work, so the loop runs as many times as the
+#   longest lane has slices and all per‑step work is vectorised over lanes.
+#
+#   Same semantics as reference.rr_schedule: arrivals admitted in the same
+#   window join the queue in file order, ahead of the re‑queued process.
+#   Requires NumPy.
+# ---------------------------------------------------------------------------
+
+import numpy as np
+
+from reference import exact_average
+
+
+def _push_mask(ring, head, count, mask):
+    """Append the columns set in `mask` (S, N) to each lane's ring, in order."""
+    rows, cols = np.nonzero(mask)
+    if rows.size == 0:
+        return
+    n = ring.shape[1]
+    rank = np.cumsum(mask, axis=1)[rows, cols] - 1
+    ring[rows, (head[rows] + count[rows] + rank) % n] = cols
+    count += mask.sum(axis=1)
+
+
+def rr_batch_totals(workloads, quanta):
+    """
+    workloads : sequence of B workloads, each [(pid, arrival, burst), …]
+    quanta    : sequence of Q positive ints
+
+    Returns (total_wait, total_resp, n): int64 arrays of shape (B, Q) and
+    the process count of every workload, shape (B,).
+    """
+    quanta = np.asarray(list(quanta), dtype=np.int64)
+    if (quanta < 1).any():
+        raise ValueError("quantum must be positive")
+    B, Q = len(workloads), len(quanta)
+    sizes = np.array([len(w) for w in workloads], dtype=np.int64)
+    N = max(int(sizes.max(initial=0)), 1)
+
+    arrival = np.zeros((B, N), dtype=np.int64)
+    burst   = np.zeros((B, N), dtype=np.int64)
+    for b, w in enumerate(workloads):
+        if len(w):
+            arr = np.asarray(w, dtype=np.int64)
+            arrival[b, :len(w)] = arr[:, 1]
+            burst[b, :len(w)]   = arr[:, 2]
+    real = np.arange(N)[None, :] < sizes[:, None]
+
+    # One lane per (workload, quantum): lane s ↔ (s // Q, s % Q)
+    S = B * Q
+    lane_q   = np.tile(quanta, B)
+    arr      = np.repeat(arrival, Q, axis=0)
+    rem      = np.repeat(burst, Q, axis=0)
+    arrived  = ~np.repeat(real, Q, axis=0)          # padding is never admitted
+    first    = np.full((S, N), -1, dtype=np.int64)
+    finish   = np.full((S, N), -1, dtype=np.int64)
+    n        = np.repeat(sizes, Q)
+    done     = np.zeros(S, dtype=np.int64)
+    t        = np.zeros(S, dtype=np.int64)
+    ring     = np.zeros((S, N), dtype=np.int64)
+    head     = np.zeros(S, dtype=np.int64)
+    count    = np.zeros(S, dtype=np.int64)
+    lanes    = np.arange(S)
+    never    = np.iinfo(np.int64).max
+
+    def admit(live):
+        mask = ~arrived & (arr <= t[:, None]) & live[:, None]
+        arrived[mask] = True
+        _push_mask(ring, head, count, mask)
+
+    active = done < n
+    while active.any():
+        admit(active)
+
+        idle = active & (count == 0)           # CPU idle → next arrival
+        if idle.any():
+            t[idle] = np.where(arrived[idle], never, arr[idle]).min(axis=1)
+
+        run = lanes[active & (count > 0)]
+        p = ring[run, head[run]]
+        head[run] = (head[run] + 1) % N
+        count[run] -= 1
+
+        fresh = first[run, p] < 0
+        first[run[fresh], p[fresh]] = t[run[fresh]]
+
+        slice_len = np.minimum(lane_q[run], rem[run, p])
+        t[run] += slice_len
+        rem[run, p] -= slice_len
+
+        running = np.zeros(S, dtype=bool)
+        running[run] = True
+        admit(running)                         # arrivals during (start, t]
+
+        ended = rem[run, p] == 0
+        finish[run[ended], p[ended]] = t[run[ended]]
+        done[run[ended]] += 1
+
+        back, bp = run[~ended], p[~ended]      # re‑queue
+        ring[back, (head[back] + count[back]) % N] = bp
+        count[back] += 1
+
+        active = done < n
+
+    real_lanes = np.repeat(real, Q, axis=0)
+    burst_l = np.repeat(burst, Q, axis=0)
+    wait = np.where(real_lanes, finish - arr - burst_l, 0).sum(axis=1)
+    resp = np.where(real_lanes, first - arr, 0).sum(axis=1)
+    return wait.reshape(B, Q), resp.reshape(B, Q), sizes
+
+
+def _round_avg(totals, sizes):
+    return np.array([[exact_average(int(x), int(m)) for x in row]
+                     for row, m in zip(totals, sizes)],
+                    dtype=np.float64).reshape(totals.shape)
+
+
+def rr_batch(workloads, quanta):
+    """
+    Batched counterpart of rr_reference.  Returns (avg_wait, avg_resp):
+    float arrays of shape (B, Q) rounded to 2 decimals exactly as
+    rr_reference rounds them.
+    """
+    wait, resp, sizes = rr_batch_totals(workloads, quanta)
+    return _round_avg(wait, sizes), _round_avg(resp, sizes)
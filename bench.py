@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+# ---------------------------------------------------------------------------
+#   CS 111 – Lab 3  •  Scaling benchmarks for `./rr` and rr_reference
+# ---------------------------------------------------------------------------
+#
+#   Generates synthetic workloads of 10^min‑exp … 10^max‑exp processes for
+#   several arrival/burst distributions, then times parsing and simulation
+#   separately for every quantum:
+#
+#     rr         `rr --timing` reports both phases and its peak RSS on stderr.
+#     reference  runs in a freshly spawned interpreter so its peak RSS is
+#                its own; parsing is reading the text file into tuples.
+#
+#   Peak RSS is VmHWM where /proc exists: ru_maxrss of a child also counts
+#   the parent's pages from before exec, which would charge the size of
+#   this script to `rr`.
+#
+#   Every record carries slices/sec, processes/sec and peak RSS.  Results
+#   are written as JSON; --baseline compares against an earlier file and
+#   exits 1 if anything got slower (or bigger) than --tolerance allows.
+#
+#   --build release benchmarks an -O2 build from the build cache (build.py)
+#   rather than the -O0 ./rr the suites use.
+#
+#   Usage:  python3 bench.py --max-exp 6 --output bench.json
+#           python3 bench.py --baseline bench.json
+# ---------------------------------------------------------------------------
+
+import argparse
+import array
+import json
+import multiprocessing
+import os
+import platform
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from build import VARIANTS, binary
+from harness import RR_EXE
+from reference import rr_schedule
+
+DISTRIBUTIONS = ("batch", "poisson", "heavy")
+LOAD = 0.9                                     # offered load for Poisson arrivals
+
+
+# ---------------------------------------------------------------------------
+#  Synthetic workloads
+# ---------------------------------------------------------------------------
+def generate(dist, n, seed):
+    """
+    Returns (arrival, burst) as array('I') columns.
+
+      batch    everything arrives at 0, bursts uniform in 1..100
+      poisson  exponential inter‑arrival gaps, bursts uniform in 1..100
+      heavy    exponential gaps, Pareto(α=1.5) bursts (mean ≈ 30, capped)
+    """
+    rng = random.Random(f"{dist}:{n}:{seed}")
+    if dist == "heavy":
+        mean_burst = 30
+        burst = array.array("I", (min(int(rng.paretovariate(1.5) * 10), 10 ** 6)
+                                  for _ in range(n)))
+    elif dist in ("batch", "poisson"):
+        mean_burst = 50.5
+        burst = array.array("I", (rng.randint(1, 100) for _ in range(n)))
+    else:
+        raise ValueError(f"unknown distribution {dist!r}")
+
+    if dist == "batch":
+        return array.array("I", bytes(4 * n)), burst
+    rate = LOAD / mean_burst
+    arrival, t = array.array("I"), 0.0
+    for _ in range(n):
+        arrival.append(int(t))
+        t += rng.expovariate(rate)
+    return arrival, burst
+
+
+def write_text(path, arrival, burst, chunk=1 << 16):
+    """Write the columns as a skeleton‑format text workload."""
+    n = len(arrival)
+    with open(path, "w") as f:
+        f.write(f"{n}\n")
+        for lo in range(0, n, chunk):
+            hi = min(lo + chunk, n)
+            f.write("".join(f"{i + 1}, {arrival[i]}, {burst[i]}\n"
+                            for i in range(lo, hi)))
+
+
+def slice_count(burst, quantum):
+    """Dispatches plain round‑robin needs: ⌈b/q⌉ per job, at least one."""
+    return sum(max(1, -(-b // quantum)) for b in burst)
+
+
+# ---------------------------------------------------------------------------
+#  Engines
+# ---------------------------------------------------------------------------
+def peak_rss_kb():
+    """Peak RSS of this process in KiB (VmHWM, else ru_maxrss)."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    import resource
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == "darwin" else rss   # bytes on macOS
+
+
+def time_rr(path, quanta, exe=RR_EXE):
+    """
+    One `rr --timing` run over every quantum.
+    Returns (parse_seconds, {quantum: simulate_seconds}, peak_rss_kb).
+    """
+    spec = ",".join(str(q) for q in quanta)
+    report = subprocess.run((exe, "--timing", path, spec), check=True,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                            text=True).stderr
+    parse = float(re.search(r"parse_seconds=([\d.]+)", report).group(1))
+    simulate = {int(q): float(s) for q, s in
+                re.findall(r"quantum=(\d+) simulate_seconds=([\d.]+)", report)}
+    rss = int(re.search(r"peak_rss_kb=(\d+)", report).group(1))
+    return parse, simulate, rss
+
+
+def read_text(path):
+    """Parse a text workload into [(pid, arrival, burst), …] like a suite would."""
+    with open(path) as f:
+        n = int(f.readline())
+        return [tuple(map(int, line.split(","))) for _, line in zip(range(n), f)]
+
+
+def _reference_child(path, quanta):
+    t0 = time.perf_counter()
+    workload = read_text(path)
+    parse = time.perf_counter() - t0
+    simulate = {}
+    for q in quanta:
+        t0 = time.perf_counter()
+        rr_schedule(workload, q)
+        simulate[q] = time.perf_counter() - t0
+    return parse, simulate, peak_rss_kb()
+
+
+def time_reference(path, quanta):
+    """Same shape as time_rr, measured in a fresh interpreter."""
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+        return pool.submit(_reference_child, path, list(quanta)).result()
+
+
+# ---------------------------------------------------------------------------
+#  Suite
+# ---------------------------------------------------------------------------
+def _records(engine, dist, n, quanta, burst, timed):
+    parse, simulate, rss = timed
+    out = []
+    for q in quanta:
+        sim = simulate[q]
+        slices = slice_count(burst, q)
+        out.append({
+            "engine": engine, "distribution": dist, "processes": n,
+            "quantum": q, "parse_seconds": parse, "simulate_seconds": sim,
+            "slices": slices,
+            "slices_per_second": slices / sim if sim else None,
+            "processes_per_second": n / sim if sim else None,
+            "parse_processes_per_second": n / parse if parse else None,
+            "peak_rss_kb": rss,
+        })
+    return out
+
+
+def run_suite(sizes, quanta, dists=DISTRIBUTIONS, ref_max=10 ** 5,
+              exe=RR_EXE, seed=0xC111, log=None):
+    """Benchmark every (distribution, size); returns the list of records."""
+    records = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for dist in dists:
+            for n in sizes:
+                arrival, burst = generate(dist, n, seed)
+                path = os.path.join(tmp, f"{dist}-{n}.txt")
+                write_text(path, arrival, burst)
+                engines = [("rr", lambda: time_rr(path, quanta, exe))]
+                if n <= ref_max:
+                    engines.append(("reference",
+                                    lambda: time_reference(path, quanta)))
+                for engine, timer in engines:
+                    new = _records(engine, dist, n, quanta, burst, timer())
+                    records.extend(new)
+                    if log:
+                        for r in new:
+                            log(_format(r))
+                os.unlink(path)
+    return records
+
+
+def _format(r):
+    sps = r["slices_per_second"]
+    return (f"{r['engine']:>9} {r['distribution']:>7} {r['processes']:>9} "
+            f"q={r['quantum']:<5} parse {r['parse_seconds']:9.4f}s  "
+            f"sim {r['simulate_seconds']:9.4f}s  "
+            f"{(sps or 0):>12.0f} slices/s  {r['peak_rss_kb']:>8} KiB")
+
+
+def _key(r):
+    return (r["engine"], r["distribution"], r["processes"], r["quantum"])
+
+
+def compare(records, baseline, tolerance=0.25, min_seconds=0.01):
+    """
+    Returns [(key, metric, old, new), …] for every metric that grew by more
+    than `tolerance` over the baseline.  Timings where both runs are under
+    `min_seconds` are too noisy to judge and are skipped.
+    """
+    base = {_key(r): r for r in baseline}
+    regressions = []
+    for r in records:
+        old = base.get(_key(r))
+        if old is None:
+            continue
+        for metric in ("parse_seconds", "simulate_seconds", "peak_rss_kb"):
+            a, b = old[metric], r[metric]
+            if metric.endswith("seconds") and max(a, b) < min_seconds:
+                continue
+            if b > a * (1 + tolerance):
+                regressions.append((_key(r), metric, a, b))
+    return regressions
+
+
+def _main():
+    ap = argparse.ArgumentParser(description="Scaling benchmarks for rr and "
+                                             "rr_reference.")
+    ap.add_argument("--min-exp", type=int, default=3)
+    ap.add_argument("--max-exp", type=int, default=7)
+    ap.add_argument("--ref-max-exp", type=int, default=5,
+                    help="largest 10^k the Python reference is run on")
+    ap.add_argument("--quanta", default="1,10,100")
+    ap.add_argument("--dist", default=",".join(DISTRIBUTIONS))
+    ap.add_argument("--seed", type=int, default=0xC111)
+    ap.add_argument("--exe", default=RR_EXE)
+    ap.add_argument("--build", choices=sorted(VARIANTS),
+                    help="benchmark the cached build of this variant "
+                         "(e.g. release, -O2) instead of --exe")
+    ap.add_argument("--output", help="write results as JSON")
+    ap.add_argument("--baseline", help="JSON from an earlier run to compare")
+    ap.add_argument("--tolerance", type=float, default=0.25)
+    args = ap.parse_args()
+
+    if args.build:
+        args.exe = binary(args.build)
+    quanta = [int(q) for q in args.quanta.split(",")]
+    sizes = [10 ** e for e in range(args.min_exp, args.max_exp + 1)]
+    records = run_suite(sizes, quanta, args.dist.split(","),
+                        10 ** args.ref_max_exp, args.exe, args.seed, print)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"host": platform.node(), "python": platform.python_version(),
+                       "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                       "results": records}, f, indent=1)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(records, json.load(f)["results"],
+                                  args.tolerance)
+        for key, metric, old, new in regressions:
+            print(f"REGRESSION {'/'.join(map(str, key))} {metric}: "
+                  f"{old:.4g} → {new:.4g}")
+        if regressions:
+            sys.exit(1)
+        print("no regressions")
+
+
+if __name__ == "__main__":
+    _main()
@@ -0,0 +1,405 @@
+#!/usr/bin/env python3
+# ---------------------------------------------------------------------------
+#   CS 111 – Lab 3  •  Differential fuzzer: `./rr` against rr_reference
+# ---------------------------------------------------------------------------
+#
+#   Generates adversarial workloads, runs them through `rr` and compares
+#   every quantum with rr_reference.  Any mismatch is shrunk to a minimal
+#   reproducer and can be saved under regressions/, which test_fuzz.py
+#   replays on every run.
+#
+#   Strategies (see STRATEGIES): duplicate arrivals, zero bursts, huge
+#   gaps, u32 boundary values, unsorted files and plain random ones.  A
+#   share of the cases is also rendered as malformed text (odd separators,
+#   CRLF, no final newline, numbers that overflow u32, truncation); those
+#   are checked against parse_like_rr, a model of rr's lenient parser,
+#   so `rr` must either print the reference result for what it parsed or
+#   fail with EINVAL when the file runs out of numbers.
+#
+#   Throughput: well-formed cases go to an `rr --serve` worker, so one `rr`
+#   process answers thousands of cases; chunks of cases run in parallel,
+#   one worker process (and one `rr`) per core.  Case i of seed s is
+#   always the same workload, so a failure is reproducible from (s, i).
+#
+#   Usage:  python3 fuzz.py --cases 20000 [--median] [--save]
+# ---------------------------------------------------------------------------
+
+import argparse
+import errno
+import hashlib
+import os
+import random
+import re
+import subprocess
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from harness import RR_EXE, parse_sweep, quantum_spec, workload_bytes
+from reference import rr_reference
+from rrpool import RRServerError, RRWorker
+
+U32_MAX = 2 ** 32 - 1
+REGRESSION_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                              "regressions")
+MALFORMED_RATE = 0.1
+
+# text is None for a well-formed case, else the exact bytes fed to `rr -`
+Case = namedtuple("Case", "seed index strategy tuples quanta text")
+# got / expected: (avg_wait, avg_resp), or an "exit N" string
+Failure = namedtuple("Failure", "case quantum got expected")
+
+
+# ---------------------------------------------------------------------------
+#  Workload strategies
+# ---------------------------------------------------------------------------
+def _uniform(rng):
+    n = rng.randint(1, 40)
+    return [(p, rng.randint(0, 60), rng.randint(1, 30)) for p in range(1, n + 1)]
+
+
+def _duplicates(rng):
+    """Few distinct arrival times, so many processes are admitted together."""
+    n = rng.randint(2, 40)
+    times = [rng.randint(0, 40) for _ in range(rng.randint(1, 4))]
+    return [(p, rng.choice(times), rng.randint(1, 12)) for p in range(1, n + 1)]
+
+
+def _zero_bursts(rng):
+    n = rng.randint(1, 30)
+    return [(p, rng.randint(0, 20), rng.choice((0, 0, 1, rng.randint(0, 9))))
+            for p in range(1, n + 1)]
+
+
+def _gaps(rng):
+    """Clusters separated by idle gaps up to 2^31."""
+    t, tuples = 0, []
+    for p in range(1, rng.randint(2, 30) + 1):
+        if rng.random() < 0.3:
+            t = min(U32_MAX, t + rng.randint(1, 2 ** 31))
+        tuples.append((p, t, rng.randint(1, 20)))
+    return tuples
+
+
+def _boundary(rng):
+    """Arrivals and bursts from the edges of u32: totals far past 2^32."""
+    edges = (0, 1, 2, 2 ** 31 - 1, 2 ** 31, U32_MAX - 1, U32_MAX)
+    n = rng.randint(1, 6)
+    return [(p, rng.choice(edges), rng.choice(edges)) for p in range(1, n + 1)]
+
+
+def _unsorted(rng):
+    """Arrivals out of file order, to exercise rr's arrival index."""
+    tuples = _uniform(rng)
+    arrivals = sorted((a for _, a, _ in tuples), reverse=rng.random() < 0.5)
+    if rng.random() < 0.5:
+        rng.shuffle(arrivals)
+    return [(p, a, b) for (p, _, b), a in zip(tuples, arrivals)]
+
+
+STRATEGIES = {
+    "uniform": _uniform,
+    "duplicates": _duplicates,
+    "zero_bursts": _zero_bursts,
+    "gaps": _gaps,
+    "boundary": _boundary,
+    "unsorted": _unsorted,
+}
+
+
+def _quanta(rng, tuples):
+    longest = max((b for _, _, b in tuples), default=1)
+    pool = {1, 2, rng.randint(1, max(1, min(longest, U32_MAX - 1)) + 1),
+            max(1, longest), U32_MAX}
+    return sorted(rng.sample(sorted(pool), rng.randint(1, min(4, len(pool)))))
+
+
+# ---------------------------------------------------------------------------
+#  Malformed text and a model of rr's parser
+# ---------------------------------------------------------------------------
+def _malform(text, rng):
+    """Rewrite a well-formed workload into text rr must still cope with."""
+    head, _, body = text.partition(b"\n")
+    kind = rng.choice(("separators", "crlf", "no_newline", "junk_lines",
+                       "overflow", "truncate"))
+    if kind == "separators":
+        body = re.sub(rb", ", lambda _: rng.choice(
+            (b",", b" ", b"\t", b";", b"  ,  ", b":", b"x", b"--")), body)
+    elif kind == "crlf":
+        body = body.replace(b"\n", b"\r\n")
+    elif kind == "no_newline":
+        body = body.rstrip(b"\n")
+    elif kind == "junk_lines":
+        body = b"# no digits here\n" + body + b"\n\n  trailing junk\n"
+    elif kind == "overflow":                   # u32 wraps while parsing
+        body = re.sub(rb"\d+", lambda m: str(
+            int(m.group()) + rng.choice((0, 0, 2 ** 32, 5 * 2 ** 32))).encode(),
+            body)
+    else:
+        body = body[:rng.randint(0, len(body))]
+    return head + b"\n" + body, kind
+
+
+def parse_like_rr(text):
+    """
+    The tuples `rr` reads from `text`: every run of digits is a number
+    (mod 2^32), everything else separates them.  None when the numbers run
+    out before the count promised by the first one.
+    """
+    ints = [int(x) % 2 ** 32 for x in re.findall(rb"\d+", text)]
+    if not ints or len(ints) < 1 + 3 * ints[0]:
+        return None
+    n = ints[0]
+    return [tuple(ints[1 + 3 * i:4 + 3 * i]) for i in range(n)]
+
+
+# ---------------------------------------------------------------------------
+#  Cases and checks
+# ---------------------------------------------------------------------------
+def make_case(seed, index):
+    """Case `index` of `seed`; the same pair always yields the same case."""
+    rng = random.Random(f"{seed}:{index}")
+    strategy = rng.choice(sorted(STRATEGIES))
+    tuples = STRATEGIES[strategy](rng)
+    text = None
+    if rng.random() < MALFORMED_RATE and strategy != "boundary":
+        text, kind = _malform(workload_bytes(tuples), rng)
+        strategy = f"{strategy}+{kind}"
+        tuples = parse_like_rr(text)
+    return Case(seed, index, strategy, tuples, _quanta(rng, tuples or []), text)
+
+
+def _expected(tuples, quanta, median):
+    return {q: rr_reference(tuples, q, median) for q in quanta}
+
+
+def check_text(text, quanta, median=False, exe=RR_EXE):
+    """Run `rr -` on raw `text`; returns [(q, got, expected)] that differ."""
+    args = ("--median",) if median else ()
+    proc = subprocess.run((exe, *args, "-", quantum_spec(quanta)), input=text,
+                          stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    tuples = parse_like_rr(text)
+    if tuples is None:
+        ok = proc.returncode == errno.EINVAL
+        return [] if ok else [(quanta[0], f"exit {proc.returncode}",
+                               f"exit {errno.EINVAL}")]
+    if proc.returncode != 0:
+        return [(quanta[0], f"exit {proc.returncode}", "exit 0")]
+    got = parse_sweep(proc.stdout.decode())
+    want = _expected(tuples, quanta, median)
+    return [(q, got.get(q), want[q]) for q in quanta if got.get(q) != want[q]]
+
+
+def check_tuples(worker, tuples, quanta, median=False):
+    """Run `tuples` on an `rr --serve` worker; returns differing quanta."""
+    try:
+        got = worker.request(tuples, quanta)
+    except RRServerError as e:
+        return [(quanta[0], str(e), "ok")]
+    want = _expected(tuples, quanta, median)
+    return [(q, got.get(q), want[q]) for q in quanta if got.get(q) != want[q]]
+
+
+def fuzz_chunk(job):
+    """
+    job = (seed, start, count, exe, median).  Checks cases start..start+count
+    and returns (checked, [Failure, …]).  Module level for process pools.
+    """
+    seed, start, count, exe, median = job
+    worker = RRWorker(exe, ("--median",) if median else ())
+    failures = []
+    try:
+        for index in range(start, start + count):
+            case = make_case(seed, index)
+            if case.text is not None:
+                diffs = check_text(case.text, case.quanta, median, exe)
+            else:
+                diffs = check_tuples(worker, case.tuples, case.quanta, median)
+                if diffs and worker.proc.poll() is not None:
+                    worker.close()
+                    worker = RRWorker(exe, ("--median",) if median else ())
+            failures.extend(Failure(case, *d) for d in diffs)
+    finally:
+        worker.close()
+    return count, failures
+
+
+def fuzz(cases, seed=0, median=False, exe=RR_EXE, workers=None, chunk=250):
+    """Check `cases` cases of `seed` in parallel; returns [Failure, …]."""
+    jobs = [(seed, start, min(chunk, cases - start), exe, median)
+            for start in range(0, cases, chunk)]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(jobs) <= 1:
+        results = map(fuzz_chunk, jobs)
+    else:
+        pool = ProcessPoolExecutor(max_workers=workers)
+        results = pool.map(fuzz_chunk, jobs)
+    failures = []
+    for _, found in results:
+        failures.extend(found)
+    if workers > 1 and len(jobs) > 1:
+        pool.shutdown()
+    return failures
+
+
+# ---------------------------------------------------------------------------
+#  Shrinking
+# ---------------------------------------------------------------------------
+def _smaller_values(v):
+    return sorted(x for x in {0, 1, v // 2, v - 1} if 0 <= x < v)
+
+
+def shrink(tuples, quantum, fails):
+    """
+    Greedy minimisation of a failing (tuples, quantum): drop chunks of
+    processes, then single processes, then pull each number towards 0 and
+    the quantum towards 1, as long as fails(tuples, quantum) stays true.
+    Pids are renumbered 1..n at the end if the failure survives it.
+    """
+    tuples = list(tuples)
+    progress = True
+    while progress:
+        progress = False
+        size = max(1, len(tuples) // 2)
+        while size >= 1:
+            i = 0
+            while i < len(tuples):
+                trial = tuples[:i] + tuples[i + size:]
+                if fails(trial, quantum):
+                    tuples, progress = trial, True
+                else:
+                    i += size
+            size //= 2
+        for i in range(len(tuples)):
+            for field in (1, 2):
+                for v in _smaller_values(tuples[i][field]):
+                    trial = list(tuples)
+                    row = list(trial[i])
+                    row[field] = v
+                    trial[i] = tuple(row)
+                    if fails(trial, quantum):
+                        tuples, progress = trial, True
+                        break
+        for q in _smaller_values(quantum):
+            if q >= 1 and fails(tuples, q):
+                quantum, progress = q, True
+                break
+    renumbered = [(p, a, b) for p, (_, a, b) in enumerate(tuples, 1)]
+    if fails(renumbered, quantum):
+        tuples = renumbered
+    return tuples, quantum
+
+
+def _ddmin(items, fails, join):
+    """Drop ever smaller chunks of `items` while fails(join(items))."""
+    size = max(1, len(items) // 2)
+    while size >= 1:
+        i = 0
+        while i < len(items):
+            trial = items[:i] + items[i + size:]
+            if fails(join(trial)):
+                items = trial
+            else:
+                i += size
+        size //= 2
+    return items
+
+
+def shrink_text(text, fails):
+    """
+    Minimise raw text while fails(text): first drop whole process lines,
+    lowering the count on the first line to match, then single bytes.
+    """
+    head, sep, body = text.partition(b"\n")
+    if sep and head.strip().isdigit():
+        def join(lines):
+            return str(len(lines)).encode() + sep + b"\n".join(lines)
+        lines = _ddmin(body.split(b"\n"), fails, join)
+        if fails(join(lines)):
+            text = join(lines)
+    return _ddmin(text, fails, bytes)
+
+
+def _kind(got, expected):
+    """What a failure is, independent of the exact numbers: exit codes or not."""
+    return (got, expected) if isinstance(got, str) else "mismatch"
+
+
+def minimise(failure, median=False, exe=RR_EXE):
+    """A minimal (text, quantum) that still fails the way `failure` did."""
+    case, q = failure.case, failure.quantum
+    if case.text is not None:
+        kind = _kind(failure.got, failure.expected)
+
+        def fails(text):
+            return any(_kind(got, want) == kind
+                       for _, got, want in check_text(text, [q], median, exe))
+        return shrink_text(case.text, fails), q
+    worker = RRWorker(exe, ("--median",) if median else ())
+    try:
+        def fails(tuples, quantum):
+            return bool(check_tuples(worker, tuples, [quantum], median))
+        tuples, q = shrink(case.tuples, q, fails)
+    finally:
+        worker.close()
+    return workload_bytes(tuples), q
+
+
+def save_regression(text, quantum, median=False, directory=REGRESSION_DIR):
+    """Store a reproducer as regressions/fuzz-<hash>-q<Q>[-median].txt."""
+    os.makedirs(directory, exist_ok=True)
+    digest = hashlib.sha1(text).hexdigest()[:10]
+    name = f"fuzz-{digest}-q{quantum}{'-median' if median else ''}.txt"
+    path = os.path.join(directory, name)
+    with open(path, "wb") as f:
+        f.write(text)
+    return path
+
+
+def regression_cases(directory=REGRESSION_DIR):
+    """[(path, text, quantum, median), …] for every saved reproducer."""
+    if not os.path.isdir(directory):
+        return []
+    cases = []
+    for name in sorted(os.listdir(directory)):
+        m = re.fullmatch(r"fuzz-[0-9a-f]+-q(\d+)(-median)?\.txt", name)
+        if m:
+            path = os.path.join(directory, name)
+            with open(path, "rb") as f:
+                cases.append((path, f.read(), int(m.group(1)), bool(m.group(2))))
+    return cases
+
+
+def _main():
+    ap = argparse.ArgumentParser(description="Differential fuzzer for rr.")
+    ap.add_argument("--cases", type=int, default=10_000)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--median", action="store_true")
+    ap.add_argument("--workers", type=int)
+    ap.add_argument("--exe", default=RR_EXE)
+    ap.add_argument("--save", action="store_true",
+                    help="write shrunk reproducers to regressions/")
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    failures = fuzz(args.cases, args.seed, args.median, args.exe, args.workers)
+    dt = time.perf_counter() - t0
+    print(f"{args.cases} cases in {dt:.2f}s ({args.cases / dt:.0f} cases/s), "
+          f"{len(failures)} mismatches")
+
+    seen = set()
+    for f in failures:
+        key = (f.case.index, f.quantum)
+        if key in seen:
+            continue
+        seen.add(key)
+        text, q = minimise(f, args.median, args.exe)
+        print(f"case {f.case.seed}:{f.case.index} ({f.case.strategy}) "
+              f"q={f.quantum}: got {f.got}, expected {f.expected}")
+        print(f"  minimal (q={q}): {text!r}")
+        if args.save:
+            print(f"  saved {save_regression(text, q, args.median)}")
+
+
+if __name__ == "__main__":
+    _main()
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+# ---------------------------------------------------------------------------
+#   CS 111 – Lab 3  •  Shared helpers for driving `./rr` from the suites
+# ---------------------------------------------------------------------------
+
+import atexit
+import os
+import subprocess
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from refcache import cached_reference
+
+RR_EXE = "./rr"
+
+
+def workload_bytes(tuples):
+    """`tuples` = [(pid, arrival, burst), …] rendered in skeleton format."""
+    lines = [f"{len(tuples)}\n"]
+    lines.extend(f"{pid}, {arr}, {bur}\n" for pid, arr, bur in tuples)
+    return "".join(lines).encode()
+
+
+def write_workload(tmp, tuples):
+    """Write `tuples` to the open file `tmp` in skeleton format."""
+    tmp.write(workload_bytes(tuples))
+    tmp.flush()
+
+
+def quantum_spec(quanta):
+    """
+    Render quanta as an `rr` sweep argument.  A lone quantum is written as
+    the range "q-q" so the output is always in sweep format.
+    """
+    quanta = list(quanta)
+    if len(quanta) == 1:
+        return f"{quanta[0]}-{quanta[0]}"
+    return ",".join(str(q) for q in quanta)
+
+
+def parse_quanta(spec):
+    """
+    Expand an `rr` quanta argument (a list "1,2,4", a range "1-16" or a
+    mix "1-4,8,16") into the quanta in order, as `rr` does.  Raises
+    ValueError for anything `rr` rejects.
+    """
+    quanta = []
+    for item in spec.split(","):
+        if not item:
+            continue
+        low, dash, high = item.partition("-")
+        if not (low.isdigit() and (high.isdigit() if dash else not high)):
+            raise ValueError(f"bad quanta {spec!r}")
+        low, high = int(low), int(high or low)
+        if low == 0 or high < low:
+            raise ValueError(f"bad quanta {spec!r}")
+        quanta.extend(range(low, high + 1))
+    if not quanta:
+        raise ValueError(f"bad quanta {spec!r}")
+    return quanta
+
+
+class SweepResult(tuple):
+    """
+    (avg_wait, avg_resp) of one quantum.  `stats` holds the `--stats`
+    counters as a dict, or None when `rr` ran without them.
+    """
+
+    def __new__(cls, avg_wait, avg_resp, stats=None):
+        self = super().__new__(cls, (avg_wait, avg_resp))
+        self.stats = stats
+        return self
+
+    def __reduce__(self):
+        return SweepResult, (*self, self.stats)
+
+
+def parse_stats(fields):
+    """The `--stats` counters among a sweep line's fields, or None."""
+    if "slices" not in fields:
+        return None
+    stats = {k: int(fields[k]) for k in STATS_COUNTERS}
+    stats["mean_queue"] = float(fields["mean_queue"])
+    stats["wait_hist"] = [int(c) for c in fields["wait_hist"].split(",")]
+    return stats
+
+
+def parse_sweep(text):
+    """
+    Parse sweep output lines `quantum=Q avg_wait=W avg_resp=R [counters…]`.
+    Returns {Q: SweepResult}; a SweepResult compares equal to (W, R).
+    """
+    results = {}
+    for line in text.splitlines():
+        if not line:
+            continue
+        fields = dict(kv.split("=", 1) for kv in line.split())
+        results[int(fields["quantum"])] = SweepResult(
+            float(fields["avg_wait"]), float(fields["avg_resp"]),
+            parse_stats(fields))
+    return results
+
+
+def run_sweep(path, quanta, exe=RR_EXE, data=None, args=()):
+    """
+    Run `rr` once on `path` for every quantum; returns {Q: (W, R)}.
+    With `data` (workload bytes) the workload is piped to `rr -` instead.
+    `args` are extra flags, e.g. ("--resume", checkpoint_path).
+    """
+    if data is not None:
+        path = "-"
+    out = subprocess.run((exe, *rr_args(), *args, path, quantum_spec(quanta)),
+                         input=data, stdout=subprocess.PIPE,
+                         check=True).stdout
+    return parse_sweep(out.decode())
+
+
+def parse_batch(text):
+    """
+    Parse `rr --batch` output into [(path, {Q: SweepResult}), …] in input
+    order.  A path that repeats or a quantum that repeats starts a new record.
+    """
+    records = []
+    for line in text.splitlines():
+        if not line:
+            continue
+        path, rest = line[len("file="):].split(" quantum=", 1)
+        row = parse_sweep("quantum=" + rest)
+        q = next(iter(row))
+        if not records or records[-1][0] != path or q in records[-1][1]:
+            records.append((path, {}))
+        records[-1][1].update(row)
+    return records
+
+
+def parse_policies(text):
+    """
+    Parse `rr --policy A,B,…` output, lines `policy=P quantum=Q …`, into
+    {P: {Q: SweepResult}}.
+    """
+    results = {}
+    for line in text.splitlines():
+        if not line:
+            continue
+        policy, rest = line[len("policy="):].split(" ", 1)
+        results.setdefault(policy, {}).update(parse_sweep(rest))
+    return results
+
+
+def run_policies(path, quanta, policies, exe=RR_EXE, data=None):
+    """
+    Run `rr --policy` once on `path` for every policy and quantum; returns
+    {P: {Q: (W, R)}}.  The workload is parsed once for all of them.
+    """
+    if data is not None:
+        path = "-"
+    policies = list(policies)
+    out = subprocess.run((exe, *rr_args(), "--policy", ",".join(policies),
+                          path, quantum_spec(quanta)),
+                         input=data, stdout=subprocess.PIPE,
+                         check=True).stdout.decode()
+    if len(policies) == 1:                     # plain sweep lines
+        return {policies[0]: parse_sweep(out)}
+    return parse_policies(out)
+
+
+def run_batch(paths, quanta, exe=RR_EXE, jobs=None):
+    """
+    Simulate every workload file in `paths` with one multithreaded
+    `rr --batch`; returns [{Q: (W, R)}, …] in the order of `paths`.
+    """
+    cmd = [exe, *rr_args(), "--batch"]
+    if jobs:
+        cmd += ["--jobs", str(jobs)]
+    out = subprocess.check_output((*cmd, quantum_spec(quanta), *paths))
+    return [row for _, row in parse_batch(out.decode())]
+
+
+def sweep_workload(tuples, quanta, exe=RR_EXE):
+    """
+    Sweep `tuples` through `rr`; returns {Q: (W, R)}.  Goes through the
+    shared `rr --serve` pool when RR_SERVER is set, otherwise pipes the
+    workload to a fresh `rr` on stdin.
+    """
+    if server_workers():
+        return shared_pool(exe).run(tuples, quanta)
+    return run_sweep("-", quanta, exe, workload_bytes(tuples))
+
+
+# ---------------------------------------------------------------------------
+#  Scheduler counters   (RR_STATS=1 runs every sweep with `rr --stats`)
+# ---------------------------------------------------------------------------
+STATS_COUNTERS = ("slices", "preemptions", "idle_jumps", "idle_time",
+                  "max_queue")
+
+
+def stats_enabled():
+    return os.environ.get("RR_STATS", "0") not in ("", "0")
+
+
+def rr_args():
+    """Extra `rr` flags every suite run should pass."""
+    return ("--stats",) if stats_enabled() else ()
+
+
+class StatsSummary:
+    """Sums `--stats` counters over many runs."""
+
+    def __init__(self):
+        self.runs = 0
+        self.totals = dict.fromkeys(("slices", "preemptions", "idle_jumps",
+                                     "idle_time"), 0)
+        self.max_queue = 0
+        self.queue_sum = 0.0
+        self.wait_hist = []
+
+    def add(self, stats):
+        if stats is None:
+            return
+        self.runs += 1
+        for k in self.totals:
+            self.totals[k] += stats[k]
+        self.max_queue = max(self.max_queue, stats["max_queue"])
+        self.queue_sum += stats["mean_queue"] * stats["slices"]
+        hist = stats["wait_hist"]
+        if len(hist) > len(self.wait_hist):
+            self.wait_hist.extend([0] * (len(hist) - len(self.wait_hist)))
+        for b, count in enumerate(hist):
+            self.wait_hist[b] += count
+
+    def as_dict(self):
+        slices = self.totals["slices"]
+        return {"runs": self.runs, **self.totals, "max_queue": self.max_queue,
+                "mean_queue": self.queue_sum / slices if slices else 0.0,
+                "wait_hist": self.wait_hist}
+
+    def report(self):
+        """One machine‑readable line in the same key=value form as `rr`."""
+        d = self.as_dict()
+        d["mean_queue"] = f"{d['mean_queue']:.2f}"
+        d["wait_hist"] = ",".join(map(str, d["wait_hist"])) or "0"
+        return " ".join(f"{k}={v}" for k, v in d.items())
+
+
+SUITE_STATS = StatsSummary()
+
+
+def record_stats(rows):
+    """
+    Fold the counters of check_case rows into SUITE_STATS.  The total is
+    printed to stderr when the interpreter exits.
+    """
+    if not SUITE_STATS.runs and stats_enabled():
+        atexit.register(_print_suite_stats)
+    for _, got, _ in rows:
+        SUITE_STATS.add(getattr(got, "stats", None))
+
+
+def _print_suite_stats():
+    if SUITE_STATS.runs:
+        print(f"rr-stats {SUITE_STATS.report()}", file=sys.stderr)
+
+
+# ---------------------------------------------------------------------------
+#  Shared `rr --serve` pool   (RR_SERVER=<workers> routes every sweep here)
+# ---------------------------------------------------------------------------
+_POOL = None
+
+
+def server_workers():
+    """Pool size requested through RR_SERVER; 0 means spawn `rr` per case."""
+    value = os.environ.get("RR_SERVER", "0")
+    return int(value) if value.isdigit() else 0
+
+
+def shared_pool(exe=RR_EXE):
+    """The one RRPool used by every suite in this process."""
+    global _POOL
+    if _POOL is None:
+        from rrpool import RRPool              # rrpool imports this module
+        _POOL = RRPool(server_workers() or None, exe, rr_args())
+        atexit.register(_POOL.close)
+    return _POOL
+
+
+# ---------------------------------------------------------------------------
+#  Parallel case runner
+# ---------------------------------------------------------------------------
+def check_case(case):
+    """
+    case = (tuples, quanta, exe).  Sweeps the workload through `rr` once and
+    returns [(q, (got_wait, got_resp), (exp_wait, exp_resp)), …]; each got
+    is a SweepResult, so under RR_STATS it also carries the counters.
+    Module level so it can be shipped to pool workers.
+    """
+    tuples, quanta, exe = case
+    got = sweep_workload(tuples, quanta, exe)
+    return [(q, got[q], cached_reference(tuples, q)) for q in quanta]
+
+
+def run_parallel(fn, items, workers=None):
+    """
+    Map `fn` over `items` on a process pool sized to the machine and return
+    the results in input order.  With one worker everything runs inline.
+    In RR_SERVER mode threads fan out over the shared `rr --serve` pool
+    instead of forking a process pool.
+    """
+    items = list(items)
+    if server_workers():
+        with ThreadPoolExecutor(max_workers=server_workers()) as ex:
+            return list(ex.map(fn, items))
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(items) <= 1:
+        return [fn(item) for item in items]
+    chunksize = max(1, len(items) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(fn, items, chunksize=chunksize))
@@ -3,79 +3,21 @@
 #   CS 111 – Lab 3  •  Comprehensive test‑suite for Round‑Robin scheduler
 # ---------------------------------------------------------------------------
 
-import subprocess, tempfile, unittest, math, random, itertools, os, textwrap
-
-# ---------------------------------------------------------------------------
-#  Build helpers
-# ---------------------------------------------------------------------------
-def _make():
-    res = subprocess.run(["make"], capture_output=True, text=True)
-    return res.returncode == 0, res.stdout + res.stderr
-
-def _make_clean():
-    subprocess.run(["make", "clean"], capture_output=True)
-
-# ---------------------------------------------------------------------------
-#  Reference Round‑Robin implementation (single function, no dependencies)
-# ---------------------------------------------------------------------------
-def rr_reference(workload, quantum):
-    """
-    workload : list[(pid, arrival_time, burst_time)]
-    quantum  : positive int
-
-    Returns (avg_wait, avg_resp) rounded to 2 decimals.
-    """
-    n = len(workload)
-    remaining = {p: b for p, a, b in workload}
-    first_cpu = {}
-    responded = set()
-    finished  = {}
-    ready, arrived, t = [], set(), 0
-
-    while len(finished) < n:
-        # Admit all arrivals up to time t
-        for p, a, _ in workload:
-            if p not in arrived and a <= t:
-                ready.append(p)
-                arrived.add(p)
-
-        if not ready:                          # CPU idle → jump to next arrival
-            t = min(a for p, a, _ in workload if p not in arrived)
-            continue
-
-        p = ready.pop(0)                       # RR: head of queue
-        if p not in responded:
-            first_cpu[p] = t
-            responded.add(p)
-
-        slice_len = min(quantum, remaining[p])
-        start     = t
-        t        += slice_len
-        remaining[p] -= slice_len
-
-        # Admit arrivals during (start, t]
-        for q, a, _ in workload:
-            if q not in arrived and start < a <= t:
-                ready.append(q)
-                arrived.add(q)
-
-        if remaining[p] > 0:                   # still needs CPU
-            ready.append(p)
-        else:                                  # done
-            finished[p] = t
-
-    total_wait = sum(finished[p] - a - b for p, a, b in workload)
-    total_resp = sum(first_cpu[p] - a       for p, a, b in workload)
-    return round(total_wait/n, 2), round(total_resp/n, 2)
-
-# ---------------------------------------------------------------------------
-#  Utility: write workload file in skeleton format
-# ---------------------------------------------------------------------------
-def _write_workload(tmp, tuples):
-    tmp.write(f"{len(tuples)}\n".encode())
-    for pid, arr, bur in tuples:
-        tmp.write(f"{pid}, {arr}, {bur}\n".encode())
-    tmp.flush()
+import subprocess, tempfile, unittest, math, random, itertools, os, textwrap, time
+
+from build import ensure_built
+from harness import (check_case, parse_batch, record_stats, run_batch,
+                     run_parallel, run_policies, run_sweep, sweep_workload,
+                     workload_bytes, write_workload)
+from rrpool import RRPool, RRServerError
+from refcache import cached_reference
+from reference import (POLICIES, _RunningMedian, exact_average,
+                       rr_checkpoint, rr_reference, rr_resume, rr_schedule)
+
+try:
+    from batchref import rr_batch
+except ImportError:                            # NumPy is optional
+    rr_batch = None
 
 # ---------------------------------------------------------------------------
 #  ORIGINAL BASIC TESTS (unchanged except for imports)
@@ -85,23 +27,18 @@ class TestLab2Basic(unittest.TestCase):
 
     @classmethod
     def setUpClass(cls):
-        cls.make_ok, cls.make_out = _make()
+        cls.make_ok, cls.make_out = ensure_built()
         cls.exe = "./rr"
 
-    @classmethod
-    def tearDownClass(cls):
-        _make_clean()
-
     # workload 1 – static file processes.txt
     def test_averages(self):
         self.assertTrue(self.make_ok, msg=self.make_out)
         file_name = "processes.txt"
         exp_wait  = (0, 5.5, 5.0, 7.0, 4.5, 5.5, 6.25, 4.75)
         exp_resp  = (0, 0.75, 1.5, 2.75, 3.25, 3.25, 4.0, 4.75)
+        results = run_sweep(file_name, range(1, 7), self.exe)
         for q in range(1, 7):
-            out = subprocess.check_output((self.exe, file_name, str(q)), text=True)
-            got_wait = float(out.splitlines()[0].split(":")[1])
-            got_resp = float(out.splitlines()[1].split(":")[1])
+            got_wait, got_resp = results[q]
             self.assertEqual(
                 (got_wait, got_resp), (exp_wait[q], exp_resp[q]),
                 msg=f"\nprocesses.txt  quantum={q}\n"
@@ -112,23 +49,31 @@ class TestLab2Basic(unittest.TestCase):
         self.assertTrue(self.make_ok, msg=self.make_out)
         exp_wait = (0, 5.0, 5.25, 6.5, 4.0, 4.5, 5.75, 4.75)
         exp_resp = (0, 0.75, 1.5, 2.25, 2.75, 3.25, 3.5, 4.75)
-        with tempfile.NamedTemporaryFile() as f:
-            f.write(
-                b"4\n"
-                b"1, 0, 7\n"
-                b"2, 3, 4\n"
-                b"3, 4, 1\n"
-                b"4, 6, 4\n"
+        data = (
+            b"4\n"
+            b"1, 0, 7\n"
+            b"2, 3, 4\n"
+            b"3, 4, 1\n"
+            b"4, 6, 4\n"
+        )
+        results = run_sweep("-", range(1, 7), self.exe, data)
+        for q in range(1, 7):
+            got_wait, got_resp = results[q]
+            self.assertEqual(
+                (got_wait, got_resp), (exp_wait[q], exp_resp[q]),
+                msg=f"\nre‑queue test  quantum={q}\n"
             )
-            f.flush()
-            for q in range(1, 7):
-                out = subprocess.check_output((self.exe, f.name, str(q)), text=True)
-                got_wait = float(out.splitlines()[0].split(":")[1])
-                got_resp = float(out.splitlines()[1].split(":")[1])
-                self.assertEqual(
-                    (got_wait, got_resp), (exp_wait[q], exp_resp[q]),
-                    msg=f"\nre‑queue test  quantum={q}\n"
-                )
+
+    # the same workload read from a pipe and from a file
+    def test_stdin_matches_file(self):
+        self.assertTrue(self.make_ok, msg=self.make_out)
+        with open("processes.txt", "rb") as f:
+            data = f.read()
+        for spec in ("3", "1-6"):
+            piped = subprocess.run((self.exe, "-", spec), input=data,
+                                   capture_output=True, check=True).stdout
+            self.assertEqual(piped, subprocess.check_output(
+                (self.exe, "processes.txt", spec)))
 
 # ---------------------------------------------------------------------------
 #  NEW STATIC EDGE‑CASE TESTS
@@ -160,35 +105,26 @@ class TestLab2EdgeCases(unittest.TestCase):
 
     @classmethod
     def setUpClass(cls):
-        cls.make_ok, cls.make_out = _make()
+        cls.make_ok, cls.make_out = ensure_built()
         cls.exe = "./rr"
 
-    @classmethod
-    def tearDownClass(cls):
-        _make_clean()
-
     def test_edge_cases(self):
         self.assertTrue(self.make_ok, msg=self.make_out)
         for name, tuples in self.WORKLOADS.items():
             with self.subTest(workload=name):
-                with tempfile.NamedTemporaryFile() as f:
-                    _write_workload(f, tuples)
-                    for q in self.QUANTA:
-                        out = subprocess.check_output(
-                            (self.exe, f.name, str(q)), text=True
-                        ).splitlines()
-                        got_wait = float(out[0].split(":")[1])
-                        got_resp = float(out[1].split(":")[1])
-                        exp_wait, exp_resp = rr_reference(tuples, q)
-                        self.assertTrue(
-                            math.isclose(got_wait, exp_wait, abs_tol=0.01) and
-                            math.isclose(got_resp, exp_resp, abs_tol=0.01),
-                            msg=(
-                                f"\nEdge‑case {name}  quantum={q}"
-                                f"\nExpected wait={exp_wait:.2f} resp={exp_resp:.2f}"
-                                f"\nGot      wait={got_wait:.2f} resp={got_resp:.2f}\n"
-                            )
+                results = sweep_workload(tuples, self.QUANTA, self.exe)
+                for q in self.QUANTA:
+                    got_wait, got_resp = results[q]
+                    exp_wait, exp_resp = cached_reference(tuples, q)
+                    self.assertTrue(
+                        math.isclose(got_wait, exp_wait, abs_tol=0.01) and
+                        math.isclose(got_resp, exp_resp, abs_tol=0.01),
+                        msg=(
+                            f"\nEdge‑case {name}  quantum={q}"
+                            f"\nExpected wait={exp_wait:.2f} resp={exp_resp:.2f}"
+                            f"\nGot      wait={got_wait:.2f} resp={got_resp:.2f}\n"
                         )
+                    )
 
 # ---------------------------------------------------------------------------
 #  RANDOM STRESS TESTS
@@ -196,78 +132,491 @@ class TestLab2EdgeCases(unittest.TestCase):
 class TestLab2StressRandom(unittest.TestCase):
     """
     50 deterministic random workloads   (seed = 0xC111).
-    Each workload has 2‑15 processes with arrivals ∈ [0,30], bursts ∈ [1,50].
-    Checked for quantum 1‑‑10.
+    Each workload has 2‑15 processes with arrivals ∈ [0,30], bursts ∈ [1,50].
+    Checked for quantum 1‑‑10, spread over a process pool.
+    Set RR_STRESS_RUNS to scale the number of workloads.
     """
 
     SEED    = 0xC111
-    NUM_RUN = 50
+    NUM_RUN = int(os.environ.get("RR_STRESS_RUNS", 50))
     QUANTA  = range(1, 11)
 
     @classmethod
     def setUpClass(cls):
-        cls.make_ok, cls.make_out = _make()
+        cls.make_ok, cls.make_out = ensure_built()
         cls.exe = "./rr"
-        random.seed(cls.SEED)
+        rng = random.Random(cls.SEED)
 
         cls.workloads = []
         for _ in range(cls.NUM_RUN):
-            n = random.randint(2, 15)
+            n = rng.randint(2, 15)
             tuples = []
             for pid in range(1, n + 1):
-                arrival = random.randint(0, 30)
-                burst   = random.randint(1, 50)
+                arrival = rng.randint(0, 30)
+                burst   = rng.randint(1, 50)
                 tuples.append((pid, arrival, burst))
             # deterministic ordering by pid to avoid duplicate pids
             cls.workloads.append(tuple(tuples))
 
+    def test_random_workloads(self):
+        self.assertTrue(self.make_ok, msg=self.make_out)
+        cases = [(tuples, list(self.QUANTA), self.exe)
+                 for tuples in self.workloads]
+        for idx, rows in enumerate(run_parallel(check_case, cases)):
+            record_stats(rows)
+            for q, (got_wait, got_resp), (exp_wait, exp_resp) in rows:
+                with self.subTest(random_id=idx, quantum=q):
+                    self.assertTrue(
+                        math.isclose(got_wait, exp_wait, abs_tol=0.01) and
+                        math.isclose(got_resp, exp_resp, abs_tol=0.01),
+                        msg=(
+                            f"\nRandom workload #{idx}  quantum={q}"
+                            f"\nExpected wait={exp_wait:.2f} resp={exp_resp:.2f}"
+                            f"\nGot      wait={got_wait:.2f} resp={got_resp:.2f}\n"
+                        )
+                    )
+
+    @unittest.skipIf(rr_batch is None, "NumPy not installed")
+    def test_batch_reference_in_one_call(self):
+        quanta = list(self.QUANTA)
+        avg_wait, avg_resp = rr_batch(self.workloads, quanta)
+        self.assertEqual(avg_wait.shape, (self.NUM_RUN, len(quanta)))
+        for idx, tuples in enumerate(self.workloads):
+            for j, q in enumerate(quanta):
+                with self.subTest(random_id=idx, quantum=q):
+                    self.assertEqual((avg_wait[idx, j], avg_resp[idx, j]),
+                                     cached_reference(tuples, q))
+
+# ---------------------------------------------------------------------------
+#  LARGE TRACES: times and totals past 2^32, averages past float precision
+# ---------------------------------------------------------------------------
+class TestLargeTotals(unittest.TestCase):
+    """
+    Random workloads with arrivals and bursts near the top of u32, so the
+    schedule runs past 2^32 and the totals need 64 bits; averages must
+    match the reference to the last printed digit.
+    """
+
+    SEED = 0xC111
+
+    @classmethod
+    def setUpClass(cls):
+        cls.make_ok, cls.make_out = ensure_built()
+        cls.exe = "./rr"
+
+    def test_random_large_workloads(self):
+        self.assertTrue(self.make_ok, msg=self.make_out)
+        rng = random.Random(self.SEED)
+        top = 2 ** 32 - 1
+        cases = []
+        for _ in range(20):
+            n = rng.randint(3, 40)
+            tuples = [(p, rng.randint(0, top), rng.randint(top // 4, top))
+                      for p in range(1, n + 1)]
+            cases.append((tuples, [rng.randint(1, top) for _ in range(3)],
+                          self.exe))
+        for idx, rows in enumerate(run_parallel(check_case, cases)):
+            tuples = cases[idx][0]
+            finish, _, _ = rr_schedule(tuples, cases[idx][1][0])
+            self.assertGreater(max(finish), 2 ** 32)
+            for q, got, exp in rows:
+                with self.subTest(random_id=idx, quantum=q):
+                    self.assertEqual(got, exp)
+
+    def test_totals_beyond_u32(self):
+        self.assertTrue(self.make_ok, msg=self.make_out)
+        tuples = [(p, 0, 2 ** 32 - 1) for p in range(1, 8)]
+        got = sweep_workload(tuples, [1, 1000, 2 ** 32 - 1])
+        for q, avg in got.items():
+            self.assertEqual(avg, cached_reference(tuples, q))
+        self.assertEqual(got[2 ** 32 - 1][0], exact_average(      # FCFS
+            sum(i * (2 ** 32 - 1) for i in range(7)), 7))
+
+    def test_exact_rounding(self):
+        self.assertEqual(exact_average(1, 8), 0.12)         # tie → even
+        self.assertEqual(exact_average(3, 8), 0.38)
+        self.assertEqual(exact_average(1, 200), 0.0)
+        self.assertEqual(exact_average(2 ** 64 - 1, 3), 6148914691236517205.0)
+
+# ---------------------------------------------------------------------------
+#  Persistent `rr --serve` workers
+# ---------------------------------------------------------------------------
+class TestServerPool(unittest.TestCase):
+    """Many requests through a couple of long‑running workers."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.make_ok, cls.make_out = ensure_built()
+        cls.exe = "./rr"
+
+    def test_pool_matches_reference(self):
+        self.assertTrue(self.make_ok, msg=self.make_out)
+        rng = random.Random(0xC111)
+        workloads = [[(p, rng.randint(0, 30), rng.randint(1, 50))
+                      for p in range(1, rng.randint(2, 15) + 1)]
+                     for _ in range(40)]
+        quanta = [1, 2, 3, 5, 8]
+        with RRPool(2, self.exe) as pool:
+            results = pool.map([(w, quanta) for w in workloads])
+        for idx, (tuples, got) in enumerate(zip(workloads, results)):
+            for q in quanta:
+                with self.subTest(random_id=idx, quantum=q):
+                    self.assertEqual(got[q], cached_reference(tuples, q))
+
+    def test_bad_request_keeps_worker_alive(self):
+        self.assertTrue(self.make_ok, msg=self.make_out)
+        with RRPool(1, self.exe) as pool:
+            with self.assertRaises(RRServerError):
+                pool.run([(1, 0, 1)], [0])
+            self.assertEqual(pool.run([(1, 0, 7), (2, 2, 4), (3, 4, 1),
+                                       (4, 5, 4)], [4]), {4: (4.5, 3.25)})
+
+# ---------------------------------------------------------------------------
+#  Batch mode: many workload files on worker threads
+# ---------------------------------------------------------------------------
+class TestBatch(unittest.TestCase):
+    """`rr --batch`: many files on worker threads, output in input order."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.make_ok, cls.make_out = ensure_built()
+        cls.exe = "./rr"
+        cls.tmp = tempfile.TemporaryDirectory()
+        rng = random.Random(0xC111)
+        cls.workloads, cls.paths = [], []
+        for idx in range(24):
+            tuples = [(p, rng.randint(0, 40), rng.randint(1, 30))
+                      for p in range(1, rng.randint(1, 40) + 1)]
+            path = os.path.join(cls.tmp.name, f"w{idx}.txt")
+            with open(path, "wb") as f:
+                write_workload(f, tuples)
+            cls.workloads.append(tuples)
+            cls.paths.append(path)
+
     @classmethod
     def tearDownClass(cls):
-        _make_clean()
+        cls.tmp.cleanup()
 
-    def test_random_workloads(self):
+    def test_batch_matches_reference(self):
         self.assertTrue(self.make_ok, msg=self.make_out)
-        for idx, tuples in enumerate(self.workloads):
-            with self.subTest(random_id=idx):
-                with tempfile.NamedTemporaryFile() as f:
-                    _write_workload(f, tuples)
-                    for q in self.QUANTA:
-                        out = subprocess.check_output(
-                            (self.exe, f.name, str(q)), text=True
-                        ).splitlines()
-                        got_wait = float(out[0].split(":")[1])
-                        got_resp = float(out[1].split(":")[1])
-                        exp_wait, exp_resp = rr_reference(tuples, q)
-                        self.assertTrue(
-                            math.isclose(got_wait, exp_wait, abs_tol=0.01) and
-                            math.isclose(got_resp, exp_resp, abs_tol=0.01),
-                            msg=(
-                                f"\nRandom workload #{idx}  quantum={q}"
-                                f"\nExpected wait={exp_wait:.2f} resp={exp_resp:.2f}"
-                                f"\nGot      wait={got_wait:.2f} resp={got_resp:.2f}\n"
-                            )
-                        )
+        quanta = [1, 3, 7]
+        rows = run_batch(self.paths, quanta, self.exe, jobs=4)
+        self.assertEqual(len(rows), len(self.paths))
+        for idx, (tuples, got) in enumerate(zip(self.workloads, rows)):
+            for q in quanta:
+                with self.subTest(random_id=idx, quantum=q):
+                    self.assertEqual(got[q], cached_reference(tuples, q))
+
+    def test_manifest_and_repeats(self):
+        self.assertTrue(self.make_ok, msg=self.make_out)
+        manifest = os.path.join(self.tmp.name, "manifest")
+        order = self.paths[:5] + self.paths[:2]
+        with open(manifest, "w") as f:
+            f.write("\n".join(order) + "\n\n")
+        out = subprocess.check_output(
+            (self.exe, "--manifest", manifest, "--jobs", "3", "2-4"),
+            text=True)
+        records = parse_batch(out)
+        self.assertEqual([p for p, _ in records], order)
+        for path, got in records:
+            self.assertEqual(got, run_sweep(path, [2, 3, 4], self.exe))
+
+    def test_rejects_trace(self):
+        self.assertTrue(self.make_ok, msg=self.make_out)
+        proc = subprocess.run((self.exe, "--batch", "--trace", "/dev/null",
+                               "2", self.paths[0]), capture_output=True)
+        self.assertNotEqual(proc.returncode, 0)
 
 # ---------------------------------------------------------------------------
-#  Invalid‑input quick check: quantum = 0 should return non‑zero
+#  Checkpoint and resume for append‑only traces
 # ---------------------------------------------------------------------------
-class TestInvalidInput(unittest.TestCase):
+class TestCheckpoint(unittest.TestCase):
+    """Resuming an append‑only trace must match a run from scratch."""
+
     @classmethod
     def setUpClass(cls):
-        cls.make_ok, cls.make_out = _make()
+        cls.make_ok, cls.make_out = ensure_built()
         cls.exe = "./rr"
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.path = os.path.join(cls.tmp.name, "state.rrck")
 
     @classmethod
     def tearDownClass(cls):
-        _make_clean()
+        cls.tmp.cleanup()
+
+    def _cases(self, seed, count):
+        rng = random.Random(seed)
+        for idx in range(count):
+            prefix = [(p, rng.randint(0, 60), rng.randint(1, 20))
+                      for p in range(1, rng.randint(1, 30) + 1)]
+            at = rng.choice((None, rng.randint(0, 150)))
+            median = idx % 3 == 0
+            yield idx, prefix, rng.randint(1, 6), at, median, rng
+
+    def test_resume_matches_full_run(self):
+        self.assertTrue(self.make_ok, msg=self.make_out)
+        for idx, prefix, q, at, median, rng in self._cases(0xC111, 60):
+            flags = ("--median",) if median else ()
+            at_flag = () if at is None else ("--at", str(at))
+            first = run_sweep("-", [q], self.exe, workload_bytes(prefix),
+                              (*flags, "--checkpoint", self.path, *at_flag))
+            with self.subTest(random_id=idx, quantum=q, at=at):
+                self.assertEqual(first[q], cached_reference(prefix, q, median))
+            since = rr_checkpoint(prefix, q, at, median).time
+            full = prefix + [(len(prefix) + i, rng.randint(since + 1, since + 80),
+                              rng.randint(1, 20))
+                             for i in range(1, rng.randint(0, 10) + 1)]
+            got = run_sweep("-", [q], self.exe, workload_bytes(full),
+                            (*flags, "--resume", self.path))
+            with self.subTest(random_id=idx, quantum=q, at=at, resumed=True):
+                self.assertEqual(got[q], cached_reference(full, q, median))
+
+    def test_reference_resume_matches_schedule(self):
+        for idx, prefix, q, at, median, rng in self._cases(0xC112, 120):
+            cp = rr_checkpoint(prefix, q, at, median)
+            if at is not None:
+                self.assertLessEqual(cp.time, at)
+            full = prefix + [(len(prefix) + 1, cp.time + rng.randint(1, 30), 5)]
+            with self.subTest(random_id=idx, quantum=q, at=at):
+                self.assertEqual(rr_resume(cp, full),
+                                 rr_schedule(full, q, median=median))
+
+    def test_rejects_early_appends(self):
+        self.assertTrue(self.make_ok, msg=self.make_out)
+        prefix = [(1, 0, 7), (2, 2, 4), (3, 4, 1), (4, 5, 4)]
+        run_sweep("-", [4], self.exe, workload_bytes(prefix),
+                  ("--checkpoint", self.path, "--at", "6"))
+        cp = rr_checkpoint(prefix, 4, 6)
+        early = prefix + [(5, cp.time, 3)]
+        proc = subprocess.run((self.exe, "--resume", self.path, "-", "4"),
+                              input=workload_bytes(early), capture_output=True)
+        self.assertNotEqual(proc.returncode, 0)
+        with self.assertRaises(ValueError):
+            rr_resume(cp, early)
+        with self.assertRaises(ValueError):      # a different prefix
+            rr_resume(cp, [(1, 0, 8)] + prefix[1:])
+
+# ---------------------------------------------------------------------------
+#  Other dispatch policies: FCFS, SJF, SRTF and MLFQ
+# ---------------------------------------------------------------------------
+class TestPolicies(unittest.TestCase):
+    """`rr --policy` must match the reference for every policy."""
+
+    PROCESSES = [(1, 0, 7), (2, 2, 4), (3, 4, 1), (4, 5, 4)]
+
+    @classmethod
+    def setUpClass(cls):
+        cls.make_ok, cls.make_out = ensure_built()
+        cls.exe = "./rr"
+
+    def test_handout_schedules(self):
+        # worked by hand; MLFQ with quanta 1, 2, 4
+        expect = {"fcfs": ([7, 11, 12, 16], [0, 7, 11, 12]),
+                  "sjf":  ([7, 12, 8, 16], [0, 8, 7, 12]),
+                  "srtf": ([16, 7, 5, 11], [0, 2, 4, 7]),
+                  "mlfq": ([14, 15, 5, 16], [0, 3, 4, 5])}
+        for policy, (finish, first_cpu) in expect.items():
+            with self.subTest(policy=policy):
+                self.assertEqual(rr_schedule(self.PROCESSES, 1,
+                                             policy=policy)[:2],
+                                 (finish, first_cpu))
+
+    def test_all_policies_in_one_run(self):
+        self.assertTrue(self.make_ok, msg=self.make_out)
+        rng = random.Random(0xC111)
+        for idx in range(40):
+            tuples = [(p, rng.choice((0, rng.randint(0, 50))), rng.randint(0, 20))
+                      for p in range(1, rng.randint(1, 30) + 1)]
+            quanta = [1, 2, 5]
+            got = run_policies("-", quanta, POLICIES, self.exe,
+                               workload_bytes(tuples))
+            self.assertEqual(sorted(got), sorted(POLICIES))
+            for policy in POLICIES:
+                for q in quanta:
+                    with self.subTest(random_id=idx, policy=policy, q=q):
+                        self.assertEqual(got[policy][q],
+                                         cached_reference(tuples, q,
+                                                          policy=policy))
+
+    def test_single_policy_keeps_output(self):
+        self.assertTrue(self.make_ok, msg=self.make_out)
+        got = run_policies("-", [2, 3], ["srtf"], self.exe,
+                           workload_bytes(self.PROCESSES))
+        self.assertEqual(got, {"srtf": {2: (3.0, 0.5), 3: (3.0, 0.5)}})
+
+    def test_mlfq_fast_forward_is_exact(self):
+        rng = random.Random(0xC112)
+        for idx in range(200):
+            tuples = [(p, rng.randint(0, 300), rng.randint(0, 500))
+                      for p in range(1, rng.randint(2, 15) + 1)]
+            for q in (1, 3):
+                with self.subTest(random_id=idx, quantum=q):
+                    self.assertEqual(
+                        rr_schedule(tuples, q, True, policy="mlfq"),
+                        rr_schedule(tuples, q, False, policy="mlfq"))
+
+    def test_mlfq_scales(self):
+        # one fast-forward check per round, not per slice: a quadratic
+        # reference takes about 30 s here
+        self.assertTrue(self.make_ok, msg=self.make_out)
+        rng = random.Random(0xC113)
+        tuples = [(p, 0, rng.randint(1, 5000)) for p in range(1, 3001)]
+        start = time.perf_counter()
+        want = rr_reference(tuples, 4, policy="mlfq")
+        self.assertLess(time.perf_counter() - start, 5)
+        got = run_policies("-", [4], ["mlfq"], self.exe,
+                           workload_bytes(tuples))
+        self.assertEqual(got["mlfq"][4], want)
+
+    def test_rejected_combinations(self):
+        self.assertTrue(self.make_ok, msg=self.make_out)
+        data = workload_bytes(self.PROCESSES)
+        for args in (("--policy", "lottery"), ("--policy", "rr,,x"),
+                     ("--policy", "sjf", "--median"),
+                     ("--policy", "sjf", "--checkpoint", os.devnull),
+                     ("--policy", "rr,sjf", "--trace", os.devnull)):
+            with self.subTest(args=args):
+                proc = subprocess.run((self.exe, *args, "-", "2"), input=data,
+                                      capture_output=True)
+                self.assertEqual(proc.returncode, 22)
+        with self.assertRaises(ValueError):
+            rr_schedule(self.PROCESSES, 2, policy="lottery")
+
+# ---------------------------------------------------------------------------
+#  Reference engine self‑checks (no binary involved)
+# ---------------------------------------------------------------------------
+class TestReference(unittest.TestCase):
+    """The shared reference must reproduce the hand‑out numbers exactly."""
+
+    PROCESSES = [(1, 0, 7), (2, 2, 4), (3, 4, 1), (4, 5, 4)]
+    EXP_WAIT  = (0, 5.5, 5.0, 7.0, 4.5, 5.5, 6.25)
+    EXP_RESP  = (0, 0.75, 1.5, 2.75, 3.25, 3.25, 4.0)
+
+    def test_handout_averages(self):
+        for q in range(1, 7):
+            self.assertEqual(rr_reference(self.PROCESSES, q),
+                             (self.EXP_WAIT[q], self.EXP_RESP[q]),
+                             msg=f"\nprocesses.txt  quantum={q}\n")
+
+    def test_window_admitted_in_file_order(self):
+        # pid 2 arrives after pid 3 but is listed first → queued first
+        finish, first_cpu, _ = rr_schedule([(1, 0, 5), (2, 3, 1), (3, 2, 1)], 5)
+        self.assertEqual(first_cpu, [0, 5, 6])
+        self.assertEqual(finish, [5, 6, 7])
+
+    def test_fast_forward_is_exact(self):
+        rng = random.Random(0xC111)
+        for idx in range(200):
+            tuples = [(p, rng.randint(0, 300), rng.randint(0, 500))
+                      for p in range(1, rng.randint(2, 15) + 1)]
+            for q in (1, 2, 7):
+                with self.subTest(random_id=idx, quantum=q):
+                    self.assertEqual(rr_schedule(tuples, q, fast_forward=True),
+                                     rr_schedule(tuples, q, fast_forward=False))
+
+    def test_fast_forward_long_bursts(self):
+        # 10⁸ one‑unit slices: only feasible if whole rounds are skipped
+        w = [(p, 0, 10_000_000 + p) for p in range(1, 11)]
+        finish, first_cpu, slices = rr_schedule(w, 1)
+        self.assertEqual(first_cpu, list(range(10)))
+        self.assertEqual(slices, sum(b for _, _, b in w))
+        self.assertEqual(max(finish), slices)
+
+    def test_drain_matches_simulation(self):
+        # a few well‑separated or overlapping waves of simultaneous arrivals
+        rng = random.Random(0xC113)
+        for idx in range(300):
+            waves = [rng.randint(0, 400) for _ in range(rng.randint(1, 4))]
+            tuples = [(p, rng.choice(waves), rng.randint(0, 40))
+                      for p in range(1, rng.randint(1, 25) + 1)]
+            for q in (1, 3, 50):
+                with self.subTest(random_id=idx, quantum=q):
+                    self.assertEqual(rr_schedule(tuples, q, fast_forward=True),
+                                     rr_schedule(tuples, q, fast_forward=False))
+
+    def test_all_at_zero_is_closed_form(self):
+        # ~10¹⁰ one‑unit slices with 2·10⁴ distinct bursts: one closed form
+        rng = random.Random(0xC111)
+        w = [(p, 0, rng.randint(1, 1_000_000)) for p in range(1, 20_001)]
+        finish, first_cpu, slices = rr_schedule(w, 1)
+        self.assertEqual(first_cpu, list(range(len(w))))
+        self.assertEqual(slices, sum(b for _, _, b in w))
+        self.assertEqual(max(finish), slices)
+        longest = max(range(len(w)), key=lambda i: (w[i][2], i))
+        self.assertEqual(finish[longest], slices)
+
+    def test_running_median_matches_sorted(self):
+        rng = random.Random(0xC111)
+        med, values = _RunningMedian(), []
+        for _ in range(2000):
+            if values and rng.random() < 0.45:
+                v = values.pop(rng.randrange(len(values)))
+                med.remove(v)
+            else:
+                v = rng.randint(0, 50)
+                values.append(v)
+                med.insert(v)
+            if values:
+                s = sorted(values)
+                mid = len(s) // 2
+                exp = s[mid] if len(s) % 2 else (s[mid - 1] + s[mid]) // 2
+                self.assertEqual(med.value(), exp)
+
+    def test_median_quantum_handout(self):
+        # q=1 first, then the median remaining time of the queue
+        finish, first_cpu, _ = rr_schedule(self.PROCESSES, 1, median=True)
+        self.assertEqual(first_cpu, [0, 7, 11, 12])
+        self.assertEqual(rr_reference(self.PROCESSES, 1, median=True),
+                         (4.75, 4.75))
+
+    def test_large_workload_is_linear(self):
+        n = 100_000
+        w = [(p, p // 4, 1 + p % 3) for p in range(1, n + 1)]
+        finish, _, slices = rr_schedule(w, 1)
+        self.assertEqual(slices, sum(b for _, _, b in w))
+        self.assertTrue(all(f is not None for f in finish))
+
+# ---------------------------------------------------------------------------
+#  Invalid‑input quick check: quantum = 0 should return non‑zero
+# ---------------------------------------------------------------------------
+class TestInvalidInput(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.make_ok, cls.make_out = ensure_built()
+        cls.exe = "./rr"
 
     def test_zero_quantum(self):
         self.assertTrue(self.make_ok, msg=self.make_out)
-        with tempfile.NamedTemporaryFile() as f:
-            _write_workload(f, [(1, 0, 1)])
-            proc = subprocess.run((self.exe, f.name, "0"))
+        proc = subprocess.run((self.exe, "-", "0"),
+                              input=workload_bytes([(1, 0, 1)]))
+        self.assertNotEqual(proc.returncode, 0,
+                            msg="Program should reject quantum=0")
+
+    def test_bad_sweep_specs(self):
+        self.assertTrue(self.make_ok, msg=self.make_out)
+        data = workload_bytes([(1, 0, 1)])
+        for spec in ("0-4", "1,0", "5-2", "1,,x", "3-"):
+            proc = subprocess.run((self.exe, "-", spec), input=data,
+                                  capture_output=True)
             self.assertNotEqual(proc.returncode, 0,
-                                msg="Program should reject quantum=0")
+                                msg=f"Program should reject {spec!r}")
+
+    def test_empty_stdin(self):
+        self.assertTrue(self.make_ok, msg=self.make_out)
+        proc = subprocess.run((self.exe, "-", "2"), input=b"",
+                              capture_output=True)
+        self.assertNotEqual(proc.returncode, 0)
+
+    def test_sweep_matches_single_runs(self):
+        self.assertTrue(self.make_ok, msg=self.make_out)
+        results = run_sweep("processes.txt", [1, 2, 4, 8], self.exe)
+        self.assertEqual(list(results), [1, 2, 4, 8])
+        for q, (got_wait, got_resp) in results.items():
+            out = subprocess.check_output(
+                (self.exe, "processes.txt", str(q)), text=True
+            ).splitlines()
+            self.assertEqual(got_wait, float(out[0].split(":")[1]))
+            self.assertEqual(got_resp, float(out[1].split(":")[1]))
 
 # ---------------------------------------------------------------------------
 #  Run with:   python3 -m unittest -v
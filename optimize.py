@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# ---------------------------------------------------------------------------
+#   CS 111 – Lab 3  •  Quantum optimizer
+# ---------------------------------------------------------------------------
+#
+#   Finds the quantum that minimises average waiting (or response) time for
+#   one workload, and returns the whole curve on the way.
+#
+#   The workload is handed to librr.so once; every candidate quantum runs
+#   against that same arrival‑sorted rrlib.Workload, on a thread pool (the
+#   C core is re‑entrant and ctypes drops the GIL while it runs).
+#
+#   Candidates that cannot change the outcome are never simulated: once
+#   the quantum reaches the longest burst no job is ever preempted, so
+#   every larger quantum schedules exactly like q = max(burst) and reuses
+#   its result.  Smaller quanta are all simulated, even when two of them
+#   happen to produce the same schedule.
+#
+#   Usage:  python3 optimize.py processes.txt 1-100 [--metric resp]
+#           (quanta as for rr: "1,2,4", "1-100" or "1-8,16,32")
+# ---------------------------------------------------------------------------
+
+import argparse
+import os
+import re
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import rrlib
+from harness import parse_quanta
+
+METRICS = ("wait", "resp")
+
+# curve: {quantum: (avg_wait, avg_resp)} for every requested quantum;
+# simulated: the quanta that actually ran
+Optimum = namedtuple("Optimum", "quantum avg_wait avg_resp curve simulated")
+
+
+def candidates(quanta, max_burst):
+    """
+    Split `quanta` into the ones worth simulating and a map from every
+    requested quantum to the simulated one whose result it shares.
+
+    Only quanta at or above max(1, `max_burst`) are collapsed, since they
+    provably never preempt.  Smaller quanta that happen to schedule
+    identically are not detected; each of them is simulated.
+    """
+    quanta = sorted(set(int(q) for q in quanta))
+    if not quanta or quanta[0] < 1:
+        raise ValueError("quanta must be positive")
+    cap = max(1, max_burst)
+    run = [q for q in quanta if q < cap]
+    if quanta[-1] >= cap:
+        run.append(min(q for q in quanta if q >= cap))
+    same_as = {q: q if q < cap else run[-1] for q in quanta}
+    return run, same_as
+
+
+def optimize(arrival, burst, quanta, metric="wait", workers=None):
+    """
+    Simulate `arrival`/`burst` for every quantum in `quanta` and return an
+    Optimum for the one with the smallest average `metric` ("wait" or
+    "resp").  Ties go to the other metric, then to the smaller quantum.
+    """
+    if metric not in METRICS:
+        raise ValueError(f"metric must be one of {METRICS}")
+    if len(burst) == 0:
+        raise ValueError("empty workload")
+    max_burst = int(burst.max()) if hasattr(burst, "max") else max(burst)
+    run, same_as = candidates(quanta, max_burst)
+    with rrlib.Workload(arrival, burst) as w:
+        workers = workers or os.cpu_count() or 1
+        with ThreadPoolExecutor(max_workers=min(workers, len(run))) as ex:
+            results = dict(zip(run, ex.map(
+                lambda q: w.run(q, per_process=False), run)))
+        n = w.size
+
+    def score(q):
+        r = results[same_as[q]]
+        first, second = ((r.total_wait, r.total_resp) if metric == "wait"
+                         else (r.total_resp, r.total_wait))
+        return first, second, q
+
+    best = min(same_as, key=score)
+    curve = {q: rrlib.averages(results[same_as[q]], n) for q in same_as}
+    return Optimum(best, *curve[best], curve, run)
+
+
+def read_workload(path):
+    """(arrival, burst) columns of a text or binary workload file."""
+    with open(path, "rb") as f:
+        data = f.read()
+    if data[:4] == b"RRWL":
+        from workload import read_binary          # needs NumPy
+        _, arrival, burst = read_binary(path)
+        return arrival, burst
+    nums = [int(x) for x in re.findall(rb"\d+", data)]
+    n = nums[0]
+    return nums[2:3 * n + 1:3], nums[3:3 * n + 1:3]
+
+
+def _main():
+    ap = argparse.ArgumentParser(description="Find the quantum with the "
+                                             "lowest average wait or response.")
+    ap.add_argument("path")
+    ap.add_argument("quanta", help='quanta as for rr: "1,2,4", "1-100" '
+                                   'or a mix')
+    ap.add_argument("--metric", choices=METRICS, default="wait")
+    ap.add_argument("--curve", action="store_true", help="print every quantum")
+    args = ap.parse_args()
+    try:
+        quanta = parse_quanta(args.quanta)
+    except ValueError as e:
+        ap.error(str(e))
+
+    best = optimize(*read_workload(args.path), quanta, args.metric)
+    if args.curve:
+        for q, (wait, resp) in best.curve.items():
+            print(f"quantum={q} avg_wait={wait:.2f} avg_resp={resp:.2f}")
+    print(f"best quantum={best.quantum} avg_wait={best.avg_wait:.2f} "
+          f"avg_resp={best.avg_resp:.2f} "
+          f"(simulated {len(best.simulated)} of {len(best.curve)})")
+
+
+if __name__ == "__main__":
+    _main()
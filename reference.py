@@ -0,0 +1,515 @@
+#!/usr/bin/env python3
+# ---------------------------------------------------------------------------
+#   CS 111 – Lab 3  •  Shared reference Round‑Robin engine
+# ---------------------------------------------------------------------------
+#
+#   One implementation of the ground‑truth scheduler for every test‑suite.
+#   Arrivals are sorted once and admitted with a moving cursor, and the
+#   ready queue is a real FIFO, so one slice costs O(1) amortised.
+#
+#   With `fast_forward` (the default) whole rounds in which nothing arrives
+#   and nothing finishes are skipped in one step, and a queue that drains
+#   before the next arrival is finished in closed form (_drain), exactly
+#   like `rr`.
+#
+#   With `median=True` the quantum is re‑chosen after every turn as the
+#   median remaining time of the queued jobs (see _RunningMedian).
+#
+#   Admission order matches `rr`: every process whose arrival falls inside
+#   the window being admitted joins the queue in *file order*, not in
+#   arrival order, and new arrivals go in front of the re‑queued process.
+#
+#   rr_checkpoint / rr_resume snapshot a schedule and continue it on a
+#   workload with processes appended, like `rr --checkpoint` / `--resume`.
+#
+#   `policy=` swaps round‑robin for FCFS, SJF, SRTF or MLFQ (see
+#   _policy_schedule), the same policies as `rr --policy`.
+# ---------------------------------------------------------------------------
+
+import argparse
+import heapq
+import random
+import time
+from collections import Counter, deque, namedtuple
+from fractions import Fraction
+
+
+class _RunningMedian:
+    """
+    Median of a multiset under insert/remove: a max‑heap for the lower half,
+    a min‑heap for the upper half, and lazy deletion so removing an
+    arbitrary value costs O(log k).  An even count averages the two middle
+    values, rounded down, like `rr --median`.
+    """
+
+    def __init__(self):
+        self.low, self.high = [], []           # low stores negated values
+        self.low_size = self.high_size = 0
+        self.dead_low, self.dead_high = Counter(), Counter()
+
+    def _prune(self, heap, dead, sign):
+        while heap and dead[sign * heap[0]]:
+            dead[sign * heap[0]] -= 1
+            heapq.heappop(heap)
+
+    def _top_low(self):
+        self._prune(self.low, self.dead_low, -1)
+        return -self.low[0]
+
+    def _top_high(self):
+        self._prune(self.high, self.dead_high, 1)
+        return self.high[0]
+
+    def _rebalance(self):
+        if self.low_size > self.high_size + 1:
+            v = self._top_low()
+            heapq.heappop(self.low)
+            heapq.heappush(self.high, v)
+            self.low_size -= 1
+            self.high_size += 1
+        elif self.high_size > self.low_size:
+            v = self._top_high()
+            heapq.heappop(self.high)
+            heapq.heappush(self.low, -v)
+            self.high_size -= 1
+            self.low_size += 1
+
+    def insert(self, v):
+        if self.low_size == 0 or v <= self._top_low():
+            heapq.heappush(self.low, -v)
+            self.low_size += 1
+        else:
+            heapq.heappush(self.high, v)
+            self.high_size += 1
+        self._rebalance()
+
+    def remove(self, v):
+        if self.low_size and v <= self._top_low():
+            self.dead_low[v] += 1
+            self.low_size -= 1
+        else:
+            self.dead_high[v] += 1
+            self.high_size -= 1
+        self._rebalance()
+
+    def value(self):
+        lower = self._top_low()
+        if self.low_size > self.high_size:
+            return lower
+        return (lower + self._top_high()) // 2
+
+
+def _fast_forward(ready, remaining, first_cpu, quantum, t, next_arrival):
+    """
+    Skip k full rounds of `ready` when no process can finish and nothing can
+    arrive during them.  Returns (new_t, k).
+    """
+    min_rem = min(remaining[p] for p in ready)
+    if min_rem <= quantum:
+        return t, 0
+    round_len = len(ready) * quantum
+    k = (min_rem - 1) // quantum
+    if next_arrival is not None:
+        k = min(k, (next_arrival - t - 1) // round_len)
+    if k == 0:
+        return t, 0
+
+    step = k * quantum
+    for j, p in enumerate(ready):
+        if first_cpu[p] is None:
+            first_cpu[p] = t + j * quantum
+        remaining[p] -= step
+    return t + k * round_len, k
+
+
+def _drain(ready, remaining, first_cpu, finish, quantum, t):
+    """
+    Finish every queued process in closed form, for when nothing arrives
+    before they are done: the queue keeps its order, a process with r left
+    takes c = ceil(r / quantum) turns (one for r = 0) and ends in round c.
+    Sorted by (c, position), round c starts after the rounds before it, and
+    process k ends after a quantum for each process ahead of it that
+    outlives round c (a Fenwick tree counts them) plus the last pieces of
+    those ahead of it ending in round c, its own included.  O(m log m), like
+    `rr`.  Returns (new_t, slices).
+    """
+    m = len(ready)
+    turns = [max(1, -(-remaining[p] // quantum)) for p in ready]
+    first = t
+    for p in ready:
+        if first_cpu[p] is None:
+            first_cpu[p] = first
+        first += min(quantum, remaining[p])
+
+    tree = [0] * (m + 1)
+    round_start, previous = t, 0
+    by_turns = sorted(range(m), key=lambda k: (turns[k], k))
+    g = 0
+    while g < m:
+        c = turns[by_turns[g]]
+        active = m - g
+        round_t = round_start + (c - previous - 1) * quantum * active
+        pieces, end = 0, g
+        while end < m and turns[by_turns[end]] == c:
+            k = by_turns[end]
+            below, i = 0, k                    # marked positions < k
+            while i > 0:
+                below += tree[i]
+                i &= i - 1
+            i = k + 1
+            while i <= m:
+                tree[i] += 1
+                i += i & -i
+            p = ready[k]
+            pieces += remaining[p] - (c - 1) * quantum
+            finish[p] = round_t + (k - below) * quantum + pieces
+            remaining[p] = 0
+            end += 1
+        round_start = round_t + (active - (end - g)) * quantum + pieces
+        previous, g = c, end
+    ready.clear()
+    return round_start, sum(turns)
+
+
+# State at a dispatch boundary (see rr_checkpoint): the schedule so far for
+# the `size` processes it covers, plus their (arrival, burst) as `prefix`.
+Checkpoint = namedtuple("Checkpoint", "time quantum current_quantum median "
+                                      "size prefix ready remaining finish "
+                                      "first_cpu slices done")
+
+
+def _schedule(workload, quantum, fast_forward, median, checkpoint_at, resume):
+    """
+    The engine behind rr_schedule, rr_checkpoint and rr_resume.  Returns a
+    Checkpoint when `checkpoint_at` is given, else (finish, first_cpu, slices).
+    """
+    if quantum < 1:
+        raise ValueError("quantum must be positive")
+
+    n = len(workload)
+    arrival   = [a for _, a, _ in workload]
+    remaining = [b for _, _, b in workload]
+    order     = sorted(range(n), key=arrival.__getitem__)   # stable
+    first_cpu = [None] * n
+    finish    = [None] * n
+    ready     = deque()
+    cursor, done, slices, t = 0, 0, 0, 0
+    until_ff = 0
+    base_quantum = quantum
+    queued = _RunningMedian() if median else None
+    if median:
+        fast_forward = False                   # rounds are not uniform
+
+    if resume is not None:
+        # everything the checkpoint covered arrived by its time, and nothing
+        # appended since has, so the cursor follows from the time
+        m = resume.size
+        if (quantum != resume.quantum or bool(median) != resume.median
+                or n < m
+                or tuple((a, b) for _, a, b in workload[:m]) != resume.prefix
+                or any(a <= resume.time for a in arrival[m:])):
+            raise ValueError("checkpoint does not match this workload")
+        remaining[:m] = resume.remaining
+        finish[:m] = resume.finish
+        first_cpu[:m] = resume.first_cpu
+        ready.extend(resume.ready)
+        if queued is not None:
+            for p in ready:
+                queued.insert(remaining[p])
+        t, done, slices = resume.time, resume.done, resume.slices
+        quantum = resume.current_quantum
+        cursor = sum(1 for a in arrival if a <= t)
+    next_arrival = arrival[order[cursor]] if cursor < n else None
+
+    def snapshot():
+        return Checkpoint(t, base_quantum, quantum, bool(median), n,
+                          tuple((a, b) for _, a, b in workload), tuple(ready),
+                          list(remaining), list(finish), list(first_cpu),
+                          slices, done)
+
+    def admit(now):
+        nonlocal cursor, next_arrival
+        end = cursor + 1
+        while end < n and arrival[order[end]] <= now:
+            end += 1
+        batch = sorted(order[cursor:end]) if end - cursor > 1 else [order[cursor]]
+        ready.extend(batch)                    # file order
+        if queued is not None:
+            for p in batch:
+                queued.insert(remaining[p])
+        cursor = end
+        next_arrival = arrival[order[end]] if end < n else None
+
+    while done < n:
+        if next_arrival is not None and next_arrival <= t:
+            admit(t)
+
+        if not ready:                          # CPU idle → jump to next arrival
+            if checkpoint_at is not None and next_arrival > checkpoint_at:
+                return snapshot()
+            t = next_arrival
+            until_ff = 0
+            continue
+
+        if fast_forward:                       # try once per round
+            if until_ff == 0:
+                # nothing arrives (or falls due) before the queue drains;
+                # a zero‑length turn at its end would see an arrival then
+                drained = t + sum(remaining[p] for p in ready)
+                zero_turn = any(remaining[p] == 0 for p in ready)
+                if ((next_arrival is None or drained < next_arrival
+                     or (drained == next_arrival and not zero_turn))
+                        and (checkpoint_at is None or drained <= checkpoint_at)):
+                    done += len(ready)
+                    t, k = _drain(ready, remaining, first_cpu, finish,
+                                  quantum, t)
+                    slices += k
+                    continue
+                # skipped rounds must not pass a pending checkpoint either
+                horizon = next_arrival
+                if checkpoint_at is not None and (
+                        horizon is None or checkpoint_at + 1 < horizon):
+                    horizon = checkpoint_at + 1
+                t, k = _fast_forward(ready, remaining, first_cpu, quantum,
+                                     t, horizon)
+                slices += k * len(ready)
+                until_ff = len(ready)
+            else:
+                until_ff -= 1
+
+        if (checkpoint_at is not None
+                and t + min(quantum, remaining[ready[0]]) > checkpoint_at):
+            return snapshot()                  # this slice could see appends
+
+        p = ready.popleft()                    # RR: head of queue
+        if queued is not None:
+            queued.remove(remaining[p])
+        if first_cpu[p] is None:
+            first_cpu[p] = t
+
+        slice_len = min(quantum, remaining[p])
+        t += slice_len
+        remaining[p] -= slice_len
+        slices += 1
+
+        if next_arrival is not None and next_arrival <= t:
+            admit(t)                           # arrivals during (start, t]
+
+        if remaining[p]:
+            ready.append(p)                    # re‑queue
+            if queued is not None:
+                queued.insert(remaining[p])
+        else:
+            finish[p] = t
+            done += 1
+
+        if queued is not None and ready:       # median policy: next quantum
+            quantum = max(1, queued.value())
+
+    if checkpoint_at is not None:
+        return snapshot()
+    return finish, first_cpu, slices
+
+
+POLICIES = ("rr", "fcfs", "sjf", "srtf", "mlfq")
+MLFQ_LEVELS = 3                                # RR_MLFQ_LEVELS
+U32_MAX = 2 ** 32 - 1
+
+
+def _policy_schedule(workload, policy, quantum, fast_forward):
+    """
+    The non‑round‑robin policies, with the dispatch decision behind four
+    small functions like rr's ready set.  FCFS, SJF and SRTF keep a heap of
+    (key, arrival, index): key is the arrival, the burst or the remaining
+    time, and SRTF decides again at every arrival.  MLFQ keeps a FIFO per
+    level with quantum * 2^level; arrivals enter level 0, a process that
+    uses its whole slice drops a level, and the highest non‑empty level
+    runs next.  Returns (finish, first_cpu, slices).
+    """
+    if quantum < 1:
+        raise ValueError("quantum must be positive")
+    if policy not in POLICIES[1:]:
+        raise ValueError(f"unknown policy {policy!r}")
+
+    n = len(workload)
+    arrival   = [a for _, a, _ in workload]
+    burst     = [b for _, _, b in workload]
+    remaining = list(burst)
+    order     = sorted(range(n), key=arrival.__getitem__)   # stable
+    first_cpu = [None] * n
+    finish    = [None] * n
+    cursor, done, slices, t = 0, 0, 0, 0
+    until_ff = 0
+
+    heap, levels, level = [], [deque() for _ in range(MLFQ_LEVELS)], [0] * n
+    level_quanta = [min(quantum << l, U32_MAX) for l in range(MLFQ_LEVELS)]
+    key = {"fcfs": arrival, "sjf": burst, "srtf": remaining}.get(policy)
+
+    def push(p):
+        if policy == "mlfq":
+            levels[level[p]].append(p)
+        else:
+            heapq.heappush(heap, (key[p], arrival[p], p))
+
+    def pop():
+        if policy == "mlfq":
+            return next(q for q in levels if q).popleft()
+        return heapq.heappop(heap)[2]
+
+    def slice_for(p):
+        if policy == "mlfq":
+            return min(remaining[p], level_quanta[level[p]])
+        return remaining[p]
+
+    def requeue(p):
+        if policy == "mlfq":
+            level[p] = min(level[p] + 1, MLFQ_LEVELS - 1)
+        push(p)
+
+    def admit(now):
+        nonlocal cursor
+        end = cursor
+        while end < n and arrival[order[end]] <= now:
+            end += 1
+        for p in sorted(order[cursor:end]):    # file order, as in rr
+            push(p)
+        cursor = end
+
+    while done < n:
+        admit(t)
+        if not heap and not any(levels):       # CPU idle → jump to next arrival
+            t = arrival[order[cursor]]
+            continue
+
+        bottom = levels[-1]
+        if (policy == "mlfq" and fast_forward and bottom
+                and not any(levels[:-1])):     # round‑robin until an arrival
+            if until_ff == 0:                  # try once per round
+                t, k = _fast_forward(bottom, remaining, first_cpu,
+                                     level_quanta[-1], t,
+                                     arrival[order[cursor]] if cursor < n
+                                     else None)
+                slices += k * len(bottom)
+                until_ff = len(bottom)
+            else:
+                until_ff -= 1
+
+        p = pop()
+        if first_cpu[p] is None:
+            first_cpu[p] = t
+        slice_len = slice_for(p)
+        if policy == "srtf" and cursor < n:    # decide again at the arrival
+            slice_len = min(slice_len, arrival[order[cursor]] - t)
+        t += slice_len
+        remaining[p] -= slice_len
+        slices += 1
+        admit(t)
+
+        if remaining[p]:
+            requeue(p)
+        else:
+            finish[p] = t
+            done += 1
+
+    return finish, first_cpu, slices
+
+
+def rr_schedule(workload, quantum, fast_forward=True, median=False,
+                policy="rr"):
+    """
+    workload : list[(pid, arrival_time, burst_time)]
+    quantum  : positive int (the first quantum when `median` is set; the
+               level‑0 quantum for MLFQ; ignored by FCFS, SJF and SRTF)
+    policy   : one of POLICIES; `median` applies to "rr" only
+
+    Returns (finish, first_cpu, slices): two lists indexed like `workload`
+    and the number of dispatches performed (skipped rounds included).
+    """
+    if policy != "rr":
+        return _policy_schedule(workload, policy, quantum, fast_forward)
+    return _schedule(workload, quantum, fast_forward, median, None, None)
+
+
+def rr_checkpoint(workload, quantum, at=None, median=False, fast_forward=True):
+    """
+    Snapshot of the schedule at the last dispatch boundary at or before
+    time `at` (default: the end), exactly where `rr --checkpoint` takes it:
+    just before the first slice that would end after `at`, or before an
+    idle jump past it.  Its `time` is when the snapshot was taken.
+    """
+    return _schedule(workload, quantum, fast_forward, median,
+                     float("inf") if at is None else at, None)
+
+
+def rr_resume(checkpoint, workload, fast_forward=True):
+    """
+    rr_schedule(workload, …) continued from `checkpoint`.  `workload` must
+    begin with the processes the checkpoint covered, and everything after
+    them must arrive after `checkpoint.time`; raises ValueError otherwise.
+    """
+    return _schedule(workload, checkpoint.quantum, fast_forward,
+                     checkpoint.median, None, checkpoint)
+
+
+def rr_totals(workload, quantum, fast_forward=True, median=False,
+              policy="rr"):
+    """Returns (total_wait, total_resp) as exact integers."""
+    finish, first_cpu, _ = rr_schedule(workload, quantum, fast_forward, median,
+                                       policy)
+    total_wait = sum(f - a - b for f, (_, a, b) in zip(finish, workload))
+    total_resp = sum(s - a for s, (_, a, _) in zip(first_cpu, workload))
+    return total_wait, total_resp
+
+
+def exact_average(total, n):
+    """
+    total / n rounded to 2 decimals on the exact fraction, ties to even,
+    as `rr` prints it.  Stays exact for totals far beyond 2^53.
+    """
+    if n == 0:
+        return 0.0
+    return float(round(Fraction(total, n), 2))
+
+
+def rr_reference(workload, quantum, median=False, policy="rr"):
+    """
+    Ground‑truth averages for `workload` under round‑robin with `quantum`
+    (or median‑quantum round‑robin starting from `quantum`), or under
+    another of POLICIES.  Returns (avg_wait, avg_resp) rounded to 2 decimals.
+    """
+    n = len(workload)
+    total_wait, total_resp = rr_totals(workload, quantum, median=median,
+                                       policy=policy)
+    return exact_average(total_wait, n), exact_average(total_resp, n)
+
+
+# ---------------------------------------------------------------------------
+#  Scaling demo:   python3 reference.py [--max-exp 6] [--quantum 1]
+# ---------------------------------------------------------------------------
+def _random_workload(n, rng, max_arrival, max_burst):
+    return [(pid, rng.randint(0, max_arrival), rng.randint(1, max_burst))
+            for pid in range(1, n + 1)]
+
+
+def _main():
+    ap = argparse.ArgumentParser(description="Time rr_reference as n grows.")
+    ap.add_argument("--min-exp", type=int, default=3)
+    ap.add_argument("--max-exp", type=int, default=6)
+    ap.add_argument("--quantum", type=int, default=1)
+    ap.add_argument("--max-burst", type=int, default=4)
+    ap.add_argument("--seed", type=int, default=0xC111)
+    args = ap.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"{'n':>10} {'slices':>12} {'seconds':>9} {'slices/s':>12}")
+    for e in range(args.min_exp, args.max_exp + 1):
+        for n in (10 ** e, 2 * 10 ** e):
+            w = _random_workload(n, rng, n, args.max_burst)
+            t0 = time.perf_counter()
+            _, _, slices = rr_schedule(w, args.quantum)
+            dt = time.perf_counter() - t0
+            print(f"{n:>10} {slices:>12} {dt:>9.3f} {slices / dt:>12.0f}")
+
+
+if __name__ == "__main__":
+    _main()
@@ -1,34 +1,48 @@
 #include <errno.h>
 #include <fcntl.h>
+#include <getopt.h>
+#include <inttypes.h>
+#include <pthread.h>
 #include <stdbool.h>
 #include <stdint.h>
 #include <stdio.h>
 #include <stdlib.h>
-#include <sys/queue.h>
+#include <string.h>
 #include <sys/mman.h>
+#include <sys/resource.h>
 #include <sys/stat.h>
+#include <time.h>
 #include <unistd.h>
 
-typedef uint32_t u32;
-typedef int32_t i32;
+#include "rrcore.h"
 
-struct process
+/* The parsed workload file, one array per column. */
+struct process_table
 {
-  u32 pid;
-  u32 arrival_time;
-  u32 burst_time;
+  u32  size;
+  u32 *pid;
+  u32 *arrival_time;
+  u32 *burst_time;
 
-  TAILQ_ENTRY(process) pointers;
-
-  /* Additional fields here */
-  u32  remaining_time;
-  u32  first_run_time;
-  bool started;
-  bool arrived;
-  /* End of "Additional fields here" */
+  void  *mapping;      /* binary workloads point straight into this */
+  size_t mapping_size;
+  bool   buffered;     /* mapping was read() into the heap, not mmap()ed */
 };
 
-TAILQ_HEAD(process_list, process);
+/*
+ * Binary workload format, all fields little-endian:
+ *
+ *   offset  0  char[4]  magic "RRWL"
+ *   offset  4  u32      version (1)
+ *   offset  8  u64      count
+ *   offset 16  u32[count] pid, then u32[count] arrival, then u32[count] burst
+ *
+ * Columns rather than interleaved records, so the scheduler core can use
+ * the mapped file as its arrival/burst arrays without parsing or copying.
+ */
+#define RRWL_MAGIC "RRWL"
+#define RRWL_VERSION 1
+#define RRWL_HEADER_SIZE 16
 
 u32 next_int(const char **data, const char *data_end)
 {
@@ -62,6 +76,10 @@ u32 next_int(const char **data, const char *data_end)
     ++(*data);
   }
 
+  if (started) /* the last number may end the file */
+  {
+    return current;
+  }
   printf("Reached end of file while looking for another integer\n");
   exit(EINVAL);
 }
@@ -92,11 +110,89 @@ u32 next_int_from_c_str(const char *data)
   return current;
 }
 
-void init_processes(const char *path,
-                    struct process **process_data,
-                    u32 *process_size)
+bool map_binary_processes(const char *data_start,
+                          size_t size,
+                          struct process_table *table)
+{
+  if (size < RRWL_HEADER_SIZE || memcmp(data_start, RRWL_MAGIC, 4) != 0)
+  {
+    return false;
+  }
+
+#if __BYTE_ORDER__ != __ORDER_LITTLE_ENDIAN__
+  fprintf(stderr, "binary workloads need a little-endian host\n");
+  exit(ENOTSUP);
+#endif
+
+  u32 version;
+  uint64_t count;
+  memcpy(&version, data_start + 4, sizeof(version));
+  memcpy(&count, data_start + 8, sizeof(count));
+  if (version != RRWL_VERSION || count > UINT32_MAX ||
+      size < RRWL_HEADER_SIZE + 3 * sizeof(u32) * count)
+  {
+    fprintf(stderr, "Malformed binary workload\n");
+    exit(EINVAL);
+  }
+
+  table->size = (u32)count;
+  table->pid = (u32 *)(data_start + RRWL_HEADER_SIZE);
+  table->arrival_time = table->pid + count;
+  table->burst_time = table->arrival_time + count;
+  return true;
+}
+
+/*
+ * Reads all of fd into a heap buffer, for input that cannot be mapped
+ * (pipes, terminals, sockets).  The buffer doubles as it fills.
+ */
+char *read_all(int fd, size_t *size)
+{
+  size_t capacity = 1 << 16;
+  size_t used = 0;
+  char *buffer = malloc(capacity);
+  for (;;)
+  {
+    if (buffer == NULL)
+    {
+      int err = errno;
+      perror("malloc");
+      exit(err);
+    }
+    ssize_t got = read(fd, buffer + used, capacity - used);
+    if (got == -1)
+    {
+      if (errno == EINTR)
+      {
+        continue;
+      }
+      int err = errno;
+      perror("read");
+      exit(err);
+    }
+    if (got == 0)
+    {
+      break;
+    }
+    used += got;
+    if (used == capacity)
+    {
+      capacity *= 2;
+      buffer = realloc(buffer, capacity);
+    }
+  }
+  *size = used;
+  return buffer;
+}
+
+/*
+ * Loads the workload at path, or on stdin when path is "-".  Regular files
+ * are mmapped; anything mmap refuses is read into a buffer instead, so
+ * callers can pipe a workload in without writing it to disk first.
+ */
+void init_processes(const char *path, struct process_table *table)
 {
-  int fd = open(path, O_RDONLY);
+  int fd = strcmp(path, "-") == 0 ? STDIN_FILENO : open(path, O_RDONLY);
   if (fd == -1)
   {
     int err = errno;
@@ -112,143 +208,1170 @@ void init_processes(const char *path,
     exit(err);
   }
 
-  u32 size = st.st_size;
-  const char *data_start = mmap(NULL, size, PROT_READ, MAP_PRIVATE, fd, 0);
-  if (data_start == MAP_FAILED)
+  size_t size = st.st_size; /* may exceed 4 GiB */
+  const char *data_start = MAP_FAILED;
+  if (S_ISREG(st.st_mode) && size > 0)
   {
-    int err = errno;
-    perror("mmap");
-    exit(err);
+    data_start = mmap(NULL, size, PROT_READ, MAP_PRIVATE, fd, 0);
+  }
+  bool buffered = data_start == MAP_FAILED;
+  if (buffered)
+  {
+    data_start = read_all(fd, &size);
+  }
+  if (fd != STDIN_FILENO)
+  {
+    close(fd);
+  }
+
+  table->mapping = NULL;
+  table->mapping_size = 0;
+  table->buffered = buffered;
+  if (map_binary_processes(data_start, size, table))
+  {
+    table->mapping = (void *)data_start;
+    table->mapping_size = size;
+    return;
   }
 
   const char *data_end = data_start + size;
   const char *data = data_start;
 
-  *process_size = next_int(&data, data_end);
+  u32 count = next_int(&data, data_end);
+  /* every process takes at least three digits and three separators, so a
+     count the rest of the file cannot hold is rejected before allocating */
+  if ((size_t)(data_end - data) < 6 * (size_t)count)
+  {
+    printf("Reached end of file while looking for another integer\n");
+    exit(EINVAL);
+  }
 
-  *process_data = calloc(sizeof(struct process), *process_size);
-  if (*process_data == NULL)
+  table->size = count;
+  table->pid = calloc(sizeof(u32), 3 * (size_t)count + 1);
+  if (table->pid == NULL)
   {
     int err = errno;
     perror("calloc");
     exit(err);
   }
+  table->arrival_time = table->pid + count;
+  table->burst_time = table->arrival_time + count;
 
-  for (u32 i = 0; i < *process_size; ++i)
+  for (u32 i = 0; i < count; ++i)
   {
-    (*process_data)[i].pid = next_int(&data, data_end);
-    (*process_data)[i].arrival_time = next_int(&data, data_end);
-    (*process_data)[i].burst_time = next_int(&data, data_end);
+    table->pid[i] = next_int(&data, data_end);
+    table->arrival_time[i] = next_int(&data, data_end);
+    table->burst_time[i] = next_int(&data, data_end);
   }
 
-  munmap((void *)data, size);
-  close(fd);
+  if (buffered)
+  {
+    free((void *)data_start);
+  }
+  else
+  {
+    munmap((void *)data_start, size);
+  }
 }
 
-int main(int argc, char *argv[])
+void free_processes(struct process_table *table)
 {
-  if (argc != 3)
+  if (table->mapping != NULL && table->buffered)
   {
-    return EINVAL;
+    free(table->mapping);
+  }
+  else if (table->mapping != NULL)
+  {
+    munmap(table->mapping, table->mapping_size);
+  }
+  else
+  {
+    free(table->pid);
+  }
+}
+
+/*
+ * Parses a quantum spec: a single value ("4"), a list ("1,2,4,8"), a range
+ * ("1-16") or any mix of them ("1-4,8,16").  Every quantum must be >= 1.
+ * Returns NULL for a malformed spec.
+ */
+u32 *parse_quanta(const char *spec, u32 *count)
+{
+  if (spec[strspn(spec, "0123456789,-")] != '\0')
+  {
+    return NULL;
   }
-  struct process *data;
-  u32 size;
-  init_processes(argv[1], &data, &size);
 
-  u32 quantum_length = next_int_from_c_str(argv[2]);
+  char *copy = strdup(spec);
+  u32 capacity = 16;
+  u32 *quanta = malloc(sizeof(u32) * capacity);
+  if (copy == NULL || quanta == NULL)
+  {
+    int err = errno;
+    perror("malloc");
+    exit(err);
+  }
+  *count = 0;
 
-  struct process_list list;
-  TAILQ_INIT(&list);
+  char *save = NULL;
+  for (char *item = strtok_r(copy, ",", &save); item != NULL;
+       item = strtok_r(NULL, ",", &save))
+  {
+    u32 low, high;
+    char *dash = strchr(item, '-');
+    if (dash != NULL && strrchr(item, '-') != dash)
+    {
+      *count = 0;
+      break;
+    }
+    if (dash != NULL)
+    {
+      *dash = '\0';
+      low = next_int_from_c_str(item);
+      high = next_int_from_c_str(dash + 1);
+    }
+    else
+    {
+      low = high = next_int_from_c_str(item);
+    }
+    if (low == 0 || high < low)
+    {
+      *count = 0;
+      break;
+    }
 
-  u32 total_waiting_time = 0;
-  u32 total_response_time = 0;
+    for (uint64_t q = low; q <= high; ++q)
+    {
+      if (*count == capacity)
+      {
+        capacity *= 2;
+        quanta = realloc(quanta, sizeof(u32) * capacity);
+        if (quanta == NULL)
+        {
+          int err = errno;
+          perror("realloc");
+          exit(err);
+        }
+      }
+      quanta[(*count)++] = (u32)q;
+    }
+  }
 
-  /* Your code here */
-  for (u32 i = 0; i < size; ++i)
+  free(copy);
+  if (*count == 0)
   {
-    data[i].remaining_time = data[i].burst_time;
-    data[i].first_run_time = 0;
-    data[i].started = false;
-    data[i].arrived = false;
+    free(quanta);
+    return NULL;
   }
+  return quanta;
+}
+
+/* Names for --policy, indexed by enum rr_policy. */
+const char *const policy_names[RR_POLICY_COUNT] = {"rr", "fcfs", "sjf",
+                                                   "srtf", "mlfq"};
 
-  u32 time_now  = 0;
-  u32 completed = 0;
+/*
+ * Parses a policy list for --policy: names from policy_names separated by
+ * commas ("rr,srtf"), or "all".  Returns NULL for an unknown name.
+ */
+enum rr_policy *parse_policies(const char *spec, u32 *count)
+{
+  char *copy = strdup(spec);
+  u32 capacity = RR_POLICY_COUNT;
+  enum rr_policy *policies = malloc(sizeof(enum rr_policy) * capacity);
+  if (copy == NULL || policies == NULL)
+  {
+    int err = errno;
+    perror("malloc");
+    exit(err);
+  }
+  *count = 0;
 
-  while (completed < size)
+  char *save = NULL;
+  for (char *item = strtok_r(copy, ",", &save); item != NULL;
+       item = strtok_r(NULL, ",", &save))
   {
-    for (u32 i = 0; i < size; ++i)
+    u32 p = 0;
+    while (p < RR_POLICY_COUNT && strcmp(item, policy_names[p]) != 0)
+    {
+      ++p;
+    }
+    if (p == RR_POLICY_COUNT && strcmp(item, "all") != 0)
     {
-      if (!data[i].arrived && data[i].arrival_time <= time_now)
+      *count = 0;
+      break;
+    }
+    u32 first = p == RR_POLICY_COUNT ? 0 : p;
+    u32 last = p == RR_POLICY_COUNT ? RR_POLICY_COUNT - 1 : p;
+    for (u32 q = first; q <= last; ++q)
+    {
+      if (*count == capacity)
       {
-        TAILQ_INSERT_TAIL(&list, &data[i], pointers);
-        data[i].arrived = true;
+        capacity *= 2;
+        policies = realloc(policies, sizeof(enum rr_policy) * capacity);
+        if (policies == NULL)
+        {
+          int err = errno;
+          perror("realloc");
+          exit(err);
+        }
       }
+      policies[(*count)++] = (enum rr_policy)q;
+    }
+  }
+
+  free(copy);
+  if (*count == 0)
+  {
+    free(policies);
+    return NULL;
+  }
+  return policies;
+}
+
+/*
+ * Appends the --stats counters to a sweep line as more key=value fields.
+ * wait_hist lists the histogram buckets up to the last non-empty one.
+ */
+void print_stats(FILE *out, const struct rr_stats *stats)
+{
+  double mean_queue = stats->slices == 0
+                          ? 0.0
+                          : (double)stats->queue_length_sum /
+                                (double)stats->slices;
+  fprintf(out,
+          " slices=%" PRIu64 " preemptions=%" PRIu64 " idle_jumps=%" PRIu64
+          " idle_time=%" PRIu64 " max_queue=%u mean_queue=%.2f wait_hist=",
+          stats->slices, stats->preemptions, stats->idle_jumps,
+          stats->idle_time, stats->max_queue, mean_queue);
+  u32 last = 0;
+  for (u32 b = 0; b < RR_WAIT_BUCKETS; ++b)
+  {
+    if (stats->wait_histogram[b] != 0)
+    {
+      last = b;
+    }
+  }
+  for (u32 b = 0; b <= last; ++b)
+  {
+    fprintf(out, b == 0 ? "%" PRIu64 : ",%" PRIu64, stats->wait_histogram[b]);
+  }
+}
+
+/*
+ * Writes total / size to two decimals, exactly: integer arithmetic with
+ * ties rounded to even, so no total is too large to print correctly.
+ */
+void format_average(char *buffer, size_t length, u64 total, u32 size)
+{
+  if (size == 0)
+  {
+    snprintf(buffer, length, "0.00");
+    return;
+  }
+  u64 whole = total / size;
+  u64 scaled = (total % size) * 100; /* < 100 * 2^32, no overflow */
+  u64 cents = scaled / size;
+  u64 rest = scaled % size;
+  if (2 * rest > size || (2 * rest == size && cents % 2 == 1))
+  {
+    ++cents;
+  }
+  if (cents == 100)
+  {
+    ++whole;
+    cents = 0;
+  }
+  snprintf(buffer, length, "%" PRIu64 ".%02" PRIu64, whole, cents);
+}
+
+/* stats is NULL unless --stats was given, which implies the sweep format. */
+void print_result(FILE *out, u32 quantum, const struct rr_result *result,
+                  u32 size, bool sweep, const struct rr_stats *stats)
+{
+  char avg_wait[32];
+  char avg_resp[32];
+  format_average(avg_wait, sizeof(avg_wait), result->total_waiting_time, size);
+  format_average(avg_resp, sizeof(avg_resp), result->total_response_time,
+                 size);
+  if (sweep || stats != NULL)
+  {
+    fprintf(out, "quantum=%u avg_wait=%s avg_resp=%s",
+            quantum, avg_wait, avg_resp);
+    if (stats != NULL)
+    {
+      print_stats(out, stats);
+    }
+    fputc('\n', out);
+  }
+  else
+  {
+    fprintf(out, "Average waiting time: %s\n", avg_wait);
+    fprintf(out, "Average response time: %s\n", avg_resp);
+  }
+}
+
+/*
+ * Trace file written by --trace, all fields in host byte order
+ * (little-endian on every machine this builds on):
+ *
+ *   offset  0  char[4]  magic "RRTR"
+ *   offset  4  u32      version (2: 64-bit start times)
+ *   offset  8  u32      quantum
+ *   offset 12  u32      process count
+ *   offset 16  struct rr_event[]  {u64 start, u32 pid, u32 length,
+ *                                 u32 flags, u32 reserved}, one per
+ *                                 dispatch, in time order, to end of file
+ */
+#define RRTR_MAGIC "RRTR"
+#define RRTR_VERSION 2
+#define TRACE_BUFFER_EVENTS 65536
+
+struct trace_file
+{
+  FILE *out;
+  const u32 *pid;
+};
+
+/* rr_trace flush callback: index -> pid, then one bulk write. */
+int write_trace(struct rr_trace *trace)
+{
+  struct trace_file *file = trace->context;
+  for (u32 i = 0; i < trace->count; ++i)
+  {
+    trace->events[i].process = file->pid[trace->events[i].process];
+  }
+  if (fwrite(trace->events, sizeof(struct rr_event), trace->count,
+             file->out) != trace->count)
+  {
+    return errno != 0 ? errno : EIO;
+  }
+  trace->count = 0;
+  return 0;
+}
+
+FILE *open_trace(const char *path, u32 quantum, u32 size)
+{
+  FILE *out = fopen(path, "wb");
+  if (out == NULL)
+  {
+    int err = errno;
+    perror("fopen");
+    exit(err);
+  }
+  u32 header[3] = {RRTR_VERSION, quantum, size};
+  if (fwrite(RRTR_MAGIC, 4, 1, out) != 1 ||
+      fwrite(header, sizeof(header), 1, out) != 1)
+  {
+    int err = errno;
+    perror("fwrite");
+    exit(err);
+  }
+  return out;
+}
+
+/*
+ * Checkpoint file written by --checkpoint and read by --resume, in host
+ * byte order like the trace:
+ *
+ *   offset  0  char[4]  magic "RRCK"
+ *   offset  4  u32      version (1)
+ *   offset  8  u64[11]  time_now, total_waiting_time, total_response_time,
+ *                       workload_hash, size, completed, quantum_length,
+ *                       current_quantum, median_quantum, has_stats,
+ *                       queue_count
+ *   offset 96  struct rr_stats, then u32 queue[queue_count],
+ *              u32 remaining[size], u64 started[(size + 63) / 64]
+ */
+#define RRCK_MAGIC "RRCK"
+#define RRCK_VERSION 1
+#define RRCK_FIELDS 11
+
+void save_checkpoint(const char *path, const struct rr_checkpoint *checkpoint)
+{
+  FILE *out = fopen(path, "wb");
+  if (out == NULL)
+  {
+    int err = errno;
+    perror("fopen");
+    exit(err);
+  }
+  u32 version = RRCK_VERSION;
+  u64 fields[RRCK_FIELDS] = {
+      checkpoint->time_now,        checkpoint->total_waiting_time,
+      checkpoint->total_response_time, checkpoint->workload_hash,
+      checkpoint->size,            checkpoint->completed,
+      checkpoint->quantum_length,  checkpoint->current_quantum,
+      checkpoint->median_quantum,  checkpoint->has_stats,
+      checkpoint->queue_count,
+  };
+  size_t words = ((size_t)checkpoint->size + 63) / 64;
+  if (fwrite(RRCK_MAGIC, 4, 1, out) != 1 ||
+      fwrite(&version, sizeof(version), 1, out) != 1 ||
+      fwrite(fields, sizeof(fields), 1, out) != 1 ||
+      fwrite(&checkpoint->stats, sizeof(checkpoint->stats), 1, out) != 1 ||
+      fwrite(checkpoint->queue, sizeof(u32), checkpoint->queue_count, out) !=
+          checkpoint->queue_count ||
+      fwrite(checkpoint->remaining, sizeof(u32), checkpoint->size, out) !=
+          checkpoint->size ||
+      fwrite(checkpoint->started, sizeof(u64), words, out) != words ||
+      fclose(out) != 0)
+  {
+    int err = errno;
+    perror("fwrite");
+    exit(err);
+  }
+}
+
+void load_checkpoint(const char *path, struct rr_checkpoint *checkpoint)
+{
+  FILE *in = fopen(path, "rb");
+  if (in == NULL)
+  {
+    int err = errno;
+    perror("fopen");
+    exit(err);
+  }
+  char magic[4];
+  u32 version;
+  u64 fields[RRCK_FIELDS];
+  if (fread(magic, 4, 1, in) != 1 || memcmp(magic, RRCK_MAGIC, 4) != 0 ||
+      fread(&version, sizeof(version), 1, in) != 1 ||
+      version != RRCK_VERSION ||
+      fread(fields, sizeof(fields), 1, in) != 1 ||
+      fields[4] > UINT32_MAX || fields[10] > fields[4] ||
+      fread(&checkpoint->stats, sizeof(checkpoint->stats), 1, in) != 1)
+  {
+    fprintf(stderr, "Malformed checkpoint\n");
+    exit(EINVAL);
+  }
+  checkpoint->time_now = fields[0];
+  checkpoint->total_waiting_time = fields[1];
+  checkpoint->total_response_time = fields[2];
+  checkpoint->workload_hash = fields[3];
+  checkpoint->size = (u32)fields[4];
+  checkpoint->completed = (u32)fields[5];
+  checkpoint->quantum_length = (u32)fields[6];
+  checkpoint->current_quantum = (u32)fields[7];
+  checkpoint->median_quantum = fields[8] != 0;
+  checkpoint->has_stats = fields[9] != 0;
+  checkpoint->queue_count = (u32)fields[10];
+
+  u32 size = checkpoint->size;
+  size_t words = ((size_t)size + 63) / 64;
+  checkpoint->queue = malloc(sizeof(u32) * (size ? size : 1));
+  checkpoint->remaining = malloc(sizeof(u32) * (size ? size : 1));
+  checkpoint->started = malloc(sizeof(u64) * (words ? words : 1));
+  if (checkpoint->queue == NULL || checkpoint->remaining == NULL ||
+      checkpoint->started == NULL)
+  {
+    int err = errno;
+    perror("malloc");
+    exit(err);
+  }
+  if (fread(checkpoint->queue, sizeof(u32), checkpoint->queue_count, in) !=
+          checkpoint->queue_count ||
+      fread(checkpoint->remaining, sizeof(u32), size, in) != size ||
+      fread(checkpoint->started, sizeof(u64), words, in) != words)
+  {
+    fprintf(stderr, "Malformed checkpoint\n");
+    exit(EINVAL);
+  }
+  for (u32 j = 0; j < checkpoint->queue_count; ++j)
+  {
+    if (checkpoint->queue[j] >= size)
+    {
+      fprintf(stderr, "Malformed checkpoint\n");
+      exit(EINVAL);
     }
+  }
+  fclose(in);
+}
+
+/* Monotonic wall-clock seconds, for --timing. */
+double now_seconds(void)
+{
+  struct timespec ts;
+  clock_gettime(CLOCK_MONOTONIC, &ts);
+  return (double)ts.tv_sec + (double)ts.tv_nsec / 1e9;
+}
 
-    if (TAILQ_EMPTY(&list))
+/*
+ * Peak resident set size in KiB, for --timing.  Prefers VmHWM, which only
+ * covers this program's image: ru_maxrss also counts whatever the parent
+ * had mapped before exec.
+ */
+long peak_rss_kb(void)
+{
+  long kb = -1;
+  FILE *status = fopen("/proc/self/status", "r");
+  if (status != NULL)
+  {
+    char line[128];
+    while (fgets(line, sizeof line, status) != NULL)
     {
-      u32 next = UINT32_MAX;
-      for (u32 i = 0; i < size; ++i)
+      if (sscanf(line, "VmHWM: %ld", &kb) == 1)
       {
-        if (!data[i].arrived && data[i].arrival_time < next)
-        {
-          next = data[i].arrival_time;
-        }
+        break;
+      }
+    }
+    fclose(status);
+  }
+  if (kb < 0)
+  {
+    struct rusage usage;
+    getrusage(RUSAGE_SELF, &usage);
+#ifdef __APPLE__
+    kb = usage.ru_maxrss / 1024;
+#else
+    kb = usage.ru_maxrss;
+#endif
+  }
+  return kb;
+}
+
+/*
+ * Reads the next unsigned integer from stream, skipping any separators.
+ * Returns false at end of input.
+ */
+bool read_u32(FILE *stream, u32 *value)
+{
+  int c;
+  while ((c = getc_unlocked(stream)) != EOF && (c < 0x30 || c > 0x39))
+  {
+  }
+  if (c == EOF)
+  {
+    return false;
+  }
+  u32 current = c - 0x30;
+  while ((c = getc_unlocked(stream)) != EOF && c >= 0x30 && c <= 0x39)
+  {
+    current = current * 10 + (c - 0x30);
+  }
+  *value = current;
+  return true;
+}
+
+/*
+ * Server mode: answers framed requests on stdin until it is closed.
+ *
+ *   request:  "run <quanta-spec> <count>\n" then <count> lines
+ *             "<pid>, <arrival>, <burst>" exactly as in a workload file
+ *   response: "ok <k>\n" then one sweep line per quantum, or
+ *             "error <errno>\n" when the request cannot be simulated
+ *
+ * Every response is flushed before the next request is read.
+ */
+int serve(struct rr_options options)
+{
+  char *line = NULL;
+  size_t capacity = 0;
+  u32 table_capacity = 0;
+  struct process_table table = {0};
+
+  while (getline(&line, &capacity, stdin) != -1)
+  {
+    char *save = NULL;
+    char *verb = strtok_r(line, " \t\r\n", &save);
+    if (verb == NULL)
+    {
+      continue;
+    }
+    char *spec = strtok_r(NULL, " \t\r\n", &save);
+    char *count_arg = strtok_r(NULL, " \t\r\n", &save);
+    if (strcmp(verb, "run") != 0 || spec == NULL ||
+        count_arg == NULL || count_arg[strspn(count_arg, "0123456789")] != '\0')
+    {
+      /* Framing is lost: there is no way to find the next request. */
+      fprintf(stderr, "rr: malformed request header\n");
+      free(line);
+      free(table.pid);
+      return EINVAL;
+    }
+
+    u32 count = next_int_from_c_str(count_arg);
+    if (count > table_capacity)
+    {
+      free(table.pid);
+      table.pid = malloc(sizeof(u32) * 3 * (size_t)count);
+      if (table.pid == NULL)
+      {
+        int err = errno;
+        perror("malloc");
+        exit(err);
       }
-      time_now = next;
+      table_capacity = count;
+    }
+    table.size = count;
+    table.arrival_time = table.pid + count;
+    table.burst_time = table.arrival_time + count;
+    for (u32 i = 0; i < count; ++i)
+    {
+      if (!read_u32(stdin, &table.pid[i]) ||
+          !read_u32(stdin, &table.arrival_time[i]) ||
+          !read_u32(stdin, &table.burst_time[i]))
+      {
+        fprintf(stderr, "rr: request truncated\n");
+        free(line);
+        free(table.pid);
+        return EINVAL;
+      }
+    }
+
+    u32 quantum_count;
+    u32 *quanta = parse_quanta(spec, &quantum_count);
+    if (quanta == NULL)
+    {
+      printf("error %d\n", EINVAL);
+      fflush(stdout);
       continue;
     }
 
-    struct process *p = TAILQ_FIRST(&list);
-    TAILQ_REMOVE(&list, p, pointers);
+    struct rr_workload *workload =
+        rr_workload_new(table.arrival_time, table.burst_time, table.size);
+    if (workload == NULL)
+    {
+      int err = errno;
+      perror("rr_workload_new");
+      exit(err);
+    }
+
+    printf("ok %u\n", quantum_count);
+    for (u32 i = 0; i < quantum_count; ++i)
+    {
+      struct rr_result result;
+      options.quantum_length = quanta[i];
+      int err = rr_run(workload, &options, &result, NULL, NULL);
+      if (err != 0)
+      {
+        errno = err;
+        perror("rr_run");
+        exit(err);
+      }
+      print_result(stdout, quanta[i], &result, table.size, true,
+                   options.stats);
+    }
+    fflush(stdout);
+
+    rr_workload_free(workload);
+    free(quanta);
+  }
+
+  free(line);
+  free(table.pid);
+  return 0;
+}
+
+/*
+ * Batch mode: simulates many workloads on a pool of worker threads.
+ *
+ * Workers take the next unclaimed workload, parse it, run every quantum
+ * and format the result lines into a memory buffer, so parsing one file
+ * overlaps with simulating others.  The main thread prints the buffers in
+ * input order as they complete:
+ *
+ *   file=<path> quantum=Q avg_wait=W avg_resp=R [--stats counters]
+ *
+ * A workload that cannot be read ends the whole batch with its errno, as
+ * it would for a single file.
+ */
+struct batch_job
+{
+  const char *path;
+  char  *output;
+  size_t output_size;
+  bool   done;
+};
+
+struct batch
+{
+  struct batch_job *jobs;
+  u32 count;
+  u32 next;
+  const u32 *quanta;
+  u32 quantum_count;
+  struct rr_options options;
+  pthread_mutex_t lock;
+  pthread_cond_t  done;
+};
+
+void run_batch_job(const struct batch *batch, struct batch_job *job)
+{
+  struct process_table table;
+  init_processes(job->path, &table);
+  struct rr_workload *workload =
+      rr_workload_new(table.arrival_time, table.burst_time, table.size);
+  FILE *out = open_memstream(&job->output, &job->output_size);
+  if (workload == NULL || out == NULL)
+  {
+    int err = errno;
+    perror(workload == NULL ? "rr_workload_new" : "open_memstream");
+    exit(err);
+  }
+
+  struct rr_options options = batch->options;
+  struct rr_stats stats;
+  if (options.stats != NULL)
+  {
+    options.stats = &stats; /* one per thread */
+  }
+  for (u32 i = 0; i < batch->quantum_count; ++i)
+  {
+    struct rr_result result;
+    options.quantum_length = batch->quanta[i];
+    int err = rr_run(workload, &options, &result, NULL, NULL);
+    if (err != 0)
+    {
+      errno = err;
+      perror("rr_run");
+      exit(err);
+    }
+    fprintf(out, "file=%s ", job->path);
+    print_result(out, batch->quanta[i], &result, table.size, true,
+                 options.stats);
+  }
+
+  if (fclose(out) != 0)
+  {
+    int err = errno;
+    perror("fclose");
+    exit(err);
+  }
+  rr_workload_free(workload);
+  free_processes(&table);
+}
 
-    if (!p->started)
+void *batch_worker(void *arg)
+{
+  struct batch *batch = arg;
+  for (;;)
+  {
+    pthread_mutex_lock(&batch->lock);
+    u32 i = batch->next;
+    if (i < batch->count)
+    {
+      ++batch->next;
+    }
+    pthread_mutex_unlock(&batch->lock);
+    if (i == batch->count)
     {
-      p->started = true;
-      p->first_run_time = time_now;
-      total_response_time += time_now - p->arrival_time;
+      return NULL;
     }
 
-    u32 slice;
-    if (p->remaining_time > quantum_length)
+    run_batch_job(batch, &batch->jobs[i]);
+
+    pthread_mutex_lock(&batch->lock);
+    batch->jobs[i].done = true;
+    pthread_cond_broadcast(&batch->done);
+    pthread_mutex_unlock(&batch->lock);
+  }
+}
+
+/*
+ * Reads a manifest: one workload path per line, blank lines ignored, "-"
+ * for stdin.  Appends the paths to *paths, growing it as needed.
+ */
+void read_manifest(const char *path, char ***paths, u32 *count,
+                   u32 *capacity)
+{
+  FILE *in = strcmp(path, "-") == 0 ? stdin : fopen(path, "r");
+  if (in == NULL)
+  {
+    int err = errno;
+    perror("fopen");
+    exit(err);
+  }
+  char *line = NULL;
+  size_t length = 0;
+  ssize_t got;
+  while ((got = getline(&line, &length, in)) != -1)
+  {
+    while (got > 0 && (line[got - 1] == '\n' || line[got - 1] == '\r'))
     {
-      slice = quantum_length;
+      line[--got] = '\0';
     }
-    else
+    if (got == 0)
+    {
+      continue;
+    }
+    if (*count == *capacity)
+    {
+      *capacity = *capacity ? 2 * *capacity : 64;
+      *paths = realloc(*paths, sizeof(char *) * *capacity);
+    }
+    if (*paths == NULL || ((*paths)[*count] = strdup(line)) == NULL)
+    {
+      int err = errno;
+      perror("malloc");
+      exit(err);
+    }
+    ++*count;
+  }
+  free(line);
+  if (in != stdin)
+  {
+    fclose(in);
+  }
+}
+
+int run_batch(char **paths, u32 count, const u32 *quanta, u32 quantum_count,
+              struct rr_options options, long jobs)
+{
+  if (jobs <= 0)
+  {
+    jobs = sysconf(_SC_NPROCESSORS_ONLN);
+  }
+  if (jobs > count)
+  {
+    jobs = count;
+  }
+  if (jobs < 1)
+  {
+    jobs = 1;
+  }
+
+  struct batch batch = {
+      .jobs = calloc(count ? count : 1, sizeof(struct batch_job)),
+      .count = count,
+      .quanta = quanta,
+      .quantum_count = quantum_count,
+      .options = options,
+  };
+  pthread_t *threads = malloc(sizeof(pthread_t) * jobs);
+  if (batch.jobs == NULL || threads == NULL)
+  {
+    int err = errno;
+    perror("malloc");
+    exit(err);
+  }
+  for (u32 i = 0; i < count; ++i)
+  {
+    batch.jobs[i].path = paths[i];
+  }
+  pthread_mutex_init(&batch.lock, NULL);
+  pthread_cond_init(&batch.done, NULL);
+
+  for (long t = 0; t < jobs; ++t)
+  {
+    int err = pthread_create(&threads[t], NULL, batch_worker, &batch);
+    if (err != 0)
+    {
+      errno = err;
+      perror("pthread_create");
+      exit(err);
+    }
+  }
+
+  for (u32 i = 0; i < count; ++i)
+  {
+    struct batch_job *job = &batch.jobs[i];
+    pthread_mutex_lock(&batch.lock);
+    while (!job->done)
     {
-      slice = p->remaining_time;
+      pthread_cond_wait(&batch.done, &batch.lock);
     }
+    pthread_mutex_unlock(&batch.lock);
+    fwrite(job->output, 1, job->output_size, stdout);
+    free(job->output);
+  }
+
+  for (long t = 0; t < jobs; ++t)
+  {
+    pthread_join(threads[t], NULL);
+  }
+  pthread_cond_destroy(&batch.done);
+  pthread_mutex_destroy(&batch.lock);
+  free(threads);
+  free(batch.jobs);
+  return 0;
+}
+
+int main(int argc, char *argv[])
+{
+  struct rr_options options = {
+      .fast_forward = true,
+      .checkpoint_time = UINT64_MAX, /* default: the end of the run */
+  };
 
-    u32 start_time = time_now;
-    time_now += slice;
-    p->remaining_time -= slice;
+  bool server = false;
+  bool timing = false;
+  struct rr_stats stats;
+  const char *trace_path = NULL;
+  const char *checkpoint_path = NULL;
+  const char *resume_path = NULL;
+  bool batch = false;
+  long jobs = 0;
+  char **paths = NULL;
+  u32 path_count = 0;
+  u32 path_capacity = 0;
+  enum rr_policy *policies = NULL;
+  u32 policy_count = 0;
 
-    for (u32 i = 0; i < size; ++i)
+  static const struct option long_options[] = {
+      {"no-fast-forward", no_argument, NULL, 'F'},
+      {"median", no_argument, NULL, 'm'},
+      {"serve", no_argument, NULL, 's'},
+      {"timing", no_argument, NULL, 't'},
+      {"stats", no_argument, NULL, 'S'},
+      {"trace", required_argument, NULL, 'T'},
+      {"batch", no_argument, NULL, 'b'},
+      {"jobs", required_argument, NULL, 'j'},
+      {"manifest", required_argument, NULL, 'M'},
+      {"checkpoint", required_argument, NULL, 'C'},
+      {"at", required_argument, NULL, 'A'},
+      {"resume", required_argument, NULL, 'R'},
+      {"policy", required_argument, NULL, 'P'},
+      {NULL, 0, NULL, 0},
+  };
+  int opt;
+  while ((opt = getopt_long(argc, argv, "FmstST:bj:M:C:A:R:P:", long_options, NULL)) != -1)
+  {
+    switch (opt)
     {
-      if (!data[i].arrived && data[i].arrival_time > start_time && data[i].arrival_time <= time_now)
+    case 'F':
+      options.fast_forward = false;
+      break;
+    case 'm':
+      options.median_quantum = true;
+      break;
+    case 's':
+      server = true;
+      break;
+    case 't':
+      timing = true;
+      break;
+    case 'S':
+      options.stats = &stats;
+      break;
+    case 'T':
+      trace_path = optarg;
+      break;
+    case 'b':
+      batch = true;
+      break;
+    case 'j':
+      jobs = next_int_from_c_str(optarg);
+      break;
+    case 'M':
+      batch = true;
+      read_manifest(optarg, &paths, &path_count, &path_capacity);
+      break;
+    case 'C':
+      checkpoint_path = optarg;
+      break;
+    case 'A':
+    {
+      char *end;
+      errno = 0;
+      options.checkpoint_time = strtoull(optarg, &end, 10);
+      if (errno != 0 || end == optarg || *end != '\0' || *optarg == '-')
+      {
+        return EINVAL;
+      }
+      break;
+    }
+    case 'R':
+      resume_path = optarg;
+      break;
+    case 'P':
+      free(policies);
+      policies = parse_policies(optarg, &policy_count);
+      if (policies == NULL)
+      {
+        return EINVAL;
+      }
+      options.policy = policies[0];
+      break;
+    default:
+      return EINVAL;
+    }
+  }
+  bool checkpointing = checkpoint_path != NULL || resume_path != NULL;
+  /* Several policies only fit the plain output, one line per policy and
+     quantum; everything else runs the single policy in options. */
+  bool compare = policy_count > 1;
+  if (compare && (server || batch || trace_path != NULL || checkpointing))
+  {
+    return EINVAL;
+  }
+  if (server)
+  {
+    return argc == optind && trace_path == NULL && !checkpointing
+               ? serve(options)
+               : EINVAL;
+  }
+  if (batch)
+  {
+    /* rr --batch QUANTA [PATH...], plus any --manifest paths */
+    if (argc == optind || trace_path != NULL || checkpointing)
+    {
+      return EINVAL;
+    }
+    u32 quantum_count;
+    u32 *quanta = parse_quanta(argv[optind], &quantum_count);
+    if (quanta == NULL)
+    {
+      return EINVAL;
+    }
+    for (int i = optind + 1; i < argc; ++i)
+    {
+      if (path_count == path_capacity)
+      {
+        path_capacity = path_capacity ? 2 * path_capacity : 64;
+        paths = realloc(paths, sizeof(char *) * path_capacity);
+      }
+      if (paths == NULL || (paths[path_count++] = strdup(argv[i])) == NULL)
       {
-        TAILQ_INSERT_TAIL(&list, &data[i], pointers);
-        data[i].arrived = true;
+        int err = errno;
+        perror("malloc");
+        exit(err);
       }
     }
+    double batch_start = now_seconds();
+    int err = run_batch(paths, path_count, quanta, quantum_count, options,
+                        jobs);
+    if (timing)
+    {
+      fprintf(stderr, "batch_seconds=%.6f\npeak_rss_kb=%ld\n",
+              now_seconds() - batch_start, peak_rss_kb());
+    }
+    for (u32 i = 0; i < path_count; ++i)
+    {
+      free(paths[i]);
+    }
+    free(paths);
+    free(quanta);
+    return err;
+  }
+  if (argc - optind != 2)
+  {
+    return EINVAL;
+  }
+  const char *path = argv[optind];
+  const char *quantum_arg = argv[optind + 1];
+
+  double parse_start = now_seconds();
+  struct process_table table;
+  init_processes(path, &table);
 
-    if (p->remaining_time == 0)
+  u32 quantum_count;
+  u32 *quanta = parse_quanta(quantum_arg, &quantum_count);
+  if (quanta == NULL)
+  {
+    exit(EINVAL);
+  }
+  bool sweep = strpbrk(quantum_arg, ",-") != NULL;
+
+  /* A trace covers one run, so it takes exactly one quantum. */
+  struct trace_file trace_file = {.pid = table.pid};
+  struct rr_trace trace = {.flush = write_trace, .context = &trace_file};
+  if (trace_path != NULL)
+  {
+    if (quantum_count != 1)
     {
-      total_waiting_time += time_now - p->arrival_time - p->burst_time;
-      ++completed;
+      exit(EINVAL);
     }
-    else
+    trace_file.out = open_trace(trace_path, quanta[0], table.size);
+    trace.capacity = TRACE_BUFFER_EVENTS;
+    trace.events = malloc(sizeof(struct rr_event) * trace.capacity);
+    if (trace.events == NULL)
     {
-      TAILQ_INSERT_TAIL(&list, p, pointers);
+      int err = errno;
+      perror("malloc");
+      exit(err);
     }
+    options.trace = &trace;
+  }
+
+  /* So does a checkpoint, taken or resumed. */
+  struct rr_checkpoint checkpoint = {0};
+  struct rr_checkpoint resume = {0};
+  if (checkpointing && quantum_count != 1)
+  {
+    exit(EINVAL);
+  }
+  if (checkpoint_path != NULL)
+  {
+    options.checkpoint = &checkpoint;
+  }
+  if (resume_path != NULL)
+  {
+    load_checkpoint(resume_path, &resume);
+    options.resume = &resume;
+  }
+
+  struct rr_workload *workload =
+      rr_workload_new(table.arrival_time, table.burst_time, table.size);
+  if (workload == NULL)
+  {
+    int err = errno;
+    perror("rr_workload_new");
+    exit(err);
+  }
+  if (timing)
+  {
+    fprintf(stderr, "parse_seconds=%.6f\n", now_seconds() - parse_start);
   }
 
-  /* End of "Your code here" */
+  /* With several policies, every line starts with policy=<name>. */
+  for (u32 k = 0; k < (compare ? policy_count : 1); ++k)
+  {
+    if (compare)
+    {
+      options.policy = policies[k];
+    }
+    for (u32 i = 0; i < quantum_count; ++i)
+    {
+      struct rr_result result;
+      options.quantum_length = quanta[i];
+      double run_start = now_seconds();
+      int err = rr_run(workload, &options, &result, NULL, NULL);
+      if (err != 0)
+      {
+        errno = err;
+        perror("rr_run");
+        exit(err);
+      }
+      if (timing)
+      {
+        if (compare)
+        {
+          fprintf(stderr, "policy=%s ", policy_names[options.policy]);
+        }
+        fprintf(stderr, "quantum=%u simulate_seconds=%.6f\n", quanta[i],
+                now_seconds() - run_start);
+      }
 
-  printf("Average waiting time: %.2f\n", (float)total_waiting_time / (float)size);
-  printf("Average response time: %.2f\n", (float)total_response_time / (float)size);
+      if (compare)
+      {
+        printf("policy=%s ", policy_names[options.policy]);
+      }
+      print_result(stdout, quanta[i], &result, table.size, sweep || compare,
+                   options.stats);
+    }
+  }
+  if (timing)
+  {
+    fprintf(stderr, "peak_rss_kb=%ld\n", peak_rss_kb());
+  }
+  if (trace_path != NULL && fclose(trace_file.out) != 0)
+  {
+    int err = errno;
+    perror("fclose");
+    exit(err);
+  }
+  if (checkpoint_path != NULL)
+  {
+    save_checkpoint(checkpoint_path, &checkpoint);
+  }
+  rr_checkpoint_free(&checkpoint);
+  rr_checkpoint_free(&resume);
 
-  free(data);
+  free(trace.events);
+  rr_workload_free(workload);
+  free(quanta);
+  free(policies);
+  free_processes(&table);
   return 0;
 }
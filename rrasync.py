@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# ---------------------------------------------------------------------------
+#   CS 111 – Lab 3  •  asyncio runner for `./rr`
+# ---------------------------------------------------------------------------
+#
+#   For callers that live on an event loop.  Every sweep is one `rr -`
+#   started with asyncio.create_subprocess_exec and fed its workload on
+#   stdin; a semaphore caps how many run at once, so a suite of thousands
+#   of cases keeps every core busy from a single thread without forking
+#   thousands of processes at the same time.
+#
+#   Output goes through harness.parse_sweep, exactly as in the suites.
+#
+#       runner = AsyncRunner(limit=8)
+#       got = await runner.sweep(tuples, [1, 2, 4])      # → {1: (w, r), …}
+#       async for i, got in runner.stream(cases):        # as they finish
+#           ...
+# ---------------------------------------------------------------------------
+
+import asyncio
+import os
+import subprocess
+
+from harness import RR_EXE, parse_sweep, quantum_spec, rr_args, workload_bytes
+
+
+class AsyncRunner:
+    """
+    Runs `rr` sweeps concurrently, at most `limit` processes at a time
+    (default: one per CPU).  `peak` records the most that were ever in
+    flight together.
+    """
+
+    def __init__(self, limit=None, exe=RR_EXE, args=None):
+        self.limit = limit or os.cpu_count() or 1
+        self.exe = exe
+        self.args = rr_args() if args is None else tuple(args)
+        self.in_flight = self.peak = 0
+        self._semaphore = self._loop = None
+
+    async def sweep(self, tuples, quanta):
+        """Simulate `tuples` for every quantum; returns {Q: SweepResult}."""
+        # one semaphore per event loop: a runner may outlive asyncio.run()
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._semaphore, self._loop = asyncio.Semaphore(self.limit), loop
+        cmd = (self.exe, *self.args, "-", quantum_spec(quanta))
+        async with self._semaphore:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+            try:
+                proc = await asyncio.create_subprocess_exec(
+                    *cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+                out, _ = await proc.communicate(workload_bytes(tuples))
+            finally:
+                self.in_flight -= 1
+        if proc.returncode != 0:
+            raise subprocess.CalledProcessError(proc.returncode, cmd, out)
+        return parse_sweep(out.decode())
+
+    async def stream(self, cases):
+        """
+        Sweep every (tuples, quanta) in `cases` and yield (index, result)
+        pairs in completion order.  The first failure cancels the rest.
+        """
+        async def indexed(i, case):
+            return i, await self.sweep(*case)
+
+        tasks = [asyncio.ensure_future(indexed(i, case))
+                 for i, case in enumerate(cases)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def map(self, cases):
+        """Sweep every (tuples, quanta) in `cases`; results in input order."""
+        cases = list(cases)
+        results = [None] * len(cases)
+        async for i, got in self.stream(cases):
+            results[i] = got
+        return results
+
+
+def run_cases(cases, limit=None, exe=RR_EXE):
+    """Blocking AsyncRunner.map on a fresh event loop."""
+    return asyncio.run(AsyncRunner(limit, exe).map(cases))
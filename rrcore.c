@@ -0,0 +1,1404 @@
+#include "rrcore.h"
+
+#include <errno.h>
+#include <stdlib.h>
+#include <string.h>
+
+/*
+ * Per-process state lives in parallel arrays indexed by process (remaining
+ * time, a started bit) and the ready queue is a ring of u32 indices with
+ * one slot per process, so a process costs a little over 8 bytes and the
+ * dispatch loop walks contiguous memory instead of chasing list pointers.
+ */
+struct run_queue
+{
+  u32 *slots;
+  u32  capacity;
+  u32  head;
+  u32  count;
+};
+
+static void queue_push(struct run_queue *queue, u32 index)
+{
+  uint64_t tail = (uint64_t)queue->head + queue->count;
+  if (tail >= queue->capacity)
+  {
+    tail -= queue->capacity;
+  }
+  queue->slots[tail] = index;
+  ++queue->count;
+}
+
+static u32 queue_pop(struct run_queue *queue)
+{
+  u32 index = queue->slots[queue->head];
+  if (++queue->head == queue->capacity)
+  {
+    queue->head = 0;
+  }
+  --queue->count;
+  return index;
+}
+
+/* Sets bit i and returns whether it was already set. */
+static bool test_and_set(u64 *bits, u32 i)
+{
+  u64 mask = (u64)1 << (i % 64);
+  bool was_set = (bits[i / 64] & mask) != 0;
+  bits[i / 64] |= mask;
+  return was_set;
+}
+
+static int compare_u32(const void *a, const void *b)
+{
+  u32 x = *(const u32 *)a;
+  u32 y = *(const u32 *)b;
+  return (x > y) - (x < y);
+}
+
+static int compare_u64(const void *a, const void *b)
+{
+  uint64_t x = *(const uint64_t *)a;
+  uint64_t y = *(const uint64_t *)b;
+  return (x > y) - (x < y);
+}
+
+/*
+ * Builds the order in which processes arrive: indices sorted by
+ * (arrival_time, index).  Input that is already sorted by arrival keeps the
+ * identity permutation and is never handed to qsort.
+ */
+struct rr_workload *rr_workload_new(const u32 *arrival_time,
+                                    const u32 *burst_time,
+                                    u32 size)
+{
+  struct rr_workload *workload = malloc(sizeof(struct rr_workload));
+  if (workload == NULL)
+  {
+    return NULL;
+  }
+  workload->arrival_time = arrival_time;
+  workload->burst_time = burst_time;
+  workload->size = size;
+  workload->order = malloc(sizeof(u32) * (size ? size : 1));
+  if (workload->order == NULL)
+  {
+    free(workload);
+    return NULL;
+  }
+
+  u32 *order = workload->order;
+  workload->presorted = true;
+  for (u32 i = 0; i < size; ++i)
+  {
+    order[i] = i;
+    if (i > 0 && arrival_time[i] < arrival_time[i - 1])
+    {
+      workload->presorted = false;
+    }
+  }
+  if (workload->presorted)
+  {
+    return workload;
+  }
+
+  uint64_t *keys = malloc(sizeof(uint64_t) * size);
+  if (keys == NULL)
+  {
+    rr_workload_free(workload);
+    return NULL;
+  }
+  for (u32 i = 0; i < size; ++i)
+  {
+    keys[i] = ((uint64_t)arrival_time[i] << 32) | i;
+  }
+  qsort(keys, size, sizeof(uint64_t), compare_u64);
+  for (u32 i = 0; i < size; ++i)
+  {
+    order[i] = (u32)keys[i];
+  }
+  free(keys);
+  return workload;
+}
+
+void rr_workload_free(struct rr_workload *workload)
+{
+  if (workload == NULL)
+  {
+    return;
+  }
+  free(workload->order);
+  free(workload);
+}
+
+/*
+ * Running median of the remaining times of the queued processes: a max-heap
+ * holding the lower half and a min-heap holding the upper half.  Both heaps
+ * are indexed by process (slot[]), so the process being dispatched can be
+ * removed from the middle of either heap in O(log k).  A process's key is
+ * its remaining time, which never changes while it is queued.
+ */
+struct median
+{
+  const u32 *remaining;
+  u32 *low;       /* max-heap of process indices: the lower half */
+  u32 *high;      /* min-heap of process indices: the upper half */
+  u32  low_size;
+  u32  high_size;
+  u32 *slot;      /* position of each queued process in its heap */
+  bool *in_low;
+};
+
+static bool heap_before(const struct median *m, bool max, u32 a, u32 b)
+{
+  u32 ka = m->remaining[a];
+  u32 kb = m->remaining[b];
+  return max ? ka > kb : ka < kb;
+}
+
+static void heap_set(struct median *m, u32 *heap, u32 pos, u32 index)
+{
+  heap[pos] = index;
+  m->slot[index] = pos;
+}
+
+static void sift_up(struct median *m, u32 *heap, bool max, u32 pos)
+{
+  u32 index = heap[pos];
+  while (pos > 0)
+  {
+    u32 parent = (pos - 1) / 2;
+    if (!heap_before(m, max, index, heap[parent]))
+    {
+      break;
+    }
+    heap_set(m, heap, pos, heap[parent]);
+    pos = parent;
+  }
+  heap_set(m, heap, pos, index);
+}
+
+static void sift_down(struct median *m, u32 *heap, u32 size, bool max, u32 pos)
+{
+  u32 index = heap[pos];
+  for (;;)
+  {
+    u32 child = 2 * pos + 1;
+    if (child >= size)
+    {
+      break;
+    }
+    if (child + 1 < size && heap_before(m, max, heap[child + 1], heap[child]))
+    {
+      ++child;
+    }
+    if (!heap_before(m, max, heap[child], index))
+    {
+      break;
+    }
+    heap_set(m, heap, pos, heap[child]);
+    pos = child;
+  }
+  heap_set(m, heap, pos, index);
+}
+
+static void heap_push(struct median *m, u32 *heap, u32 *size, bool max,
+                      u32 index)
+{
+  heap_set(m, heap, *size, index);
+  sift_up(m, heap, max, (*size)++);
+}
+
+static void heap_remove(struct median *m, u32 *heap, u32 *size, bool max,
+                        u32 pos)
+{
+  u32 last = heap[--(*size)];
+  if (pos == *size)
+  {
+    return;
+  }
+  heap_set(m, heap, pos, last);
+  sift_up(m, heap, max, pos);
+  sift_down(m, heap, *size, max, m->slot[last]);
+}
+
+static void median_rebalance(struct median *m)
+{
+  while (m->low_size > m->high_size + 1)
+  {
+    u32 index = m->low[0];
+    heap_remove(m, m->low, &m->low_size, true, 0);
+    m->in_low[index] = false;
+    heap_push(m, m->high, &m->high_size, false, index);
+  }
+  while (m->high_size > m->low_size)
+  {
+    u32 index = m->high[0];
+    heap_remove(m, m->high, &m->high_size, false, 0);
+    m->in_low[index] = true;
+    heap_push(m, m->low, &m->low_size, true, index);
+  }
+}
+
+static void median_insert(struct median *m, u32 index)
+{
+  if (m->low_size == 0 ||
+      m->remaining[index] <= m->remaining[m->low[0]])
+  {
+    m->in_low[index] = true;
+    heap_push(m, m->low, &m->low_size, true, index);
+  }
+  else
+  {
+    m->in_low[index] = false;
+    heap_push(m, m->high, &m->high_size, false, index);
+  }
+  median_rebalance(m);
+}
+
+static void median_remove(struct median *m, u32 index)
+{
+  if (m->in_low[index])
+  {
+    heap_remove(m, m->low, &m->low_size, true, m->slot[index]);
+  }
+  else
+  {
+    heap_remove(m, m->high, &m->high_size, false, m->slot[index]);
+  }
+  median_rebalance(m);
+}
+
+/* Median of the queued remaining times; an even count averages (floor) the
+   two middle values.  Only meaningful while the queue is non-empty. */
+static u32 median_value(const struct median *m)
+{
+  u32 lower = m->remaining[m->low[0]];
+  if (m->low_size > m->high_size)
+  {
+    return lower;
+  }
+  return (u32)(((uint64_t)lower + m->remaining[m->high[0]]) / 2);
+}
+
+/*
+ * Finds every process in order[next..] that has arrived by time_now, points
+ * *batch at them in file order and returns the new cursor.  Processes
+ * admitted together join the queue in file order, exactly like the original
+ * scan over the table did; when the input is not presorted they are sorted
+ * in scratch so order[] stays reusable for the next simulation.
+ */
+static u32 arrived_batch(const struct rr_workload *workload,
+                         u32 *scratch,
+                         u32 next,
+                         u64 time_now,
+                         const u32 **batch)
+{
+  const u32 *order = workload->order;
+  u32 end = next;
+  while (end < workload->size &&
+         workload->arrival_time[order[end]] <= time_now)
+  {
+    ++end;
+  }
+
+  *batch = order + next;
+  if (scratch != NULL && end - next > 1)
+  {
+    memcpy(scratch, *batch, sizeof(u32) * (end - next));
+    qsort(scratch, end - next, sizeof(u32), compare_u32);
+    *batch = scratch;
+  }
+  return end;
+}
+
+/* Queues every process that has arrived by time_now; returns the cursor. */
+static u32 admit_arrivals(struct run_queue *queue,
+                          const struct rr_workload *workload,
+                          u32 *scratch,
+                          struct median *median,
+                          u32 next,
+                          u64 time_now)
+{
+  const u32 *batch;
+  u32 end = arrived_batch(workload, scratch, next, time_now, &batch);
+  for (u32 i = 0; i < end - next; ++i)
+  {
+    queue_push(queue, batch[i]);
+    if (median != NULL)
+    {
+      median_insert(median, batch[i]);
+    }
+  }
+  return end;
+}
+
+/* Appends one event, flushing the sink first if its buffer is full. */
+static int trace_event(struct rr_trace *trace, u32 process, u64 start,
+                       u32 length, bool finished)
+{
+  if (trace->count == trace->capacity)
+  {
+    int err = trace->flush(trace);
+    if (err != 0)
+    {
+      return err;
+    }
+  }
+  trace->events[trace->count++] = (struct rr_event){
+      .process = process,
+      .start = start,
+      .length = length,
+      .flags = finished ? RR_EVENT_FINISHED : 0,
+  };
+  return 0;
+}
+
+/* Histogram bucket of a wait: 0 for none, else 1 + floor(log2(wait)). */
+static u32 wait_bucket(u64 wait)
+{
+  return wait == 0 ? 0 : 64 - (u32)__builtin_clzll(wait);
+}
+
+/*
+ * Round compression.  With m processes queued, no arrival before
+ * next_arrival and every remaining time above k quanta, the next k rounds
+ * just take one quantum off every process and leave the queue order as it
+ * is.  Jumps over the largest such k in one O(m) pass, filling in the
+ * first-run times the skipped rounds would have recorded.
+ */
+static u64 fast_forward(const struct run_queue *queue,
+                        u32 *remaining,
+                        u64 *started,
+                        u32 quantum_length,
+                        bool more_arrivals,
+                        u64 next_arrival,
+                        const u32 *arrival_time,
+                        u64 *first_run_time,
+                        u64 *time_now,
+                        u64 *total_response_time)
+{
+  uint64_t round = (uint64_t)queue->count * quantum_length;
+  u32 min_remaining = UINT32_MAX;
+  for (u32 j = 0, pos = queue->head; j < queue->count; ++j)
+  {
+    u32 index = queue->slots[pos];
+    if (remaining[index] < min_remaining)
+    {
+      min_remaining = remaining[index];
+    }
+    if (++pos == queue->capacity)
+    {
+      pos = 0;
+    }
+  }
+
+  /* No process may finish, and the last skipped slice must end strictly
+     before the next arrival so admission order is unaffected. */
+  if (min_remaining <= quantum_length)
+  {
+    return 0;
+  }
+  uint64_t k = (min_remaining - 1) / quantum_length;
+  if (more_arrivals)
+  {
+    uint64_t by_arrival = (next_arrival - *time_now - 1) / round;
+    if (by_arrival < k)
+    {
+      k = by_arrival;
+    }
+  }
+  if (k == 0)
+  {
+    return 0;
+  }
+
+  u64 start = *time_now;
+  for (u32 j = 0, pos = queue->head; j < queue->count; ++j)
+  {
+    u32 index = queue->slots[pos];
+    if (!test_and_set(started, index))
+    {
+      u64 first_run = start + (u64)j * quantum_length;
+      *total_response_time += first_run - arrival_time[index];
+      if (first_run_time != NULL)
+      {
+        first_run_time[index] = first_run;
+      }
+    }
+    remaining[index] -= k * quantum_length;
+    if (++pos == queue->capacity)
+    {
+      pos = 0;
+    }
+  }
+  *time_now = start + k * round;
+  return k;
+}
+
+/* Count of marked positions below k in a Fenwick tree over 0..m-1. */
+static u32 fenwick_below(const u32 *tree, u32 k)
+{
+  u32 count = 0;
+  for (; k > 0; k &= k - 1)
+  {
+    count += tree[k];
+  }
+  return count;
+}
+
+static void fenwick_mark(u32 *tree, u32 m, u32 k)
+{
+  for (++k; k <= m; k += k & -k)
+  {
+    ++tree[k];
+  }
+}
+
+/*
+ * Closed-form drain.  When nothing arrives before the queued work is done,
+ * the queue keeps its order and runs in rounds: a process with remaining r
+ * takes c = ceil(r / quantum) turns (one for r = 0) and finishes in round c
+ * after a last piece l = r - (c - 1) * quantum.  With processes sorted by
+ * (c, queue position), round c starts after the rounds before it, each a
+ * quantum for every process still active plus the last pieces of those
+ * finishing, and process k finishes after a quantum for each process ahead
+ * of it that outlives round c (counted with a Fenwick tree) and the last
+ * pieces of those ahead of it finishing in round c, its own included.
+ * First runs are prefix sums of the first turns in queue order.
+ *
+ * Empties the queue in O(m log m) and returns true, or returns false
+ * (leaving everything untouched) if scratch memory is short.
+ */
+static bool drain(struct run_queue *queue,
+                  u32 *remaining,
+                  u64 *started,
+                  u32 quantum_length,
+                  const u32 *arrival_time,
+                  const u32 *burst_time,
+                  struct rr_stats *stats,
+                  u64 *completion_time,
+                  u64 *first_run_time,
+                  u64 *time_now,
+                  u64 *total_waiting_time,
+                  u64 *total_response_time)
+{
+  u32 m = queue->count;
+  uint64_t *keys = malloc(sizeof(uint64_t) * (m ? m : 1));
+  u32 *tree = calloc((size_t)m + 1, sizeof(u32));
+  if (keys == NULL || tree == NULL)
+  {
+    free(keys);
+    free(tree);
+    return false;
+  }
+
+  u64 start = *time_now;
+  u64 first_run = start;
+  for (u32 k = 0, pos = queue->head; k < m; ++k)
+  {
+    u32 index = queue->slots[pos];
+    u32 r = remaining[index];
+    u32 turns = r == 0 ? 1 : (r - 1) / quantum_length + 1;
+    keys[k] = ((uint64_t)turns << 32) | k;
+    if (!test_and_set(started, index))
+    {
+      *total_response_time += first_run - arrival_time[index];
+      if (first_run_time != NULL)
+      {
+        first_run_time[index] = first_run;
+      }
+    }
+    first_run += r < quantum_length ? r : quantum_length;
+    if (stats != NULL)
+    {
+      stats->slices += turns;
+      stats->preemptions += turns - 1;
+    }
+    if (++pos == queue->capacity)
+    {
+      pos = 0;
+    }
+  }
+  qsort(keys, m, sizeof(uint64_t), compare_u64);
+  if (stats != NULL && m > stats->max_queue)
+  {
+    stats->max_queue = m;
+  }
+
+  u64 round_start = start; /* start of round previous + 1 */
+  u64 previous = 0;
+  for (u32 g = 0; g < m;)
+  {
+    u64 turns = keys[g] >> 32;
+    u64 active = m - g; /* processes still running in round `turns` */
+    u64 skipped = turns - previous - 1;
+    u64 round = round_start + skipped * quantum_length * active;
+    if (stats != NULL)
+    {
+      stats->queue_length_sum += skipped * active * active + active * active;
+    }
+
+    u64 pieces = 0;
+    u32 end = g;
+    for (; end < m && keys[end] >> 32 == turns; ++end)
+    {
+      u32 k = (u32)keys[end];
+      u32 index = queue->slots[(u32)(((uint64_t)queue->head + k) %
+                                     queue->capacity)];
+      u32 ahead = k - fenwick_below(tree, k); /* outlive this round */
+      fenwick_mark(tree, m, k);
+      pieces += remaining[index] - (turns - 1) * quantum_length;
+      u64 finish = round + (u64)ahead * quantum_length + pieces;
+      u64 wait = finish - arrival_time[index] - burst_time[index];
+      *total_waiting_time += wait;
+      if (stats != NULL)
+      {
+        /* dispatches after it in this round see one process fewer */
+        stats->queue_length_sum -= active - 1 - (ahead + (end - g));
+        ++stats->wait_histogram[wait_bucket(wait)];
+      }
+      if (completion_time != NULL)
+      {
+        completion_time[index] = finish;
+      }
+      remaining[index] = 0;
+    }
+
+    round_start = round + (active - (end - g)) * quantum_length + pieces;
+    previous = turns;
+    g = end;
+  }
+
+  *time_now = round_start;
+  queue->count = 0;
+  free(keys);
+  free(tree);
+  return true;
+}
+
+/* FNV-1a over the first size arrival/burst pairs, to recognise a prefix. */
+static u64 workload_hash(const struct rr_workload *workload, u32 size)
+{
+  u64 hash = 14695981039346656037ull;
+  for (u32 i = 0; i < size; ++i)
+  {
+    u32 pair[2] = {workload->arrival_time[i], workload->burst_time[i]};
+    const unsigned char *bytes = (const unsigned char *)pair;
+    for (u32 b = 0; b < sizeof(pair); ++b)
+    {
+      hash = (hash ^ bytes[b]) * 1099511628211ull;
+    }
+  }
+  return hash;
+}
+
+/* Copies the state at a dispatch boundary into checkpoint. */
+static int take_checkpoint(struct rr_checkpoint *checkpoint,
+                           const struct rr_workload *workload,
+                           const struct rr_options *options,
+                           const struct run_queue *queue,
+                           const u32 *remaining,
+                           const u64 *started,
+                           u32 quantum_length,
+                           u32 completed,
+                           u64 time_now,
+                           u64 total_waiting_time,
+                           u64 total_response_time)
+{
+  u32 size = workload->size;
+  size_t words = ((size_t)size + 63) / 64;
+  *checkpoint = (struct rr_checkpoint){
+      .time_now = time_now,
+      .total_waiting_time = total_waiting_time,
+      .total_response_time = total_response_time,
+      .workload_hash = workload_hash(workload, size),
+      .size = size,
+      .completed = completed,
+      .quantum_length = options->quantum_length,
+      .current_quantum = quantum_length,
+      .median_quantum = options->median_quantum,
+      .has_stats = options->stats != NULL,
+      .queue_count = queue->count,
+      .queue = malloc(sizeof(u32) * (queue->count ? queue->count : 1)),
+      .remaining = malloc(sizeof(u32) * (size ? size : 1)),
+      .started = malloc(sizeof(u64) * (words ? words : 1)),
+  };
+  if (checkpoint->queue == NULL || checkpoint->remaining == NULL ||
+      checkpoint->started == NULL)
+  {
+    rr_checkpoint_free(checkpoint);
+    return ENOMEM;
+  }
+  if (options->stats != NULL)
+  {
+    checkpoint->stats = *options->stats;
+  }
+  for (u32 j = 0, pos = queue->head; j < queue->count; ++j)
+  {
+    checkpoint->queue[j] = queue->slots[pos];
+    if (++pos == queue->capacity)
+    {
+      pos = 0;
+    }
+  }
+  memcpy(checkpoint->remaining, remaining, sizeof(u32) * size);
+  memcpy(checkpoint->started, started, sizeof(u64) * words);
+  return 0;
+}
+
+/*
+ * A checkpoint can seed a run of this workload when it was taken under the
+ * same policy, over an unchanged prefix, and everything appended since
+ * arrives after it.
+ */
+static bool can_resume(const struct rr_checkpoint *checkpoint,
+                       const struct rr_workload *workload,
+                       const struct rr_options *options)
+{
+  if (checkpoint->size > workload->size ||
+      checkpoint->quantum_length != options->quantum_length ||
+      checkpoint->median_quantum != options->median_quantum ||
+      (options->stats != NULL && !checkpoint->has_stats) ||
+      checkpoint->workload_hash != workload_hash(workload, checkpoint->size))
+  {
+    return false;
+  }
+  for (u32 i = checkpoint->size; i < workload->size; ++i)
+  {
+    if (workload->arrival_time[i] <= checkpoint->time_now)
+    {
+      return false;
+    }
+  }
+  return true;
+}
+
+void rr_checkpoint_free(struct rr_checkpoint *checkpoint)
+{
+  free(checkpoint->queue);
+  free(checkpoint->remaining);
+  free(checkpoint->started);
+  checkpoint->queue = NULL;
+  checkpoint->remaining = NULL;
+  checkpoint->started = NULL;
+}
+
+/* Round-robin, the policy every option of rr_run was written for. */
+static int run_round_robin(const struct rr_workload *workload,
+                           const struct rr_options *options,
+                           struct rr_result *result,
+                           u64 *completion_time,
+                           u64 *first_run_time)
+{
+  u32 quantum_length = options->quantum_length;
+  const struct rr_checkpoint *resume = options->resume;
+  if (resume != NULL && !can_resume(resume, workload, options))
+  {
+    return EINVAL;
+  }
+
+  u32 size = workload->size;
+  size_t slots = size ? size : 1;
+  const u32 *arrival_time = workload->arrival_time;
+  const u32 *burst_time = workload->burst_time;
+
+  u32 *remaining = malloc(sizeof(u32) * slots);
+  u64 *started = calloc((slots + 63) / 64, sizeof(u64));
+  struct run_queue queue = {
+      .slots = malloc(sizeof(u32) * slots),
+      .capacity = size,
+  };
+  u32 *scratch = NULL;
+  if (!workload->presorted)
+  {
+    scratch = malloc(sizeof(u32) * slots);
+  }
+  struct median median_state = {.remaining = remaining};
+  struct median *median = NULL;
+  if (options->median_quantum)
+  {
+    median = &median_state;
+    median->low = malloc(sizeof(u32) * slots);
+    median->high = malloc(sizeof(u32) * slots);
+    median->slot = malloc(sizeof(u32) * slots);
+    median->in_low = malloc(sizeof(bool) * slots);
+  }
+  if (remaining == NULL || started == NULL || queue.slots == NULL ||
+      (!workload->presorted && scratch == NULL) ||
+      (median != NULL && (median->low == NULL || median->high == NULL ||
+                          median->slot == NULL || median->in_low == NULL)))
+  {
+    free(remaining);
+    free(started);
+    free(queue.slots);
+    free(scratch);
+    free(median_state.low);
+    free(median_state.high);
+    free(median_state.slot);
+    free(median_state.in_low);
+    return ENOMEM;
+  }
+
+  memcpy(remaining, burst_time, sizeof(u32) * size);
+
+  u64 total_waiting_time = 0;
+  u64 total_response_time = 0;
+
+  struct rr_stats *stats = options->stats;
+  if (stats != NULL)
+  {
+    memset(stats, 0, sizeof(*stats));
+  }
+  struct rr_trace *trace = options->trace;
+  struct rr_checkpoint *pending = options->checkpoint;
+  u64 checkpoint_time = options->checkpoint_time;
+  int err = 0;
+
+  u32 next = 0;
+  u64 time_now  = 0;
+  u32 completed = 0;
+  u32 until_fast_forward = 0;
+
+  /* Everything the checkpoint saw has arrived by its time_now, and nothing
+     appended since has, so the admission cursor follows from the time. */
+  if (resume != NULL)
+  {
+    memcpy(remaining, resume->remaining, sizeof(u32) * resume->size);
+    memcpy(started, resume->started,
+           sizeof(u64) * (((size_t)resume->size + 63) / 64));
+    for (u32 j = 0; j < resume->queue_count; ++j)
+    {
+      queue_push(&queue, resume->queue[j]);
+      if (median != NULL)
+      {
+        median_insert(median, resume->queue[j]);
+      }
+    }
+    while (next < size &&
+           arrival_time[workload->order[next]] <= resume->time_now)
+    {
+      ++next;
+    }
+    time_now = resume->time_now;
+    completed = resume->completed;
+    total_waiting_time = resume->total_waiting_time;
+    total_response_time = resume->total_response_time;
+    quantum_length = resume->current_quantum;
+    if (stats != NULL)
+    {
+      *stats = resume->stats;
+    }
+  }
+
+  while (completed < size)
+  {
+    next = admit_arrivals(&queue, workload, scratch, median, next, time_now);
+
+    if (queue.count == 0)
+    {
+      u32 arrival = arrival_time[workload->order[next]];
+      if (pending != NULL && arrival > checkpoint_time)
+      {
+        err = take_checkpoint(pending, workload, options, &queue, remaining,
+                              started, quantum_length, completed, time_now,
+                              total_waiting_time, total_response_time);
+        if (err != 0)
+        {
+          break;
+        }
+        pending = NULL;
+      }
+      if (stats != NULL)
+      {
+        ++stats->idle_jumps;
+        stats->idle_time += arrival - time_now;
+      }
+      time_now = arrival;
+      until_fast_forward = 0; /* a new busy period starts with a check */
+      continue;
+    }
+
+    /* Try once per round of the queue so the O(m) scans stay O(1)
+       amortised per slice.  Rounds are not uniform with a median quantum,
+       and a trace needs every slice anyway. */
+    if (options->fast_forward && median == NULL && trace == NULL &&
+        until_fast_forward-- == 0)
+    {
+      /* a pending checkpoint acts as an arrival just after its time, so
+         no skipped round ends past it */
+      bool more_arrivals = next < size;
+      u64 next_arrival =
+          more_arrivals ? arrival_time[workload->order[next]] : 0;
+
+      /* The queue drains before anything arrives (or a pending checkpoint
+         falls due): finish it in closed form.  A zero-length turn at the
+         drain's end would see an arrival at that instant queued, so with
+         one queued the drain must end strictly before the arrival. */
+      u64 drained = time_now;
+      bool zero_turn = false;
+      for (u32 j = 0, pos = queue.head; j < queue.count; ++j)
+      {
+        drained += remaining[queue.slots[pos]];
+        zero_turn = zero_turn || remaining[queue.slots[pos]] == 0;
+        if (++pos == queue.capacity)
+        {
+          pos = 0;
+        }
+      }
+      u32 queued = queue.count;
+      if ((!more_arrivals || drained < next_arrival ||
+           (drained == next_arrival && !zero_turn)) &&
+          (pending == NULL || drained <= checkpoint_time) &&
+          drain(&queue, remaining, started, quantum_length, arrival_time,
+                burst_time, stats, completion_time, first_run_time,
+                &time_now, &total_waiting_time, &total_response_time))
+      {
+        completed += queued;
+        until_fast_forward = 0;
+        continue;
+      }
+
+      if (pending != NULL &&
+          (!more_arrivals || checkpoint_time < next_arrival - 1))
+      {
+        more_arrivals = true;
+        next_arrival = checkpoint_time + 1;
+      }
+      u64 rounds =
+          fast_forward(&queue, remaining, started, quantum_length,
+                       more_arrivals, next_arrival, arrival_time,
+                       first_run_time, &time_now, &total_response_time);
+      if (stats != NULL)
+      {
+        /* every skipped slice preempts, with the whole queue waiting */
+        u64 queued = queue.count;
+        stats->slices += rounds * queued;
+        stats->preemptions += rounds * queued;
+        stats->queue_length_sum += rounds * queued * queued;
+      }
+      until_fast_forward = queue.count;
+    }
+
+    /* The next slice could admit arrivals past the checkpoint: take it now,
+       while the state depends on nothing that arrived after time_now. */
+    if (pending != NULL)
+    {
+      u32 head = queue.slots[queue.head];
+      u32 length =
+          remaining[head] < quantum_length ? remaining[head] : quantum_length;
+      if (time_now + length > checkpoint_time)
+      {
+        err = take_checkpoint(pending, workload, options, &queue, remaining,
+                              started, quantum_length, completed, time_now,
+                              total_waiting_time, total_response_time);
+        if (err != 0)
+        {
+          break;
+        }
+        pending = NULL;
+      }
+    }
+
+    if (stats != NULL)
+    {
+      ++stats->slices;
+      stats->queue_length_sum += queue.count;
+      if (queue.count > stats->max_queue)
+      {
+        stats->max_queue = queue.count;
+      }
+    }
+
+    u32 p = queue_pop(&queue);
+    if (median != NULL)
+    {
+      median_remove(median, p);
+    }
+
+    if (!test_and_set(started, p))
+    {
+      total_response_time += time_now - arrival_time[p];
+      if (first_run_time != NULL)
+      {
+        first_run_time[p] = time_now;
+      }
+    }
+
+    u32 slice;
+    if (remaining[p] > quantum_length)
+    {
+      slice = quantum_length;
+    }
+    else
+    {
+      slice = remaining[p];
+    }
+
+    if (trace != NULL)
+    {
+      err = trace_event(trace, p, time_now, slice, remaining[p] == slice);
+      if (err != 0)
+      {
+        break;
+      }
+    }
+
+    time_now += slice;
+    remaining[p] -= slice;
+
+    /* Everything up to start_time is already queued: admits (start, now] */
+    next = admit_arrivals(&queue, workload, scratch, median, next, time_now);
+
+    if (remaining[p] == 0)
+    {
+      u64 wait = time_now - arrival_time[p] - burst_time[p];
+      total_waiting_time += wait;
+      if (stats != NULL)
+      {
+        ++stats->wait_histogram[wait_bucket(wait)];
+      }
+      if (completion_time != NULL)
+      {
+        completion_time[p] = time_now;
+      }
+      ++completed;
+    }
+    else
+    {
+      queue_push(&queue, p);
+      if (stats != NULL)
+      {
+        ++stats->preemptions;
+      }
+      if (median != NULL)
+      {
+        median_insert(median, p);
+      }
+    }
+
+    /* Median policy: the next slice is the median remaining time of the
+       queue as this turn leaves it (at least 1); an empty queue keeps the
+       current quantum. */
+    if (median != NULL && queue.count > 0)
+    {
+      quantum_length = median_value(median);
+      if (quantum_length == 0)
+      {
+        quantum_length = 1;
+      }
+    }
+  }
+
+  if (err == 0 && pending != NULL)
+  {
+    err = take_checkpoint(pending, workload, options, &queue, remaining,
+                          started, quantum_length, completed, time_now,
+                          total_waiting_time, total_response_time);
+  }
+  if (err == 0 && trace != NULL && trace->count > 0)
+  {
+    err = trace->flush(trace);
+  }
+
+  result->total_waiting_time = total_waiting_time;
+  result->total_response_time = total_response_time;
+
+  free(median_state.low);
+  free(median_state.high);
+  free(median_state.slot);
+  free(median_state.in_low);
+  free(scratch);
+  free(queue.slots);
+  free(started);
+  free(remaining);
+  return err;
+}
+
+/*
+ * The ready set of the other policies, behind four calls the dispatch loop
+ * makes: ready_push for an arrival or a preempted process, ready_pop for
+ * the next one to run, ready_slice for how long it may run before the
+ * policy decides again, and ready_requeue when it stops unfinished.
+ *
+ * FCFS, SJF and SRTF keep a binary min-heap of process indices ordered by
+ * (key, arrival, index), where key is the arrival, the burst or the
+ * remaining time; a process's key never changes while it is in the heap.
+ * MLFQ keeps one ring per level, like the round-robin queue.
+ */
+struct ready_set
+{
+  enum rr_policy policy;
+  const u32 *key;
+  const u32 *arrival_time;
+  u32 *heap;
+  u32  count;
+  struct run_queue levels[RR_MLFQ_LEVELS];
+  u32  quanta[RR_MLFQ_LEVELS];
+  unsigned char *level; /* MLFQ level of each process */
+};
+
+static bool ready_before(const struct ready_set *ready, u32 a, u32 b)
+{
+  if (ready->key[a] != ready->key[b])
+  {
+    return ready->key[a] < ready->key[b];
+  }
+  if (ready->arrival_time[a] != ready->arrival_time[b])
+  {
+    return ready->arrival_time[a] < ready->arrival_time[b];
+  }
+  return a < b;
+}
+
+static void ready_push(struct ready_set *ready, u32 index)
+{
+  if (ready->policy == RR_POLICY_MLFQ)
+  {
+    queue_push(&ready->levels[ready->level[index]], index);
+    ++ready->count;
+    return;
+  }
+  u32 pos = ready->count++;
+  while (pos > 0)
+  {
+    u32 parent = (pos - 1) / 2;
+    if (!ready_before(ready, index, ready->heap[parent]))
+    {
+      break;
+    }
+    ready->heap[pos] = ready->heap[parent];
+    pos = parent;
+  }
+  ready->heap[pos] = index;
+}
+
+static u32 ready_pop(struct ready_set *ready)
+{
+  if (ready->policy == RR_POLICY_MLFQ)
+  {
+    u32 l = 0;
+    while (ready->levels[l].count == 0)
+    {
+      ++l;
+    }
+    --ready->count;
+    return queue_pop(&ready->levels[l]);
+  }
+  u32 top = ready->heap[0];
+  u32 last = ready->heap[--ready->count];
+  u32 pos = 0;
+  for (;;)
+  {
+    u32 child = 2 * pos + 1;
+    if (child >= ready->count)
+    {
+      break;
+    }
+    if (child + 1 < ready->count &&
+        ready_before(ready, ready->heap[child + 1], ready->heap[child]))
+    {
+      ++child;
+    }
+    if (!ready_before(ready, ready->heap[child], last))
+    {
+      break;
+    }
+    ready->heap[pos] = ready->heap[child];
+    pos = child;
+  }
+  ready->heap[pos] = last;
+  return top;
+}
+
+/* Longest run before the policy decides again; SRTF is also cut short by
+   the next arrival in the dispatch loop. */
+static u32 ready_slice(const struct ready_set *ready, u32 index,
+                       u32 remaining)
+{
+  if (ready->policy == RR_POLICY_MLFQ &&
+      remaining > ready->quanta[ready->level[index]])
+  {
+    return ready->quanta[ready->level[index]];
+  }
+  return remaining;
+}
+
+static void ready_requeue(struct ready_set *ready, u32 index)
+{
+  if (ready->policy == RR_POLICY_MLFQ &&
+      ready->level[index] + 1 < RR_MLFQ_LEVELS)
+  {
+    ++ready->level[index]; /* used its whole slice */
+  }
+  ready_push(ready, index);
+}
+
+static void ready_free(struct ready_set *ready)
+{
+  free(ready->heap);
+  free(ready->level);
+  for (u32 l = 0; l < RR_MLFQ_LEVELS; ++l)
+  {
+    free(ready->levels[l].slots);
+  }
+}
+
+static u32 ready_admit(struct ready_set *ready,
+                       const struct rr_workload *workload,
+                       u32 *scratch,
+                       u32 next,
+                       u64 time_now)
+{
+  const u32 *batch;
+  u32 end = arrived_batch(workload, scratch, next, time_now, &batch);
+  for (u32 i = 0; i < end - next; ++i)
+  {
+    ready_push(ready, batch[i]);
+  }
+  return end;
+}
+
+/* FCFS, SJF, SRTF and MLFQ over the ready set above. */
+static int run_policy(const struct rr_workload *workload,
+                      const struct rr_options *options,
+                      struct rr_result *result,
+                      u64 *completion_time,
+                      u64 *first_run_time)
+{
+  enum rr_policy policy = options->policy;
+  if (options->median_quantum || options->checkpoint != NULL ||
+      options->resume != NULL)
+  {
+    return EINVAL;
+  }
+
+  u32 size = workload->size;
+  size_t slots = size ? size : 1;
+  const u32 *arrival_time = workload->arrival_time;
+  const u32 *burst_time = workload->burst_time;
+
+  u32 *remaining = malloc(sizeof(u32) * slots);
+  u64 *started = calloc((slots + 63) / 64, sizeof(u64));
+  u32 *scratch = NULL;
+  if (!workload->presorted)
+  {
+    scratch = malloc(sizeof(u32) * slots);
+  }
+  struct ready_set ready = {
+      .policy = policy,
+      .key = policy == RR_POLICY_FCFS  ? arrival_time
+             : policy == RR_POLICY_SJF ? burst_time
+                                       : remaining,
+      .arrival_time = arrival_time,
+  };
+  bool allocated = true;
+  if (policy == RR_POLICY_MLFQ)
+  {
+    ready.level = calloc(slots, 1);
+    allocated = ready.level != NULL;
+    for (u32 l = 0; l < RR_MLFQ_LEVELS; ++l)
+    {
+      uint64_t quantum = (uint64_t)options->quantum_length << l;
+      ready.quanta[l] = quantum > UINT32_MAX ? UINT32_MAX : (u32)quantum;
+      ready.levels[l].slots = malloc(sizeof(u32) * slots);
+      ready.levels[l].capacity = size;
+      allocated = allocated && ready.levels[l].slots != NULL;
+    }
+  }
+  else
+  {
+    ready.heap = malloc(sizeof(u32) * slots);
+    allocated = ready.heap != NULL;
+  }
+  if (!allocated || remaining == NULL || started == NULL ||
+      (!workload->presorted && scratch == NULL))
+  {
+    free(remaining);
+    free(started);
+    free(scratch);
+    ready_free(&ready);
+    return ENOMEM;
+  }
+  memcpy(remaining, burst_time, sizeof(u32) * size);
+
+  u64 total_waiting_time = 0;
+  u64 total_response_time = 0;
+
+  struct rr_stats *stats = options->stats;
+  if (stats != NULL)
+  {
+    memset(stats, 0, sizeof(*stats));
+  }
+  struct rr_trace *trace = options->trace;
+  struct run_queue *bottom = &ready.levels[RR_MLFQ_LEVELS - 1];
+  int err = 0;
+
+  u32 next = 0;
+  u64 time_now  = 0;
+  u32 completed = 0;
+  u32 until_fast_forward = 0;
+
+  while (completed < size)
+  {
+    next = ready_admit(&ready, workload, scratch, next, time_now);
+
+    if (ready.count == 0)
+    {
+      u32 arrival = arrival_time[workload->order[next]];
+      if (stats != NULL)
+      {
+        ++stats->idle_jumps;
+        stats->idle_time += arrival - time_now;
+      }
+      time_now = arrival;
+      continue;
+    }
+
+    /* With only the bottom MLFQ level occupied the schedule is round-robin
+       with its quantum until the next arrival, so skip rounds as rr does. */
+    if (policy == RR_POLICY_MLFQ && options->fast_forward && trace == NULL &&
+        bottom->count == ready.count && until_fast_forward-- == 0)
+    {
+      u64 rounds = fast_forward(
+          bottom, remaining, started, ready.quanta[RR_MLFQ_LEVELS - 1],
+          next < size, next < size ? arrival_time[workload->order[next]] : 0,
+          arrival_time, first_run_time, &time_now, &total_response_time);
+      if (stats != NULL)
+      {
+        u64 queued = bottom->count;
+        stats->slices += rounds * queued;
+        stats->preemptions += rounds * queued;
+        stats->queue_length_sum += rounds * queued * queued;
+      }
+      until_fast_forward = bottom->count;
+    }
+
+    if (stats != NULL)
+    {
+      ++stats->slices;
+      stats->queue_length_sum += ready.count;
+      if (ready.count > stats->max_queue)
+      {
+        stats->max_queue = ready.count;
+      }
+    }
+
+    u32 p = ready_pop(&ready);
+    if (!test_and_set(started, p))
+    {
+      total_response_time += time_now - arrival_time[p];
+      if (first_run_time != NULL)
+      {
+        first_run_time[p] = time_now;
+      }
+    }
+
+    u32 slice = ready_slice(&ready, p, remaining[p]);
+    if (policy == RR_POLICY_SRTF && next < size)
+    {
+      /* everything up to time_now is admitted, so this is at least 1 */
+      u64 until = arrival_time[workload->order[next]] - time_now;
+      if (until < slice)
+      {
+        slice = (u32)until;
+      }
+    }
+
+    if (trace != NULL)
+    {
+      err = trace_event(trace, p, time_now, slice, remaining[p] == slice);
+      if (err != 0)
+      {
+        break;
+      }
+    }
+
+    time_now += slice;
+    remaining[p] -= slice;
+    next = ready_admit(&ready, workload, scratch, next, time_now);
+
+    if (remaining[p] == 0)
+    {
+      u64 wait = time_now - arrival_time[p] - burst_time[p];
+      total_waiting_time += wait;
+      if (stats != NULL)
+      {
+        ++stats->wait_histogram[wait_bucket(wait)];
+      }
+      if (completion_time != NULL)
+      {
+        completion_time[p] = time_now;
+      }
+      ++completed;
+    }
+    else
+    {
+      ready_requeue(&ready, p);
+      if (stats != NULL)
+      {
+        ++stats->preemptions;
+      }
+    }
+  }
+
+  if (err == 0 && trace != NULL && trace->count > 0)
+  {
+    err = trace->flush(trace);
+  }
+
+  result->total_waiting_time = total_waiting_time;
+  result->total_response_time = total_response_time;
+
+  ready_free(&ready);
+  free(scratch);
+  free(started);
+  free(remaining);
+  return err;
+}
+
+int rr_run(const struct rr_workload *workload,
+           const struct rr_options *options,
+           struct rr_result *result,
+           u64 *completion_time,
+           u64 *first_run_time)
+{
+  if (options->quantum_length == 0)
+  {
+    return EINVAL;
+  }
+  switch (options->policy)
+  {
+  case RR_POLICY_RR:
+    return run_round_robin(workload, options, result, completion_time,
+                           first_run_time);
+  case RR_POLICY_FCFS:
+  case RR_POLICY_SJF:
+  case RR_POLICY_SRTF:
+  case RR_POLICY_MLFQ:
+    return run_policy(workload, options, result, completion_time,
+                      first_run_time);
+  default:
+    return EINVAL;
+  }
+}
+
+int rr_simulate(const u32 *arrival_time,
+                const u32 *burst_time,
+                u32 size,
+                const struct rr_options *options,
+                struct rr_result *result,
+                u64 *completion_time,
+                u64 *first_run_time)
+{
+  struct rr_workload *workload =
+      rr_workload_new(arrival_time, burst_time, size);
+  if (workload == NULL)
+  {
+    return ENOMEM;
+  }
+  int err = rr_run(workload, options, result,
+                   completion_time, first_run_time);
+  rr_workload_free(workload);
+  return err;
+}
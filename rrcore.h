@@ -0,0 +1,191 @@
+#ifndef RRCORE_H
+#define RRCORE_H
+
+#include <stdbool.h>
+#include <stdint.h>
+
+typedef uint32_t u32;
+typedef int32_t i32;
+typedef uint64_t u64;
+
+/*
+ * A workload indexed by arrival once and then simulated any number of times.
+ * The arrival/burst arrays are borrowed, not copied, and must outlive it.
+ * rr_run never writes to the workload, so one workload can be shared by
+ * concurrent simulations.
+ */
+struct rr_workload
+{
+  const u32 *arrival_time;
+  const u32 *burst_time;
+  u32 size;
+
+  u32 *order;     /* indices sorted by (arrival_time, index) */
+  bool presorted; /* input already sorted by arrival: order is identity */
+};
+
+/*
+ * Optional counters filled in by rr_run.  Queue lengths are sampled at every
+ * dispatch and include the process being dispatched.  Wait bucket 0 counts
+ * processes that never waited; bucket b > 0 counts waits in [2^(b-1), 2^b).
+ */
+#define RR_WAIT_BUCKETS 65
+
+struct rr_stats
+{
+  u64 slices;           /* dispatches */
+  u64 preemptions;      /* dispatches that ended with a re-queue */
+  u64 idle_jumps;       /* times the CPU idled until the next arrival */
+  u64 idle_time;        /* total length of those gaps */
+  u32 max_queue;
+  u64 queue_length_sum; /* mean queue length = queue_length_sum / slices */
+  u64 wait_histogram[RR_WAIT_BUCKETS];
+};
+
+/*
+ * One dispatch.  rr_run reports the process by index; a sink may rewrite
+ * the field (e.g. to the pid) before it stores the batch.
+ */
+#define RR_EVENT_FINISHED 1u
+
+struct rr_event
+{
+  u64 start;
+  u32 process;
+  u32 length;
+  u32 flags; /* RR_EVENT_FINISHED, or 0 when the process was re-queued */
+  u32 reserved;
+};
+
+/*
+ * A trace sink.  rr_run appends events to the caller's buffer and calls
+ * flush whenever it is full and once at the end; flush must empty it
+ * (set count to 0) and return 0, or return an errno value to abort.
+ */
+struct rr_trace
+{
+  struct rr_event *events;
+  u32 capacity;
+  u32 count;
+  int (*flush)(struct rr_trace *trace);
+  void *context;
+};
+
+/*
+ * Scheduler state at a dispatch boundary, for append-only workloads.  A run
+ * with options.checkpoint set captures the state at the last boundary at
+ * or before checkpoint_time (the one right before the first slice that
+ * would end after it, or before an idle jump past it) and then carries on.
+ * A run with options.resume starts from that state instead of time 0.
+ *
+ * Resuming needs the same quantum and policy, the same first `size`
+ * processes (checked by hash), and every process after them arriving
+ * after time_now; the result is then identical to a run from scratch.
+ * completion_time and first_run_time are only written for dispatches after
+ * the checkpoint.  The arrays are malloc()ed; free them with
+ * rr_checkpoint_free.
+ */
+struct rr_checkpoint
+{
+  u64  time_now;
+  u64  total_waiting_time;
+  u64  total_response_time;
+  u64  workload_hash;   /* of the first size arrival/burst pairs */
+  u32  size;            /* processes in the workload it was taken from */
+  u32  completed;
+  u32  quantum_length;  /* the run's starting quantum */
+  u32  current_quantum; /* the quantum in force; differs with median */
+  bool median_quantum;
+  bool has_stats;
+  struct rr_stats stats;
+  u32  queue_count;
+  u32 *queue;           /* ready queue, head first */
+  u32 *remaining;       /* size entries */
+  u64 *started;         /* bitset, (size + 63) / 64 words */
+};
+
+/*
+ * Dispatch policies.  RR is round-robin, optionally with the median quantum;
+ * the others ignore median_quantum and cannot take or resume checkpoints.
+ *
+ *   FCFS  run to completion, earliest arrival first
+ *   SJF   run to completion, shortest burst first
+ *   SRTF  shortest remaining time first, re-decided at every arrival
+ *   MLFQ  RR_MLFQ_LEVELS round-robin queues, level l with quantum
+ *         quantum_length * 2^l; arrivals enter level 0, a process that uses
+ *         its whole slice drops a level, and the highest non-empty level
+ *         runs next
+ *
+ * FCFS, SJF and SRTF break ties by arrival time, then by file order.
+ */
+enum rr_policy
+{
+  RR_POLICY_RR,
+  RR_POLICY_FCFS,
+  RR_POLICY_SJF,
+  RR_POLICY_SRTF,
+  RR_POLICY_MLFQ,
+};
+#define RR_POLICY_COUNT 5
+#define RR_MLFQ_LEVELS 3
+
+struct rr_options
+{
+  u32  quantum_length; /* the fixed quantum, or the first one with median */
+  bool fast_forward;   /* skip whole rounds while nothing arrives or ends,
+                          and drain a queue that empties before the next
+                          arrival in closed form */
+  bool median_quantum; /* after each turn, quantum = median queued remaining */
+  struct rr_stats *stats; /* counters to fill in, or NULL to skip them */
+  struct rr_trace *trace; /* per-dispatch events, or NULL; no fast-forward */
+  u64 checkpoint_time;                /* see struct rr_checkpoint */
+  struct rr_checkpoint *checkpoint;   /* state to capture, or NULL */
+  const struct rr_checkpoint *resume; /* state to start from, or NULL */
+  enum rr_policy policy;              /* RR_POLICY_RR when zeroed */
+};
+
+/*
+ * Times and totals are 64-bit: arrivals and bursts fit in u32, but a
+ * schedule can run far past 2^32 and totals sum over every process.
+ */
+struct rr_result
+{
+  u64 total_waiting_time;
+  u64 total_response_time;
+};
+
+/* Returns NULL with errno set on failure. */
+struct rr_workload *rr_workload_new(const u32 *arrival_time,
+                                    const u32 *burst_time,
+                                    u32 size);
+void rr_workload_free(struct rr_workload *workload);
+
+/*
+ * Simulates options->policy.  Round-robin runs with a fixed quantum, or with
+ * a quantum that after every turn becomes the median remaining time of the
+ * queued processes (median_quantum; the two middle values are averaged,
+ * rounded down, for an even count).  Fast-forwarding changes how long the
+ * simulation takes, never its results.  completion_time and first_run_time
+ * are optional per-process outputs (NULL to skip).
+ * Returns 0, or an errno value (EINVAL for a zero quantum, an unknown policy,
+ * a checkpoint outside round-robin or one this workload cannot resume from,
+ * ENOMEM, or whatever the trace sink's flush returned).
+ */
+int rr_run(const struct rr_workload *workload,
+           const struct rr_options *options,
+           struct rr_result *result,
+           u64 *completion_time,
+           u64 *first_run_time);
+
+void rr_checkpoint_free(struct rr_checkpoint *checkpoint);
+
+/* One-shot rr_workload_new + rr_run + rr_workload_free. */
+int rr_simulate(const u32 *arrival_time,
+                const u32 *burst_time,
+                u32 size,
+                const struct rr_options *options,
+                struct rr_result *result,
+                u64 *completion_time,
+                u64 *first_run_time);
+
+#endif
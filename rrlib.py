@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# ---------------------------------------------------------------------------
+#   CS 111 – Lab 3  •  ctypes binding for the scheduler core (librr.so)
+# ---------------------------------------------------------------------------
+#
+#   Calls the same C core as `./rr` in‑process, so parameter studies skip
+#   process start‑up and text parsing.  Arrival/burst columns are handed to
+#   C as pointers into the caller's own buffers: a C‑contiguous uint32 NumPy
+#   array or an `array.array("I")` is never copied.  Anything else is
+#   converted once.
+#
+#   Build the library with `make` (target `librr.so`).
+# ---------------------------------------------------------------------------
+
+import array
+import ctypes
+import os
+from collections import namedtuple
+
+from reference import POLICIES, exact_average
+
+try:
+    import numpy as np
+except ImportError:                            # NumPy is optional
+    np = None
+
+LIB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "librr.so")
+
+RRResult = namedtuple("RRResult",
+                      "total_wait total_resp completion first_run stats",
+                      defaults=(None,))
+
+WAIT_BUCKETS = 65                              # RR_WAIT_BUCKETS
+
+
+class _Stats(ctypes.Structure):
+    _fields_ = [("slices", ctypes.c_uint64),
+                ("preemptions", ctypes.c_uint64),
+                ("idle_jumps", ctypes.c_uint64),
+                ("idle_time", ctypes.c_uint64),
+                ("max_queue", ctypes.c_uint32),
+                ("queue_length_sum", ctypes.c_uint64),
+                ("wait_histogram", ctypes.c_uint64 * WAIT_BUCKETS)]
+
+    def as_dict(self):
+        """The counters under the same names `rr --stats` prints."""
+        hist = list(self.wait_histogram)
+        while len(hist) > 1 and hist[-1] == 0:
+            hist.pop()
+        return {"slices": self.slices, "preemptions": self.preemptions,
+                "idle_jumps": self.idle_jumps, "idle_time": self.idle_time,
+                "max_queue": self.max_queue,
+                "mean_queue": (self.queue_length_sum / self.slices
+                               if self.slices else 0.0),
+                "wait_hist": hist}
+
+
+class _Options(ctypes.Structure):
+    _fields_ = [("quantum_length", ctypes.c_uint32),
+                ("fast_forward", ctypes.c_bool),
+                ("median_quantum", ctypes.c_bool),
+                ("stats", ctypes.POINTER(_Stats)),
+                # not exposed here; present so rr_run reads NULLs, not garbage
+                ("trace", ctypes.c_void_p),
+                ("checkpoint_time", ctypes.c_uint64),
+                ("checkpoint", ctypes.c_void_p),
+                ("resume", ctypes.c_void_p),
+                ("policy", ctypes.c_int)]           # index into POLICIES
+
+
+class _Result(ctypes.Structure):
+    _fields_ = [("total_waiting_time", ctypes.c_uint64),
+                ("total_response_time", ctypes.c_uint64)]
+
+
+_u32_p = ctypes.POINTER(ctypes.c_uint32)
+_u64_p = ctypes.POINTER(ctypes.c_uint64)
+_lib = None
+
+
+def load(path=LIB_PATH):
+    """Load (once) and return the shared library."""
+    global _lib
+    if _lib is None:
+        lib = ctypes.CDLL(path)
+        lib.rr_workload_new.argtypes = [_u32_p, _u32_p, ctypes.c_uint32]
+        lib.rr_workload_new.restype = ctypes.c_void_p
+        lib.rr_workload_free.argtypes = [ctypes.c_void_p]
+        lib.rr_workload_free.restype = None
+        lib.rr_run.argtypes = [ctypes.c_void_p, ctypes.POINTER(_Options),
+                               ctypes.POINTER(_Result), _u64_p, _u64_p]
+        lib.rr_run.restype = ctypes.c_int
+        _lib = lib
+    return _lib
+
+
+def _as_u32(column):
+    """
+    View `column` as a C uint32 array.  Returns (owner, pointer, length);
+    `owner` keeps the memory alive for as long as the pointer is used.
+    """
+    if np is not None and isinstance(column, np.ndarray):
+        arr = np.ascontiguousarray(column, dtype=np.uint32)   # no‑op if OK
+        return arr, arr.ctypes.data_as(_u32_p), len(arr)
+
+    try:
+        view = memoryview(column)
+    except TypeError:
+        view = None
+    if (view is not None and view.format in ("I", "=I", "<I")
+            and view.itemsize == 4 and view.c_contiguous
+            and not view.readonly):
+        buf = (ctypes.c_uint32 * len(view)).from_buffer(column)
+        return buf, ctypes.cast(buf, _u32_p), len(view)
+
+    arr = array.array("I", column)
+    return _as_u32(arr)
+
+
+def _empty_u64(n):
+    """A zeroed uint64 buffer for per‑process times, and a pointer to it."""
+    if np is not None:
+        arr = np.zeros(n, dtype=np.uint64)
+        return arr, arr.ctypes.data_as(_u64_p)
+    arr = array.array("Q", bytes(8 * n))
+    buf = (ctypes.c_uint64 * n).from_buffer(arr)
+    return arr, ctypes.cast(buf, _u64_p)
+
+
+class Workload:
+    """
+    Arrival/burst columns indexed by arrival once on the C side, ready to be
+    simulated for any number of quanta.  Use as a context manager or call
+    `close()`; the columns must stay alive until then.
+    """
+
+    def __init__(self, arrival, burst):
+        self._handle = None
+        self._lib = load()
+        self._arrival, a_ptr, n = _as_u32(arrival)
+        self._burst, b_ptr, m = _as_u32(burst)
+        if n != m:
+            raise ValueError("arrival and burst must have the same length")
+        self.size = n
+        self._handle = self._lib.rr_workload_new(a_ptr, b_ptr, n)
+        if not self._handle:
+            raise MemoryError("rr_workload_new failed")
+
+    def run(self, quantum, per_process=True, fast_forward=True, median=False,
+            stats=False, policy="rr"):
+        """
+        Simulate one quantum (the starting quantum when `median` is set)
+        under `policy`, one of reference.POLICIES; returns an RRResult.
+        With `stats`, RRResult.stats holds the scheduler counters as a dict.
+        """
+        completion = first_run = None
+        c_ptr = f_ptr = None
+        if per_process:
+            completion, c_ptr = _empty_u64(self.size)
+            first_run, f_ptr = _empty_u64(self.size)
+
+        counters = _Stats() if stats else None
+        opts = _Options(quantum, fast_forward, median,
+                        ctypes.pointer(counters) if stats else None,
+                        policy=POLICIES.index(policy))
+        res = _Result()
+        err = self._lib.rr_run(self._handle, ctypes.byref(opts),
+                               ctypes.byref(res), c_ptr, f_ptr)
+        if err:
+            raise OSError(err, os.strerror(err))
+        return RRResult(res.total_waiting_time, res.total_response_time,
+                        completion, first_run,
+                        counters.as_dict() if stats else None)
+
+    def sweep(self, quanta, policy="rr"):
+        """Returns {quantum: (avg_wait, avg_resp)} rounded like `rr`."""
+        out = {}
+        for q in quanta:
+            r = self.run(q, per_process=False, policy=policy)
+            out[q] = averages(r, self.size)
+        return out
+
+    def close(self):
+        if self._handle:
+            self._lib.rr_workload_free(self._handle)
+            self._handle = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __del__(self):
+        self.close()
+
+
+def simulate(arrival, burst, quantum, per_process=True, fast_forward=True,
+             median=False, stats=False, policy="rr"):
+    """One‑shot simulation of a single quantum; returns an RRResult."""
+    with Workload(arrival, burst) as w:
+        return w.run(quantum, per_process, fast_forward, median, stats, policy)
+
+
+def averages(result, n):
+    """(avg_wait, avg_resp) rounded to 2 decimals, like rr_reference."""
+    return (exact_average(result.total_wait, n),
+            exact_average(result.total_resp, n))
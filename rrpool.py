@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# ---------------------------------------------------------------------------
+#   CS 111 – Lab 3  •  Client pool for long‑running `rr --serve` workers
+# ---------------------------------------------------------------------------
+#
+#   Each worker is one `rr --serve` process fed over a pipe, so a request
+#   costs a write and a read instead of a fork/exec, a temp file and a
+#   parse of the file.  Requests are multiplexed over the pool: a caller
+#   borrows an idle worker, talks to it, and hands it back.
+# ---------------------------------------------------------------------------
+
+import os
+import queue
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from harness import RR_EXE, parse_sweep, quantum_spec
+
+
+class RRServerError(Exception):
+    """`rr --serve` rejected a request or died while serving it."""
+
+
+class RRWorker:
+    """One `rr --serve` process.  Not thread‑safe; RRPool serialises use."""
+
+    def __init__(self, exe=RR_EXE, args=()):
+        self.proc = subprocess.Popen((exe, "--serve", *args),
+                                     stdin=subprocess.PIPE,
+                                     stdout=subprocess.PIPE)
+
+    def request(self, tuples, quanta):
+        """Simulate `tuples` for every quantum; returns {Q: (W, R)}."""
+        parts = [f"run {quantum_spec(quanta)} {len(tuples)}\n"]
+        parts.extend(f"{pid}, {arr}, {bur}\n" for pid, arr, bur in tuples)
+        try:
+            self.proc.stdin.write("".join(parts).encode())
+            self.proc.stdin.flush()
+        except BrokenPipeError:
+            raise RRServerError("rr worker exited") from None
+
+        header = self.proc.stdout.readline().decode().split()
+        if not header:
+            raise RRServerError("rr worker exited")
+        if header[0] == "error":
+            raise RRServerError(f"rr rejected request (errno {header[1]})")
+        lines = [self.proc.stdout.readline().decode()
+                 for _ in range(int(header[1]))]
+        return parse_sweep("".join(lines))
+
+    def close(self):
+        if self.proc.poll() is None:
+            self.proc.stdin.close()
+            self.proc.wait()
+        self.proc.stdout.close()
+
+
+class RRPool:
+    """
+    A small pool of `rr --serve` workers.
+
+        with RRPool() as pool:
+            pool.run(tuples, [1, 2, 4])          # → {1: (w, r), …}
+            pool.map([(tuples, quanta), …])      # results in input order
+    """
+
+    def __init__(self, size=None, exe=RR_EXE, args=()):
+        self.size = size or os.cpu_count() or 1
+        self._exe, self._args = exe, tuple(args)
+        self._workers = [RRWorker(exe, self._args) for _ in range(self.size)]
+        self._idle = queue.Queue()
+        for w in self._workers:
+            self._idle.put(w)
+        self._lock = threading.Lock()
+
+    def run(self, tuples, quanta):
+        """Run one request on whichever worker is free."""
+        worker = self._idle.get()
+        try:
+            return worker.request(tuples, quanta)
+        except RRServerError:
+            if worker.proc.poll() is not None:     # replace a dead worker
+                worker.close()
+                worker = self._respawn(worker)
+            raise
+        finally:
+            self._idle.put(worker)
+
+    def map(self, requests):
+        """Run [(tuples, quanta), …] across all workers, in input order."""
+        with ThreadPoolExecutor(max_workers=self.size) as ex:
+            return list(ex.map(self._run_request, requests))
+
+    def _run_request(self, req):
+        return self.run(*req)
+
+    def _respawn(self, dead):
+        fresh = RRWorker(self._exe, self._args)
+        with self._lock:
+            self._workers[self._workers.index(dead)] = fresh
+        return fresh
+
+    def close(self):
+        with self._lock:
+            for w in self._workers:
+                w.close()
+            self._workers = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# ---------------------------------------------------------------------------
+#   CS 111 – Lab 3  •  Reader for `rr --trace` dispatch traces
+# ---------------------------------------------------------------------------
+#
+#   Layout (little‑endian), written by rr.c:
+#
+#     offset  0  char[4]  magic "RRTR"
+#     offset  4  u32      version (2)
+#     offset  8  u32      quantum
+#     offset 12  u32      process count
+#     offset 16  {u64 start, u32 pid, u32 length, u32 flags, u32 reserved}
+#                per dispatch, in time order; flags bit 0 = finished
+#
+#   events() reads the file in fixed‑size blocks and yields one Event at a
+#   time, so memory stays flat however long the trace is.  Everything else
+#   here is built on that generator.
+#
+#   Usage:  ./rr --trace run.rrtr processes.txt 3
+#           python3 rrtrace.py run.rrtr --totals processes.txt
+#           python3 rrtrace.py run.rrtr --gantt 0 40
+# ---------------------------------------------------------------------------
+
+import argparse
+import struct
+from collections import namedtuple
+
+from reference import exact_average
+
+MAGIC   = b"RRTR"
+VERSION = 2
+HEADER  = struct.Struct("<4sIII")
+EVENT   = struct.Struct("<QIIII")
+FINISHED = 1
+
+Header = namedtuple("Header", "quantum processes")
+Event  = namedtuple("Event", "pid start length finished")
+
+
+def read_header(f):
+    raw = f.read(HEADER.size)
+    if len(raw) != HEADER.size:
+        raise ValueError("truncated trace header")
+    magic, version, quantum, processes = HEADER.unpack(raw)
+    if magic != MAGIC:
+        raise ValueError("not an rr trace")
+    if version != VERSION:
+        raise ValueError(f"unsupported trace version {version}")
+    return Header(quantum, processes)
+
+
+def header(path):
+    with open(path, "rb") as f:
+        return read_header(f)
+
+
+def events(path, block=1 << 16):
+    """Yield every Event in `path` lazily, `block` records per read."""
+    with open(path, "rb") as f:
+        read_header(f)
+        size = EVENT.size * block
+        while True:
+            buf = f.read(size)
+            if not buf:
+                return
+            usable = len(buf) - len(buf) % EVENT.size
+            for start, pid, length, flags, _ in EVENT.iter_unpack(buf[:usable]):
+                yield Event(pid, start, length, bool(flags & FINISHED))
+            if usable != len(buf):
+                raise ValueError("truncated trace event")
+
+
+def window(evs, t0, t1):
+    """Events overlapping [t0, t1).  Stops reading at the first start ≥ t1."""
+    for e in evs:
+        if e.start >= t1:
+            return
+        if e.start + e.length > t0:
+            yield e
+
+
+def totals(evs, workload):
+    """
+    Recompute (total_wait, total_resp) from a trace and the workload it
+    came from ([(pid, arrival, burst), …]).  Keeps O(processes) state.
+    """
+    arrival = {pid: a for pid, a, _ in workload}
+    burst = {pid: b for pid, _, b in workload}
+    started = set()
+    total_wait = total_resp = 0
+    for e in evs:
+        if e.pid not in started:
+            started.add(e.pid)
+            total_resp += e.start - arrival[e.pid]
+        if e.finished:
+            total_wait += e.start + e.length - arrival[e.pid] - burst[e.pid]
+    return total_wait, total_resp
+
+
+def gantt(evs, t0, t1, width=80):
+    """
+    Text Gantt chart of [t0, t1): one row per pid that ran in the window,
+    `width` columns wide.  A cell is '#' if the pid ran at any time in it.
+    """
+    scale = max(1, t1 - t0) / width
+    rows = {}
+    for e in window(evs, t0, t1):
+        row = rows.setdefault(e.pid, [" "] * width)
+        lo = int((max(e.start, t0) - t0) / scale)
+        hi = int((min(e.start + e.length, t1) - t0 - 1) / scale)
+        for c in range(lo, min(hi, width - 1) + 1):
+            row[c] = "#"
+    label = max((len(str(p)) for p in rows), default=1)
+    lines = [f"{'':>{label}} |{t0:<{width // 2}}{t1:>{width - width // 2}}|"]
+    for pid in sorted(rows):
+        lines.append(f"{pid:>{label}} |{''.join(rows[pid])}|")
+    return "\n".join(lines)
+
+
+def _read_workload(path):
+    """[(pid, arrival, burst), …] of a text or binary workload, read as rr does."""
+    from workload import is_binary, read_binary, read_text   # needs NumPy
+    cols = read_binary(path) if is_binary(path) else read_text(path)
+    return list(zip(*(c.tolist() for c in cols)))
+
+
+def _main():
+    ap = argparse.ArgumentParser(description="Inspect an rr --trace file.")
+    ap.add_argument("trace")
+    ap.add_argument("--totals", metavar="WORKLOAD",
+                    help="recompute the averages against this workload")
+    ap.add_argument("--gantt", nargs=2, type=int, metavar=("T0", "T1"))
+    ap.add_argument("--width", type=int, default=80)
+    args = ap.parse_args()
+
+    h = header(args.trace)
+    print(f"quantum={h.quantum} processes={h.processes}")
+    if args.totals:
+        wait, resp = totals(events(args.trace), _read_workload(args.totals))
+        print(f"avg_wait={exact_average(wait, h.processes):.2f} "
+              f"avg_resp={exact_average(resp, h.processes):.2f}")
+    if args.gantt:
+        print(gantt(events(args.trace), *args.gantt, args.width))
+
+
+if __name__ == "__main__":
+    _main()
@@ -3,8 +3,6 @@
 #   CS 111 – Lab 3  •  Combined test‑suite for the round‑robin scheduler
 # ---------------------------------------------------------------------------
 
-import subprocess
-import tempfile
 import unittest
 import os
 import math
@@ -14,18 +12,9 @@ import textwrap
 import pathlib
 import re
 
-
-# ---------------------------------------------------------------------------
-#  Helper: build / clean via `make`
-# ---------------------------------------------------------------------------
-def _make():
-    """Invoke `make`; return (ok: bool, stdout+stderr str)."""
-    result = subprocess.run(["make"], capture_output=True, text=True)
-    return result.returncode == 0, result.stdout + result.stderr
-
-
-def _make_clean():
-    subprocess.run(["make", "clean"], capture_output=True)
+from build import ensure_built
+from harness import run_sweep, sweep_workload
+from refcache import cached_reference
 
 
 # ---------------------------------------------------------------------------
@@ -36,7 +25,7 @@ class TestLab2(unittest.TestCase):
 
     @classmethod
     def setUpClass(cls):
-        cls.make_ok, cls.make_out = _make()
+        cls.make_ok, cls.make_out = ensure_built()
 
     def test_averages(self):
         fileName = "processes.txt"
@@ -44,11 +33,9 @@ class TestLab2(unittest.TestCase):
         correctAvgRespTime = (0, 0.75, 1.5, 2.75, 3.25, 3.25, 4, 4.75)
 
         self.assertTrue(self.make_ok, msg=f"`make` failed\n{self.make_out}")
+        results = run_sweep(fileName, range(1, 7))
         for x in range(1, 7):
-            cl_result = subprocess.check_output(("./rr", fileName, str(x))).decode()
-            lines = cl_result.split("\n")
-            testAvgWaitTime = float(lines[0].split(":")[1])
-            testAvgRespTime = float(lines[1].split(":")[1])
+            testAvgWaitTime, testAvgRespTime = results[x]
 
             self.assertEqual(
                 (testAvgWaitTime, testAvgRespTime),
@@ -66,91 +53,30 @@ class TestLab2(unittest.TestCase):
         correctAvgWaitTime = (0, 5, 5.25, 6.5, 4.0, 4.5, 5.75, 4.75)
         correctAvgRespTime = (0, 0.75, 1.5, 2.25, 2.75, 3.25, 3.5, 4.75)
 
-        with tempfile.NamedTemporaryFile() as f:
-            f.write(b"4\n")
-            f.write(b"1, 0, 7\n")
-            f.write(b"2, 3, 4\n")
-            f.write(b"3, 4, 1\n")
-            f.write(b"4, 6, 4\n")
-            f.flush()
-
-            for x in range(1, 7):
-                cl_result = subprocess.check_output(("./rr", f.name, str(x))).decode()
-                lines = cl_result.split("\n")
-                testAvgWaitTime = float(lines[0].split(":")[1])
-                testAvgRespTime = float(lines[1].split(":")[1])
-
-                self.assertEqual(
-                    (testAvgWaitTime, testAvgRespTime),
-                    (correctAvgWaitTime[x], correctAvgRespTime[x]),
-                    msg=(
-                        f"\nRe‑queue arrival case  •  Quantum = {x}\n"
-                        f"Expected: wait={correctAvgWaitTime[x]}, resp={correctAvgRespTime[x]}\n"
-                        f"Got:      wait={testAvgWaitTime}, resp={testAvgRespTime}\n"
-                    )
+        data = (b"4\n"
+                b"1, 0, 7\n"
+                b"2, 3, 4\n"
+                b"3, 4, 1\n"
+                b"4, 6, 4\n")
+
+        results = run_sweep("-", range(1, 7), data=data)
+        for x in range(1, 7):
+            testAvgWaitTime, testAvgRespTime = results[x]
+
+            self.assertEqual(
+                (testAvgWaitTime, testAvgRespTime),
+                (correctAvgWaitTime[x], correctAvgRespTime[x]),
+                msg=(
+                    f"\nRe‑queue arrival case  •  Quantum = {x}\n"
+                    f"Expected: wait={correctAvgWaitTime[x]}, resp={correctAvgRespTime[x]}\n"
+                    f"Got:      wait={testAvgWaitTime}, resp={testAvgRespTime}\n"
                 )
+            )
 
 
 # ---------------------------------------------------------------------------
 #  EXTENDED EDGE‑CASE SUITE
 # ---------------------------------------------------------------------------
-def rr_reference(workload, quantum):
-    """
-    Tiny, deterministic round‑robin scheduler used to compute ground‑truth
-    averages.  Workload = [(pid, arrival, burst), …].
-    Returns (avg_wait, avg_resp) rounded to 2 decimals.
-    """
-    n = len(workload)
-    remaining = {p: b for p, a, b in workload}
-    first_cpu = {}
-    responded = set()
-    finished  = {}
-    ready, arrived, t = [], set(), 0
-
-    while len(finished) < n:
-        # Admit arrivals up to and including time t
-        for p, a, _ in workload:
-            if p not in arrived and a <= t:
-                ready.append(p)
-                arrived.add(p)
-
-        if not ready:                          # CPU idle → jump to next arrival
-            t = min(a for p, a, _ in workload if p not in arrived)
-            continue
-
-        p = ready.pop(0)                       # RR: head of queue
-        if p not in responded:
-            first_cpu[p] = t
-            responded.add(p)
-
-        slice_len = min(quantum, remaining[p])
-        start     = t
-        t        += slice_len
-        remaining[p] -= slice_len
-
-        # Admit arrivals during (start, t]
-        for q, a, _ in workload:
-            if q not in arrived and start < a <= t:
-                ready.append(q)
-                arrived.add(q)
-
-        if remaining[p] > 0:
-            ready.append(p)                    # re‑queue
-        else:
-            finished[p] = t
-
-    total_wait = sum(finished[p] - a - b for p, a, b in workload)
-    total_resp = sum(first_cpu[p] - a       for p, a, b in workload)
-    return round(total_wait/n, 2), round(total_resp/n, 2)
-
-
-def _write_workload(tmpfile, tuples):
-    tmpfile.write(f"{len(tuples)}\n".encode())
-    for pid, arr, bur in tuples:
-        tmpfile.write(f"{pid}, {arr}, {bur}\n".encode())
-    tmpfile.flush()
-
-
 class TestLab2Extended(unittest.TestCase):
     """
     Four extra workloads that cover degenerate and edge behaviours.
@@ -165,7 +91,7 @@ class TestLab2Extended(unittest.TestCase):
 
     @classmethod
     def setUpClass(cls):
-        cls.make_ok, cls.make_out = _make()
+        cls.make_ok, cls.make_out = ensure_built()
         cls.exe = "./rr"
 
     def test_extended_workloads(self):
@@ -173,28 +99,22 @@ class TestLab2Extended(unittest.TestCase):
 
         for name, tuples in self.WORKLOADS.items():
             with self.subTest(workload=name):
-                with tempfile.NamedTemporaryFile() as f:
-                    _write_workload(f, tuples)
-
-                    for q in range(1, 7):          # same quantum range
-                        out = subprocess.check_output(
-                            (self.exe, f.name, str(q)), text=True
-                        ).strip().splitlines()
-
-                        got_wait = float(out[0].split(":")[1])
-                        got_resp = float(out[1].split(":")[1])
-
-                        exp_wait, exp_resp = rr_reference(tuples, q)
-
-                        self.assertTrue(
-                            math.isclose(got_wait, exp_wait, abs_tol=0.01) and
-                            math.isclose(got_resp, exp_resp, abs_tol=0.01),
-                            msg=(
-                                f"\nWork‑load: {name}  quantum={q}"
-                                f"\nExpected → wait={exp_wait:.2f} resp={exp_resp:.2f}"
-                                f"\nYour code → wait={got_wait:.2f} resp={got_resp:.2f}\n"
-                            )
+                results = sweep_workload(tuples, range(1, 7), self.exe)
+
+                for q in range(1, 7):              # same quantum range
+                    got_wait, got_resp = results[q]
+
+                    exp_wait, exp_resp = cached_reference(tuples, q)
+
+                    self.assertTrue(
+                        math.isclose(got_wait, exp_wait, abs_tol=0.01) and
+                        math.isclose(got_resp, exp_resp, abs_tol=0.01),
+                        msg=(
+                            f"\nWork‑load: {name}  quantum={q}"
+                            f"\nExpected → wait={exp_wait:.2f} resp={exp_resp:.2f}"
+                            f"\nYour code → wait={got_wait:.2f} resp={got_resp:.2f}\n"
                         )
+                    )
 
 
 # ---------------------------------------------------------------------------
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# ---------------------------------------------------------------------------
+#   CS 111 – Lab 3  •  Tests for the scaling benchmark suite
+# ---------------------------------------------------------------------------
+
+import unittest
+
+import bench
+from build import ensure_built
+from reference import rr_schedule
+
+
+class TestBench(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.make_ok, cls.make_out = ensure_built()
+
+    def test_generators_are_deterministic(self):
+        for dist in bench.DISTRIBUTIONS:
+            with self.subTest(dist=dist):
+                arrival, burst = bench.generate(dist, 500, 1)
+                self.assertEqual((arrival, burst), bench.generate(dist, 500, 1))
+                self.assertEqual(list(arrival), sorted(arrival))
+                self.assertTrue(min(burst) >= 1)
+        self.assertEqual(set(bench.generate("batch", 50, 1)[0]), {0})
+
+    def test_slice_count_matches_reference(self):
+        arrival, burst = bench.generate("heavy", 300, 2)
+        tuples = [(i + 1, a, b) for i, (a, b) in enumerate(zip(arrival, burst))]
+        for q in (1, 7, 100):
+            self.assertEqual(bench.slice_count(burst, q),
+                             rr_schedule(tuples, q)[2])
+
+    def test_small_suite_records(self):
+        self.assertTrue(self.make_ok, msg=self.make_out)
+        records = bench.run_suite([200], [1, 5], ("poisson",), ref_max=200)
+        self.assertEqual([(r["engine"], r["quantum"]) for r in records],
+                         [("rr", 1), ("rr", 5), ("reference", 1),
+                          ("reference", 5)])
+        for r in records:
+            self.assertGreater(r["peak_rss_kb"], 0)
+            self.assertGreaterEqual(r["simulate_seconds"], 0)
+
+    def test_compare_flags_regressions(self):
+        base = [{"engine": "rr", "distribution": "batch", "processes": 10,
+                 "quantum": 1, "parse_seconds": 0.001,
+                 "simulate_seconds": 1.0, "peak_rss_kb": 1000}]
+        same = [dict(base[0], simulate_seconds=1.1, parse_seconds=0.005)]
+        slow = [dict(base[0], simulate_seconds=2.0, peak_rss_kb=2000)]
+        self.assertEqual(bench.compare(same, base), [])
+        self.assertEqual([m for _, m, _, _ in bench.compare(slow, base)],
+                         ["simulate_seconds", "peak_rss_kb"])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
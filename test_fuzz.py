@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# ---------------------------------------------------------------------------
+#   CS 111 – Lab 3  •  Tests for the differential fuzzer and its regressions
+# ---------------------------------------------------------------------------
+
+import random, unittest
+
+from build import ensure_built
+from fuzz import (STRATEGIES, U32_MAX, check_text, fuzz, make_case,
+                  parse_like_rr, regression_cases, shrink, shrink_text)
+from harness import workload_bytes
+
+
+class TestGenerators(unittest.TestCase):
+
+    def test_cases_are_deterministic(self):
+        for i in range(50):
+            self.assertEqual(make_case(7, i), make_case(7, i))
+
+    def test_strategies_cover_edges(self):
+        rng = random.Random(0)
+        seen = {name: [STRATEGIES[name](rng) for _ in range(200)]
+                for name in STRATEGIES}
+        flat = lambda name: [t for w in seen[name] for t in w]
+        self.assertTrue(any(len({a for _, a, _ in w}) < len(w)
+                            for w in seen["duplicates"]))
+        self.assertTrue(any(b == 0 for _, _, b in flat("zero_bursts")))
+        self.assertTrue(any(w[-1][1] - w[0][1] >= 2 ** 31
+                            for w in seen["gaps"]))
+        self.assertTrue(any(a == U32_MAX for _, a, _ in flat("boundary")))
+        self.assertTrue(any(b == U32_MAX for _, _, b in flat("boundary")))
+        for name in STRATEGIES:
+            for _, a, b in flat(name):
+                self.assertTrue(0 <= a <= U32_MAX and 0 <= b <= U32_MAX)
+
+    def test_malformed_cases_generated(self):
+        cases = [make_case(1, i) for i in range(500)]
+        malformed = [c for c in cases if c.text is not None]
+        self.assertTrue(malformed)
+        self.assertTrue(any(c.tuples is None for c in malformed))
+        for c in malformed:
+            self.assertEqual(c.tuples, parse_like_rr(c.text))
+
+
+class TestParserModel(unittest.TestCase):
+
+    def test_examples(self):
+        self.assertEqual(parse_like_rr(b"1\n1, 0, 5\n"), [(1, 0, 5)])
+        self.assertEqual(parse_like_rr(b"1\r\n1;0\t5"), [(1, 0, 5)])
+        self.assertEqual(parse_like_rr(b"x1\n#\n1 4294967296 4294967301"),
+                         [(1, 0, 5)])
+        self.assertIsNone(parse_like_rr(b"2\n1, 0, 5\n"))
+        self.assertIsNone(parse_like_rr(b""))
+        self.assertEqual(parse_like_rr(b"0"), [])
+
+
+class TestShrink(unittest.TestCase):
+
+    def test_shrinks_to_culprit(self):
+        # pretend rr is wrong whenever some process has burst >= 7 and q >= 3
+        def fails(tuples, q):
+            return q >= 3 and any(b >= 7 for _, _, b in tuples)
+        rng = random.Random(3)
+        tuples = [(p, rng.randint(0, 50), rng.randint(1, 20))
+                  for p in range(1, 30)] + [(30, 9, 12)]
+        self.assertEqual(shrink(tuples, 17, fails), ([(1, 0, 7)], 3))
+
+    def test_shrink_text_to_minimal(self):
+        text = workload_bytes([(p, p, 3) for p in range(1, 9)]).rstrip(b"\n")
+        def fails(t):
+            return b"5" in t and not t.endswith(b"\n")
+        self.assertEqual(shrink_text(text, fails), b"5")
+
+
+class TestFuzzAgainstReference(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.make_ok, cls.make_out = ensure_built()
+
+    def test_short_run_is_clean(self):
+        self.assertTrue(self.make_ok, msg=self.make_out)
+        self.assertEqual(fuzz(600, seed=0xC111), [])
+        self.assertEqual(fuzz(200, seed=0xC111, median=True), [])
+
+    def test_regressions(self):
+        self.assertTrue(self.make_ok, msg=self.make_out)
+        for path, text, q, median in regression_cases():
+            with self.subTest(path=path):
+                self.assertEqual(check_text(text, [q], median), [])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
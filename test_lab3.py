@@ -5,19 +5,13 @@ import unittest
 import tempfile
 import os
 
+from build import ensure_built
 
-class TestLab2(unittest.TestCase):
-    def _make():
-        result = subprocess.run(["make"], capture_output=True, text=True)
-        return result
-
-    def _make_clean():
-        result = subprocess.run(["make", "clean"], capture_output=True, text=True)
-        return result
 
+class TestLab2(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
-        cls.make = cls._make().returncode == 0
+        cls.make = ensure_built()[0]
 
     def test_averages(self):
         fileName = "processes.txt"
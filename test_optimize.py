@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# ---------------------------------------------------------------------------
+#   CS 111 – Lab 3  •  Tests for the quantum optimizer
+# ---------------------------------------------------------------------------
+
+import random, unittest
+
+import optimize
+from build import ensure_built
+from harness import parse_quanta, run_sweep, workload_bytes
+from reference import rr_reference, rr_totals
+
+
+class TestOptimize(unittest.TestCase):
+
+    SEED = 0xC111
+
+    @classmethod
+    def setUpClass(cls):
+        cls.make_ok, cls.make_out = ensure_built()
+
+    def test_handout_workload(self):
+        self.assertTrue(self.make_ok, msg=self.make_out)
+        best = optimize.optimize([0, 2, 4, 5], [7, 4, 1, 4], range(1, 21))
+        self.assertEqual(best[:3], (4, 4.5, 3.25))
+        self.assertEqual(best.simulated, [1, 2, 3, 4, 5, 6, 7])
+        self.assertEqual(best.curve[20], best.curve[7])
+        resp = optimize.optimize([0, 2, 4, 5], [7, 4, 1, 4], range(1, 21),
+                                 metric="resp")
+        self.assertEqual(resp.quantum, 1)
+
+    def test_matches_brute_force(self):
+        self.assertTrue(self.make_ok, msg=self.make_out)
+        rng = random.Random(self.SEED)
+        for idx in range(40):
+            tuples = [(p, rng.randint(0, 40), rng.randint(1, 30))
+                      for p in range(1, rng.randint(2, 15) + 1)]
+            arrival = [a for _, a, _ in tuples]
+            burst = [b for _, _, b in tuples]
+            quanta = range(1, 41)
+            for metric, pick in (("wait", 0), ("resp", 1)):
+                with self.subTest(random_id=idx, metric=metric):
+                    best = optimize.optimize(arrival, burst, quanta, metric)
+                    totals = {q: rr_totals(tuples, q) for q in quanta}
+                    want = min(quanta, key=lambda q: (totals[q][pick],
+                                                      totals[q][1 - pick], q))
+                    self.assertEqual(best.quantum, want)
+                    for q in quanta:
+                        self.assertEqual(best.curve[q], rr_reference(tuples, q))
+
+    def test_candidates(self):
+        run, same_as = optimize.candidates([9, 2, 5, 12, 6], 6)
+        self.assertEqual(run, [2, 5, 6])
+        self.assertEqual(same_as, {2: 2, 5: 5, 6: 6, 9: 6, 12: 6})
+        with self.assertRaises(ValueError):
+            optimize.candidates([0, 1], 3)
+
+    def test_parse_quanta_like_rr(self):
+        self.assertTrue(self.make_ok, msg=self.make_out)
+        data = workload_bytes([(1, 0, 7), (2, 2, 4), (3, 4, 1), (4, 5, 4)])
+        for spec in ("4", "1,2,4", "1-5", "1-3,8,10-11", "7,2,7"):
+            with self.subTest(spec=spec):
+                got = parse_quanta(spec)
+                self.assertEqual(sorted(set(got)),
+                                 sorted(run_sweep("-", got, data=data)))
+        self.assertEqual(parse_quanta("1-3,8"), [1, 2, 3, 8])
+        for spec in ("", "0", "3-1", "1-2-3", "a", "1,-2", "1-"):
+            with self.subTest(spec=spec), self.assertRaises(ValueError):
+                parse_quanta(spec)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
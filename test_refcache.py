@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# ---------------------------------------------------------------------------
+#   CS 111 – Lab 3  •  Tests for the memoised reference cache
+# ---------------------------------------------------------------------------
+
+import tempfile, unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import refcache
+from reference import POLICIES, rr_reference
+
+HANDOUT = [(1, 0, 7), (2, 2, 4), (3, 4, 1), (4, 5, 4)]
+
+
+class TestReferenceCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def cache(self, **kw):
+        c = refcache.ReferenceCache(self.tmp.name, **kw)
+        self.addCleanup(c.close)
+        return c
+
+    def test_results_match_reference(self):
+        c = self.cache()
+        for q in range(1, 7):
+            self.assertEqual(c.get(HANDOUT, q), rr_reference(HANDOUT, q))
+        self.assertEqual(c.get(HANDOUT, 1, median=True),
+                         rr_reference(HANDOUT, 1, median=True))
+
+    def test_second_store_reads_from_disk(self):
+        first = self.cache()
+        first.get(HANDOUT, 3)
+        first.close()
+        second = self.cache()
+        with mock.patch.object(refcache.reference, "rr_reference") as ref:
+            self.assertEqual(second.get(HANDOUT, 3), (7.0, 2.75))
+            ref.assert_not_called()
+        self.assertEqual((second.hits, second.misses), (1, 0))
+
+    def test_key_is_content_not_identity(self):
+        c = self.cache()
+        c.get(HANDOUT, 2)
+        c.get([list(t) for t in HANDOUT], 2)
+        self.assertEqual((c.hits, c.misses), (1, 1))
+        self.assertNotEqual(refcache.workload_key(HANDOUT, 2),
+                            refcache.workload_key(HANDOUT, 3))
+
+    def test_key_covers_policy(self):
+        c = self.cache()
+        for policy in POLICIES:
+            with self.subTest(policy=policy):
+                self.assertEqual(c.get(HANDOUT, 2, policy=policy),
+                                 rr_reference(HANDOUT, 2, policy=policy))
+        self.assertEqual(c.misses, len(POLICIES))
+        self.assertNotEqual(refcache.workload_key(HANDOUT, 2),
+                            refcache.workload_key(HANDOUT, 2, policy="srtf"))
+
+    def test_new_reference_version_invalidates(self):
+        old = self.cache(version="old")
+        old.get(HANDOUT, 4)
+        old.close()
+        new = self.cache(version="new")
+        self.assertEqual(len(new), 0)
+        new.get(HANDOUT, 4)
+        self.assertEqual(new.misses, 1)
+
+    def test_disk_store_is_bounded(self):
+        c = self.cache(max_entries=5, memory_entries=3)
+        for q in range(1, 21):
+            c.get(HANDOUT, q)
+        c.evict()
+        self.assertEqual(len(c), 5)
+        self.assertEqual(len(c._memory), 3)
+        c.get(HANDOUT, 20)                     # most recent survives
+        self.assertEqual(c.misses, 20)
+
+    def test_threads_share_one_cache(self):
+        c = self.cache()
+        cases = [(HANDOUT, q) for q in range(1, 9)] * 8
+        with ThreadPoolExecutor(max_workers=4) as ex:
+            got = list(ex.map(lambda case: c.get(*case), cases))
+        self.assertEqual(got, [rr_reference(*case) for case in cases])
+        self.assertEqual(len(c), 8)
+        c.close()
+
+    def test_cached_reference_from_threads(self):
+        # a fresh shared cache, first opened from one of the threads
+        with mock.patch.object(refcache, "_CACHE", None):
+            with ThreadPoolExecutor(max_workers=4) as ex:
+                got = list(ex.map(lambda q: refcache.cached_reference(HANDOUT, q),
+                                  range(1, 33)))
+            refcache.shared_cache().close()
+        self.assertEqual(got, [rr_reference(HANDOUT, q) for q in range(1, 33)])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
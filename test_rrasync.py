@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# ---------------------------------------------------------------------------
+#   CS 111 – Lab 3  •  Tests for the asyncio runner
+# ---------------------------------------------------------------------------
+
+import asyncio, random, subprocess, unittest
+
+from build import ensure_built
+from harness import sweep_workload
+from rrasync import AsyncRunner, run_cases
+from reference import rr_reference
+
+
+def _random_cases(seed, count):
+    rng = random.Random(seed)
+    cases = []
+    for _ in range(count):
+        tuples = [(p, rng.randint(0, 30), rng.randint(1, 20))
+                  for p in range(1, rng.randint(1, 12) + 1)]
+        cases.append((tuples, [1, 2, 3, 5, 8]))
+    return cases
+
+
+class TestAsyncRunner(unittest.TestCase):
+
+    SEED = 0xC111
+
+    @classmethod
+    def setUpClass(cls):
+        cls.make_ok, cls.make_out = ensure_built()
+
+    def test_matches_reference(self):
+        self.assertTrue(self.make_ok, msg=self.make_out)
+        cases = _random_cases(self.SEED, 60)
+        for idx, ((tuples, quanta), got) in enumerate(
+                zip(cases, run_cases(cases, limit=4))):
+            for q in quanta:
+                with self.subTest(random_id=idx, q=q):
+                    self.assertEqual(got[q], rr_reference(tuples, q))
+
+    def test_matches_blocking_sweep(self):
+        self.assertTrue(self.make_ok, msg=self.make_out)
+        tuples = [(1, 0, 7), (2, 2, 4), (3, 4, 1), (4, 5, 4)]
+        got = asyncio.run(AsyncRunner(1).sweep(tuples, range(1, 7)))
+        self.assertEqual(got, sweep_workload(tuples, range(1, 7)))
+
+    def test_limit_and_streaming(self):
+        self.assertTrue(self.make_ok, msg=self.make_out)
+        runner = AsyncRunner(limit=3)
+        cases = _random_cases(self.SEED + 1, 30)
+
+        async def collect():
+            return [i async for i, _ in runner.stream(cases)]
+
+        seen = asyncio.run(collect())
+        self.assertEqual(sorted(seen), list(range(len(cases))))
+        self.assertLessEqual(runner.peak, 3)
+        self.assertEqual(runner.in_flight, 0)
+
+    def test_failure_raises(self):
+        self.assertTrue(self.make_ok, msg=self.make_out)
+        runner = AsyncRunner(limit=2)
+        cases = [([(1, 0, 3)], [1]), ([(1, 0, 3)], [0])]   # quantum 0 is EINVAL
+        with self.assertRaises(subprocess.CalledProcessError):
+            asyncio.run(runner.map(cases))
+        self.assertEqual(runner.in_flight, 0)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
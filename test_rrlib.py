@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+# ---------------------------------------------------------------------------
+#   CS 111 – Lab 3  •  Tests for the librr.so ctypes binding
+# ---------------------------------------------------------------------------
+
+import array, random, subprocess, tempfile, unittest
+
+import rrlib
+from build import ensure_built
+from harness import StatsSummary, write_workload
+from reference import POLICIES, rr_reference, rr_schedule
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def _columns(tuples):
+    return ([a for _, a, _ in tuples], [b for _, _, b in tuples])
+
+
+class TestRRLib(unittest.TestCase):
+    """The in‑process core must agree with rr_reference per process."""
+
+    SEED = 0xC111
+
+    @classmethod
+    def setUpClass(cls):
+        cls.make_ok, cls.make_out = ensure_built()
+
+    def test_handout_workload(self):
+        self.assertTrue(self.make_ok, msg=self.make_out)
+        arrival = array.array("I", [0, 2, 4, 5])
+        burst   = array.array("I", [7, 4, 1, 4])
+        with rrlib.Workload(arrival, burst) as w:
+            self.assertEqual(w.sweep([3, 4]), {3: (7.0, 2.75), 4: (4.5, 3.25)})
+
+    def test_per_process_times_match_reference(self):
+        self.assertTrue(self.make_ok, msg=self.make_out)
+        rng = random.Random(self.SEED)
+        for idx in range(50):
+            tuples = [(p, rng.randint(0, 30), rng.randint(0, 50))
+                      for p in range(1, rng.randint(2, 15) + 1)]
+            arrival, burst = _columns(tuples)
+            for q in (1, 3, 8):
+                with self.subTest(random_id=idx, quantum=q):
+                    r = rrlib.simulate(arrival, burst, q)
+                    finish, first_cpu, _ = rr_schedule(tuples, q)
+                    self.assertEqual(list(r.completion), finish)
+                    self.assertEqual(list(r.first_run), first_cpu)
+                    self.assertEqual(rrlib.averages(r, len(tuples)),
+                                     rr_reference(tuples, q))
+
+    def test_fast_forward_matches_slice_by_slice(self):
+        self.assertTrue(self.make_ok, msg=self.make_out)
+        rng = random.Random(self.SEED)
+        for idx in range(50):
+            tuples = [(p, rng.randint(0, 300), rng.randint(0, 500))
+                      for p in range(1, rng.randint(2, 15) + 1)]
+            arrival, burst = _columns(tuples)
+            for q in (1, 2, 7):
+                with self.subTest(random_id=idx, quantum=q):
+                    fast = rrlib.simulate(arrival, burst, q, fast_forward=True)
+                    slow = rrlib.simulate(arrival, burst, q, fast_forward=False)
+                    self.assertEqual(list(fast.completion), list(slow.completion))
+                    self.assertEqual(list(fast.first_run), list(slow.first_run))
+                    self.assertEqual(fast[:2], slow[:2])
+
+    def test_drain_matches_slice_by_slice(self):
+        self.assertTrue(self.make_ok, msg=self.make_out)
+        rng = random.Random(self.SEED)
+        for idx in range(50):
+            waves = [rng.randint(0, 300) for _ in range(rng.randint(1, 3))]
+            tuples = [(p, rng.choice(waves), rng.randint(0, 60))
+                      for p in range(1, rng.randint(1, 20) + 1)]
+            arrival, burst = _columns(tuples)
+            for q in (1, 4, 100):
+                with self.subTest(random_id=idx, quantum=q):
+                    fast = rrlib.simulate(arrival, burst, q, stats=True)
+                    slow = rrlib.simulate(arrival, burst, q, stats=True,
+                                          fast_forward=False)
+                    self.assertEqual(list(fast.completion), list(slow.completion))
+                    self.assertEqual(list(fast.first_run), list(slow.first_run))
+                    self.assertEqual(fast.stats, slow.stats)
+
+    def test_drain_stats_with_zero_bursts(self):
+        # zero bursts queued when the drain ends exactly at an arrival
+        self.assertTrue(self.make_ok, msg=self.make_out)
+        rng = random.Random(self.SEED)
+        cases = [[(1, 0, 1), (2, 1, 0), (3, 1, 1), (4, 2, 1), (5, 0, 0),
+                  (6, 0, 0)]]
+        for _ in range(300):
+            tuples, t = [], 0
+            for p in range(1, rng.randint(2, 12) + 1):
+                burst = rng.choice((0, 0, 1, rng.randint(1, 6)))
+                tuples.append((p, t, burst))
+                if rng.random() < 0.4:
+                    t += rng.choice((burst, rng.randint(0, 6)))
+            cases.append(tuples)
+        for idx, tuples in enumerate(cases):
+            arrival, burst = _columns(tuples)
+            for q in (1, 2, 3):
+                with self.subTest(random_id=idx, quantum=q):
+                    fast = rrlib.simulate(arrival, burst, q, stats=True)
+                    slow = rrlib.simulate(arrival, burst, q, stats=True,
+                                          fast_forward=False)
+                    self.assertEqual(fast.stats, slow.stats)
+                    self.assertEqual(list(fast.completion), list(slow.completion))
+
+    def test_median_quantum_matches_reference(self):
+        self.assertTrue(self.make_ok, msg=self.make_out)
+        rng = random.Random(self.SEED)
+        for idx in range(50):
+            tuples = [(p, rng.randint(0, 60), rng.randint(0, 40))
+                      for p in range(1, rng.randint(2, 20) + 1)]
+            arrival, burst = _columns(tuples)
+            for q in (1, 4):
+                with self.subTest(random_id=idx, quantum=q):
+                    r = rrlib.simulate(arrival, burst, q, median=True)
+                    finish, first_cpu, _ = rr_schedule(tuples, q, median=True)
+                    self.assertEqual(list(r.completion), finish)
+                    self.assertEqual(list(r.first_run), first_cpu)
+
+    def test_policies_match_reference(self):
+        self.assertTrue(self.make_ok, msg=self.make_out)
+        rng = random.Random(self.SEED)
+        for idx in range(50):
+            tuples = [(p, rng.randint(0, 60), rng.randint(0, 40))
+                      for p in range(1, rng.randint(2, 20) + 1)]
+            arrival, burst = _columns(tuples)
+            for policy in POLICIES:
+                for q in (1, 4):
+                    with self.subTest(random_id=idx, policy=policy, quantum=q):
+                        r = rrlib.simulate(arrival, burst, q, stats=True,
+                                           policy=policy)
+                        finish, first_cpu, slices = rr_schedule(
+                            tuples, q, policy=policy)
+                        self.assertEqual(list(r.completion), finish)
+                        self.assertEqual(list(r.first_run), first_cpu)
+                        self.assertEqual(r.stats["slices"], slices)
+
+    def test_stats_counters(self):
+        self.assertTrue(self.make_ok, msg=self.make_out)
+        rng = random.Random(self.SEED)
+        for idx in range(50):
+            tuples = [(p, rng.randint(0, 300), rng.randint(0, 500))
+                      for p in range(1, rng.randint(2, 15) + 1)]
+            arrival, burst = _columns(tuples)
+            for q in (1, 7):
+                with self.subTest(random_id=idx, quantum=q):
+                    fast = rrlib.simulate(arrival, burst, q, stats=True).stats
+                    slow = rrlib.simulate(arrival, burst, q, stats=True,
+                                          fast_forward=False).stats
+                    self.assertEqual(fast, slow)
+                    finish, _, slices = rr_schedule(tuples, q)
+                    self.assertEqual(fast["slices"], slices)
+                    self.assertEqual(fast["preemptions"], slices - len(tuples))
+                    self.assertEqual(sum(fast["wait_hist"]), len(tuples))
+                    self.assertLessEqual(fast["max_queue"], len(tuples))
+                    busy = sum(burst)
+                    self.assertEqual(fast["idle_time"], max(finish) - busy)
+
+    def test_stats_cli_matches_library(self):
+        self.assertTrue(self.make_ok, msg=self.make_out)
+        tuples = [(1, 0, 7), (2, 2, 4), (3, 9, 1), (4, 30, 4)]
+        arrival, burst = _columns(tuples)
+        with tempfile.NamedTemporaryFile() as f:
+            write_workload(f, tuples)
+            out = subprocess.check_output(("./rr", "--stats", f.name, "1-3"),
+                                          text=True)
+        summary = StatsSummary()
+        for line in out.splitlines():
+            fields = dict(kv.split("=", 1) for kv in line.split())
+            want = rrlib.simulate(arrival, burst, int(fields["quantum"]),
+                                  stats=True).stats
+            self.assertEqual(fields["wait_hist"],
+                             ",".join(map(str, want["wait_hist"])))
+            self.assertEqual(int(fields["idle_jumps"]), want["idle_jumps"])
+            self.assertEqual(float(fields["mean_queue"]),
+                             round(want["mean_queue"], 2))
+            summary.add(want)
+        self.assertEqual(summary.runs, 3)
+        self.assertEqual(summary.totals["idle_jumps"], 3)       # 12 → 30, per q
+
+    def test_times_past_u32(self):
+        self.assertTrue(self.make_ok, msg=self.make_out)
+        tuples = [(p, p * 3_000_000_000 % 2 ** 32, 4_000_000_000 - p)
+                  for p in range(1, 9)]
+        arrival, burst = _columns(tuples)
+        for q in (7, 123_456_789):
+            r = rrlib.simulate(arrival, burst, q)
+            finish, first_cpu, _ = rr_schedule(tuples, q)
+            self.assertGreater(max(finish), 2 ** 32)
+            self.assertEqual(list(r.completion), finish)
+            self.assertEqual(list(r.first_run), first_cpu)
+            self.assertEqual(rrlib.averages(r, len(tuples)),
+                             rr_reference(tuples, q))
+
+    def test_zero_quantum_rejected(self):
+        self.assertTrue(self.make_ok, msg=self.make_out)
+        with self.assertRaises(OSError):
+            rrlib.simulate([0], [1], 0)
+
+    @unittest.skipIf(np is None, "NumPy not installed")
+    def test_numpy_columns_are_not_copied(self):
+        self.assertTrue(self.make_ok, msg=self.make_out)
+        arrival = np.array([0, 2, 4, 5], dtype=np.uint32)
+        burst   = np.array([7, 4, 1, 4], dtype=np.uint32)
+        owner, ptr, n = rrlib._as_u32(arrival)
+        self.assertIs(owner, arrival)
+        self.assertEqual(ptr.contents.value, 0)
+        r = rrlib.simulate(arrival, burst, 4)
+        self.assertIsInstance(r.completion, np.ndarray)
+        self.assertEqual(r.completion.tolist(), [12, 8, 9, 16])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# ---------------------------------------------------------------------------
+#   CS 111 – Lab 3  •  Tests for `rr --trace` and the rrtrace reader
+# ---------------------------------------------------------------------------
+
+import os, random, subprocess, sys, tempfile, unittest
+
+import rrtrace
+from build import ensure_built
+from harness import write_workload
+from reference import rr_schedule, rr_totals
+
+
+class TestTrace(unittest.TestCase):
+
+    SEED = 0xC111
+
+    @classmethod
+    def setUpClass(cls):
+        cls.make_ok, cls.make_out = ensure_built()
+
+    def setUp(self):
+        self.assertTrue(self.make_ok, msg=self.make_out)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "run.rrtr")
+
+    def trace(self, tuples, quantum):
+        with tempfile.NamedTemporaryFile() as f:
+            write_workload(f, tuples)
+            subprocess.run(("./rr", "--trace", self.path, f.name, str(quantum)),
+                           check=True, capture_output=True)
+
+    def test_trace_matches_reference(self):
+        rng = random.Random(self.SEED)
+        for idx in range(30):
+            tuples = [(p, rng.randint(0, 60), rng.randint(0, 30))
+                      for p in range(1, rng.randint(2, 15) + 1)]
+            for q in (1, 4):
+                with self.subTest(random_id=idx, quantum=q):
+                    self.trace(tuples, q)
+                    self.assertEqual(rrtrace.header(self.path),
+                                     (q, len(tuples)))
+                    evs = list(rrtrace.events(self.path))
+                    finish, _, slices = rr_schedule(tuples, q)
+                    self.assertEqual(len(evs), slices)
+                    self.assertEqual(sum(e.finished for e in evs), len(tuples))
+                    self.assertEqual(rrtrace.totals(evs, tuples),
+                                     rr_totals(tuples, q))
+                    ends = [e.start + e.length for e in evs]
+                    self.assertTrue(all(e.start >= prev for e, prev
+                                        in zip(evs[1:], ends)))
+
+    def test_buffer_flushes_in_blocks(self):
+        tuples = [(p, 0, 10_000) for p in range(1, 11)]    # 100k slices
+        self.trace(tuples, 1)
+        self.assertEqual(os.path.getsize(self.path), 16 + 24 * 100_000)
+        self.assertEqual(rrtrace.totals(rrtrace.events(self.path, block=999),
+                                        tuples), rr_totals(tuples, 1))
+
+    def test_start_times_past_u32(self):
+        tuples = [(1, 0, 4_000_000_000), (2, 5, 4_000_000_000),
+                  (3, 4_294_967_295, 7)]
+        self.trace(tuples, 1_000_000_000)
+        evs = list(rrtrace.events(self.path))
+        self.assertGreater(evs[-1].start, 2 ** 32)
+        self.assertEqual(rrtrace.totals(evs, tuples),
+                         rr_totals(tuples, 1_000_000_000))
+
+    def test_window_stops_reading(self):
+        self.trace([(p, 0, 100) for p in range(1, 5)], 1)
+        consumed = 0
+
+        def counted():
+            nonlocal consumed
+            for e in rrtrace.events(self.path):
+                consumed += 1
+                yield e
+
+        self.assertEqual(len(list(rrtrace.window(counted(), 10, 20))), 10)
+        self.assertEqual(consumed, 21)
+        chart = rrtrace.gantt(rrtrace.events(self.path), 0, 8, width=8)
+        self.assertEqual(chart.splitlines()[1:], ["1 |#   #   |", "2 | #   #  |",
+                                                  "3 |  #   # |", "4 |   #   #|"])
+
+    def test_totals_reads_workloads_like_rr(self):
+        text = os.path.join(self.tmp.name, "loose.txt")
+        with open(text, "wb") as f:            # no final newline, odd separators
+            f.write(b"4\r\n1;0 7\n2,\t2,4\n3 4 1\n4, 5, 4")
+        subprocess.run(("./rr", "--trace", self.path, text, "4"),
+                       check=True, capture_output=True)
+        out = subprocess.run((sys.executable, "rrtrace.py", self.path,
+                              "--totals", text),
+                             check=True, capture_output=True, text=True).stdout
+        self.assertIn("avg_wait=4.50 avg_resp=3.25", out)
+
+    def test_bad_input(self):
+        with tempfile.NamedTemporaryFile() as f:
+            write_workload(f, [(1, 0, 1)])
+            proc = subprocess.run(("./rr", "--trace", self.path, f.name, "1,2"))
+            self.assertNotEqual(proc.returncode, 0)
+        with open(self.path, "wb") as f:
+            f.write(rrtrace.HEADER.pack(b"RRTR", rrtrace.VERSION, 1, 1) + bytes(20))
+        with self.assertRaisesRegex(ValueError, "truncated"):
+            list(rrtrace.events(self.path))
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -4,73 +4,17 @@
 #   Generates a *separate* unittest method for every (workload, quantum) pair
 # ---------------------------------------------------------------------------
 
-import subprocess, tempfile, unittest, math, itertools, os, random
+import tempfile, unittest, math, itertools, os, random
+
+from build import ensure_built
+from harness import check_case, record_stats, run_parallel
 
 # ---------------------------------------------------------------------------
 # Build `rr` once for the entire module
 # ---------------------------------------------------------------------------
-MAKE_OK, MAKE_LOG = False, ""
-try:
-    res = subprocess.run(["make"], capture_output=True, text=True, check=True)
-    MAKE_OK, MAKE_LOG = True, res.stdout + res.stderr
-except subprocess.CalledProcessError as e:
-    MAKE_OK, MAKE_LOG = False, e.stdout + e.stderr
+MAKE_OK, MAKE_LOG = ensure_built()
 RR_EXE = "./rr"
 
-# ---------------------------------------------------------------------------
-# Reference Round‑Robin in pure Python
-# ---------------------------------------------------------------------------
-def rr_reference(workload, quantum):
-    n = len(workload)
-    remaining = {p: b for p, a, b in workload}
-    first_cpu = {}
-    responded = set()
-    finished  = {}
-    ready, arrived, t = [], set(), 0
-
-    while len(finished) < n:
-        for p, a, _ in workload:
-            if p not in arrived and a <= t:
-                ready.append(p)
-                arrived.add(p)
-
-        if not ready:
-            t = min(a for p, a, _ in workload if p not in arrived)
-            continue
-
-        p = ready.pop(0)
-        if p not in responded:
-            first_cpu[p] = t
-            responded.add(p)
-
-        slice_len = min(quantum, remaining[p])
-        start = t
-        t += slice_len
-        remaining[p] -= slice_len
-
-        for q, a, _ in workload:
-            if q not in arrived and start < a <= t:
-                ready.append(q)
-                arrived.add(q)
-
-        if remaining[p]:
-            ready.append(p)
-        else:
-            finished[p] = t
-
-    total_wait = sum(finished[p] - a - b for p, a, b in workload)
-    total_resp = sum(first_cpu[p] - a       for p, a, b in workload)
-    return round(total_wait / n, 2), round(total_resp / n, 2)
-
-# ---------------------------------------------------------------------------
-# Helper to write skeleton input files
-# ---------------------------------------------------------------------------
-def write_workload(tmp, tuples):
-    tmp.write(f"{len(tuples)}\n".encode())
-    for pid, arr, bur in tuples:
-        tmp.write(f"{pid}, {arr}, {bur}\n".encode())
-    tmp.flush()
-
 # ---------------------------------------------------------------------------
 # 10 deliberately varied workloads
 # ---------------------------------------------------------------------------
@@ -100,6 +44,22 @@ WORKLOADS = {
 
 QUANTA = [1, 2, 3, 4, 5, 6, 8, 16]
 
+# ---------------------------------------------------------------------------
+# All (workload, quantum) cases are run once, spread over a process pool, the
+# first time any generated method asks for its result
+# ---------------------------------------------------------------------------
+_CASES = {}
+
+def case_result(name, qlen):
+    if not _CASES:
+        rows = run_parallel(check_case, [(t, QUANTA, RR_EXE)
+                                         for t in WORKLOADS.values()])
+        for w_name, w_rows in zip(WORKLOADS, rows):
+            record_stats(w_rows)
+            for q, got, exp in w_rows:
+                _CASES[w_name, q] = (got, exp)
+    return _CASES[name, qlen]
+
 # ---------------------------------------------------------------------------
 # Dynamic generation of one test method per (workload, quantum)
 # ---------------------------------------------------------------------------
@@ -115,23 +75,16 @@ else:
     for w_name, tuples in WORKLOADS.items():
         for q in QUANTA:
             def _template(self, t=tuples, qlen=q, name=w_name):
-                with tempfile.NamedTemporaryFile() as f:
-                    write_workload(f, t)
-                    out = subprocess.check_output(
-                        (RR_EXE, f.name, str(qlen)), text=True
-                    ).splitlines()
-                    got_wait = float(out[0].split(":")[1])
-                    got_resp = float(out[1].split(":")[1])
-                    exp_wait, exp_resp = rr_reference(t, qlen)
-                    self.assertTrue(
-                        math.isclose(got_wait, exp_wait, abs_tol=0.01) and
-                        math.isclose(got_resp, exp_resp, abs_tol=0.01),
-                        msg=(
-                            f"\nWork‑load: {name}  quantum={qlen}"
-                            f"\nExpected wait={exp_wait:.2f} resp={exp_resp:.2f}"
-                            f"\nGot      wait={got_wait:.2f} resp={got_resp:.2f}\n"
-                        )
+                (got_wait, got_resp), (exp_wait, exp_resp) = case_result(name, qlen)
+                self.assertTrue(
+                    math.isclose(got_wait, exp_wait, abs_tol=0.01) and
+                    math.isclose(got_resp, exp_resp, abs_tol=0.01),
+                    msg=(
+                        f"\nWork‑load: {name}  quantum={qlen}"
+                        f"\nExpected wait={exp_wait:.2f} resp={exp_resp:.2f}"
+                        f"\nGot      wait={got_wait:.2f} resp={got_resp:.2f}\n"
                     )
+                )
             test_name = f"test_{w_name}_q{q}"
             setattr(TestRRDetailed, test_name, _template)
 
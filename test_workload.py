@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# ---------------------------------------------------------------------------
+#   CS 111 – Lab 3  •  Tests for the binary workload format
+# ---------------------------------------------------------------------------
+
+import os, random, subprocess, tempfile, unittest
+
+from build import ensure_built
+from harness import parse_sweep, write_workload
+
+try:
+    import numpy as np
+    import workload
+except ImportError:
+    np = None
+
+
+@unittest.skipIf(np is None, "NumPy not installed")
+class TestBinaryWorkload(unittest.TestCase):
+    """Text and binary copies of a workload must give identical output."""
+
+    SEED = 0xC111
+
+    @classmethod
+    def setUpClass(cls):
+        cls.make_ok, cls.make_out = ensure_built()
+        cls.tmp = tempfile.TemporaryDirectory()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def _path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def test_round_trip(self):
+        tuples = [(1, 0, 7), (2, 2, 4), (3, 4, 1), (4, 5, 4)]
+        path = self._path("rt.rrwl")
+        workload.write_binary_tuples(path, tuples)
+        self.assertTrue(workload.is_binary(path))
+        self.assertEqual(os.path.getsize(path), 16 + 12 * len(tuples))
+        pid, arrival, burst = workload.read_binary(path)
+        self.assertIsInstance(arrival, np.memmap)
+        self.assertEqual(list(zip(pid, arrival, burst)), tuples)
+
+    def test_converted_processes_txt(self):
+        self.assertTrue(self.make_ok, msg=self.make_out)
+        path = self._path("processes.rrwl")
+        workload.text_to_binary("processes.txt", path)
+        self.assertFalse(workload.is_binary("processes.txt"))
+        for spec in ("1-6", "4"):
+            self.assertEqual(
+                subprocess.check_output(("./rr", path, spec)),
+                subprocess.check_output(("./rr", "processes.txt", spec)),
+            )
+
+    def test_random_binary_matches_text(self):
+        self.assertTrue(self.make_ok, msg=self.make_out)
+        rng = random.Random(self.SEED)
+        for idx in range(20):
+            tuples = [(p, rng.randint(0, 30), rng.randint(0, 50))
+                      for p in range(1, rng.randint(2, 15) + 1)]
+            binary, text = self._path("w.rrwl"), self._path("w.txt")
+            workload.write_binary_tuples(binary, tuples)
+            with open(text, "wb") as f:
+                write_workload(f, tuples)
+            with self.subTest(random_id=idx):
+                self.assertEqual(
+                    parse_sweep(subprocess.check_output(("./rr", binary, "1-8"),
+                                                        text=True)),
+                    parse_sweep(subprocess.check_output(("./rr", text, "1-8"),
+                                                        text=True)),
+                )
+
+    def test_binary_from_stdin(self):
+        self.assertTrue(self.make_ok, msg=self.make_out)
+        path = self._path("piped.rrwl")
+        workload.text_to_binary("processes.txt", path)
+        with open(path, "rb") as f:
+            data = f.read()
+        piped = subprocess.run(("./rr", "-", "1-6"), input=data,
+                               capture_output=True, check=True).stdout
+        self.assertEqual(piped,
+                         subprocess.check_output(("./rr", path, "1-6")))
+
+    def test_malformed_binary_rejected(self):
+        self.assertTrue(self.make_ok, msg=self.make_out)
+        path = self._path("bad.rrwl")
+        workload.write_binary_tuples(path, [(1, 0, 3), (2, 1, 2)])
+        with open(path, "r+b") as f:            # claim more records than exist
+            f.seek(8)
+            f.write((1000).to_bytes(8, "little"))
+        proc = subprocess.run(("./rr", path, "2"), capture_output=True)
+        self.assertNotEqual(proc.returncode, 0)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
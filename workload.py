@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# ---------------------------------------------------------------------------
+#   CS 111 – Lab 3  •  Binary workload files (read/written via np.memmap)
+# ---------------------------------------------------------------------------
+#
+#   Layout (little‑endian), shared with rr.c:
+#
+#     offset  0  char[4]     magic "RRWL"
+#     offset  4  u32         version (1)
+#     offset  8  u64         count
+#     offset 16  u32[count]  pid | u32[count] arrival | u32[count] burst
+#
+#   `rr` recognises the magic and uses the mapped columns as is.  Columns
+#   (not interleaved records) keep each field contiguous, which is what the
+#   scheduler core and NumPy both want.
+#
+#   Usage:  python3 workload.py processes.txt processes.rrwl
+# ---------------------------------------------------------------------------
+
+import argparse
+import re
+
+import numpy as np
+
+MAGIC       = b"RRWL"
+VERSION     = 1
+HEADER      = np.dtype([("magic", "S4"), ("version", "<u4"), ("count", "<u8")])
+HEADER_SIZE = HEADER.itemsize                  # 16
+
+
+def write_binary(path, pid, arrival, burst):
+    """Write three equal‑length integer columns as a binary workload."""
+    n = len(pid)
+    if not len(arrival) == len(burst) == n:
+        raise ValueError("columns must have the same length")
+    header = np.array([(MAGIC, VERSION, n)], dtype=HEADER)
+    with open(path, "wb") as f:
+        f.write(header.tobytes())
+    if n == 0:
+        return
+    cols = np.memmap(path, dtype="<u4", mode="r+", offset=HEADER_SIZE,
+                     shape=(3, n))
+    cols[0], cols[1], cols[2] = pid, arrival, burst
+    cols.flush()
+    del cols
+
+
+def write_binary_tuples(path, tuples):
+    """Write [(pid, arrival, burst), …] as a binary workload."""
+    arr = np.asarray(tuples, dtype=np.uint32).reshape(-1, 3)
+    write_binary(path, arr[:, 0], arr[:, 1], arr[:, 2])
+
+
+def read_binary(path):
+    """
+    Map a binary workload.  Returns (pid, arrival, burst): read‑only uint32
+    np.memmap views into the file, so nothing is read until it is touched.
+    """
+    header = np.fromfile(path, dtype=HEADER, count=1)
+    if len(header) != 1 or header["magic"][0] != MAGIC:
+        raise ValueError(f"{path}: not a binary workload")
+    if header["version"][0] != VERSION:
+        raise ValueError(f"{path}: unsupported version {header['version'][0]}")
+    n = int(header["count"][0])
+    if n == 0:
+        empty = np.zeros(0, dtype="<u4")
+        return empty, empty, empty
+    cols = np.memmap(path, dtype="<u4", mode="r", offset=HEADER_SIZE,
+                     shape=(3, n))
+    return cols[0], cols[1], cols[2]
+
+
+def is_binary(path):
+    with open(path, "rb") as f:
+        return f.read(4) == MAGIC
+
+
+def read_text(path):
+    """
+    Parse a text workload (count line, then "pid, arrival, burst" lines)
+    in bulk.  Like `rr`, any non‑digit byte separates numbers.
+    """
+    with open(path, "rb") as f:
+        nums = np.array(re.findall(rb"\d+", f.read()), dtype=np.uint32)
+    n = int(nums[0])
+    if len(nums) < 1 + 3 * n:
+        raise ValueError(f"{path}: expected {n} processes")
+    rows = nums[1:1 + 3 * n].reshape(n, 3)
+    return rows[:, 0], rows[:, 1], rows[:, 2]
+
+
+def text_to_binary(src, dst):
+    """Convert a text workload such as processes.txt to the binary format."""
+    write_binary(dst, *read_text(src))
+
+
+def _main():
+    ap = argparse.ArgumentParser(description="Convert a text workload to "
+                                             "the binary RRWL format.")
+    ap.add_argument("src")
+    ap.add_argument("dst")
+    args = ap.parse_args()
+    text_to_binary(args.src, args.dst)
+
+
+if __name__ == "__main__":
+    _main()